@@ -0,0 +1,6 @@
+"""
+Pacote da API REST local (acesso aos serviços sem interface gráfica)
+"""
+from .servidor import ServidorAPI
+
+__all__ = ['ServidorAPI']
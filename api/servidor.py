@@ -0,0 +1,550 @@
+"""
+Servidor HTTP (REST/JSON) local que expõe os serviços sem a interface gráfica
+
+Todas as escritas passam por uma única thread com uma única conexão (escritor),
+evitando disputas pelo bloqueio de escrita do SQLite. As leituras usam um pool
+de threads, cada uma com sua própria conexão reutilizada. Os endpoints de
+catálogo respondem com ETag e aceitam If-None-Match. Vendas e cancelamentos
+aceitam o cabeçalho Idempotency-Key (ou o campo chave_idempotencia) para que
+reenvios após timeout não dupliquem a operação. GET /metricas devolve as
+métricas da aplicação no formato de texto do Prometheus.
+
+Uso: python -m api.servidor [--host 127.0.0.1] [--porta 8765] [--db caminho.db]
+"""
+import argparse
+import asyncio
+import json
+import re
+import secrets
+import sqlite3
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, is_dataclass
+from functools import partial
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from database import DatabaseManager, Cliente
+from business import ProdutoService, ClienteService, VendaService, EstoqueService
+from config.settings import API_CONFIG
+from utils.metricas import METRICAS, TIPO_CONTEUDO
+
+# Respostas de catálogo: 304 (If-None-Match), servidas do cache ou lidas do banco
+METRICA_CATALOGO = {
+    resultado: METRICAS.contador('petshop_api_catalogo_total', "Respostas de catálogo da API",
+                                 resultado=resultado)
+    for resultado in ('nao_modificado', 'cache', 'banco')
+}
+
+
+class ErroRequisicao(Exception):
+    """Erro que deve ser devolvido ao cliente com o status HTTP informado"""
+
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _para_json(obj: Any) -> Any:
+    """Converte modelos (dataclasses) e outros objetos para JSON"""
+    if is_dataclass(obj):
+        return asdict(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def _inteiro(valor: Any, campo: str) -> int:
+    """Converte um parâmetro para inteiro ou responde 400"""
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ErroRequisicao(HTTPStatus.BAD_REQUEST, f"Parâmetro '{campo}' deve ser inteiro")
+
+
+def _numero(valor: Any, campo: str) -> float:
+    """Converte um parâmetro para número ou responde 400"""
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        raise ErroRequisicao(HTTPStatus.BAD_REQUEST, f"Parâmetro '{campo}' deve ser numérico")
+
+
+def _chave(dados: Dict) -> Optional[str]:
+    """Chave de idempotência do corpo (ou do cabeçalho Idempotency-Key)"""
+    chave = dados.get('chave_idempotencia')
+    if chave is None:
+        return None
+    chave = str(chave).strip()
+    if not chave or len(chave) > 128:
+        raise ErroRequisicao(HTTPStatus.BAD_REQUEST, "Chave de idempotência inválida")
+    return chave
+
+
+class ServidorAPI:
+    """Servidor HTTP assíncrono na frente dos serviços de negócio"""
+
+    def __init__(self, db_path: Optional[str] = None, host: Optional[str] = None,
+                 porta: Optional[int] = None, leitores: Optional[int] = None):
+        self.host = host or API_CONFIG['host']
+        self.porta = API_CONFIG['porta'] if porta is None else porta
+
+        self.db = DatabaseManager(db_path, reutilizar_conexoes=True)
+        self.produto_service = ProdutoService(self.db)
+        self.cliente_service = ClienteService(self.db)
+        self.venda_service = VendaService(self.db)
+        self.estoque_service = EstoqueService(self.db)
+
+        self._escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='api-escritor')
+        self._leitores = ThreadPoolExecutor(
+            max_workers=leitores or API_CONFIG['leitores'], thread_name_prefix='api-leitor'
+        )
+
+        self._servidor = None
+        self._monitor = None
+        self._instancia = secrets.token_hex(4)
+        self._cache_catalogo = OrderedDict()
+
+        # (método, caminho, handler, tipo): 'catalogo' e 'leitura' vão para o pool
+        # de leitura, 'escrita' para o escritor único, 'lote' agrupa sub-requisições
+        # e 'metricas' responde texto no próprio laço (não acessa o banco)
+        rotas = [
+            ('GET', r'/produtos', self._listar_produtos, 'catalogo'),
+            ('GET', r'/produtos/mais-vendidos', self._mais_vendidos, 'leitura'),
+            ('GET', r'/produtos/(\d+)/velocidade', self._velocidade_vendas, 'leitura'),
+            ('GET', r'/produtos/(\d+)', self._buscar_produto, 'catalogo'),
+            ('GET', r'/clientes', self._listar_clientes, 'leitura'),
+            ('GET', r'/clientes/(\d+)', self._buscar_cliente, 'leitura'),
+            ('POST', r'/clientes', self._cadastrar_cliente, 'escrita'),
+            ('GET', r'/vendas', self._listar_vendas, 'leitura'),
+            ('GET', r'/vendas/estatisticas', self._estatisticas_vendas, 'leitura'),
+            ('GET', r'/vendas/faturamento-diario', self._faturamento_diario, 'leitura'),
+            ('GET', r'/vendas/(\d+)', self._buscar_venda, 'leitura'),
+            ('POST', r'/vendas', self._criar_venda, 'escrita'),
+            ('POST', r'/vendas/(\d+)/cancelar', self._cancelar_venda, 'escrita'),
+            ('GET', r'/estoque/alertas', self._alertas_estoque, 'leitura'),
+            ('GET', r'/estoque/previsao', self._previsao_estoque, 'leitura'),
+            ('GET', r'/estoque/reposicao', self._reposicao_estoque, 'leitura'),
+            ('GET', r'/estoque/historico', self._estoque_historico, 'leitura'),
+            ('POST', r'/estoque/entrada', self._entrada_estoque, 'escrita'),
+            ('POST', r'/estoque/saida', self._saida_estoque, 'escrita'),
+            ('POST', r'/estoque/recebimentos', self._receber_entrega, 'escrita'),
+            ('POST', r'/lote', None, 'lote'),
+            ('GET', r'/metricas', self._metricas, 'metricas'),
+        ]
+        self._rotas = [(metodo, re.compile(f'^{caminho}$'), handler, tipo)
+                       for metodo, caminho, handler, tipo in rotas]
+
+    # ==================== HANDLERS (executados nos pools) ====================
+
+    def _resposta_servico(self, resultado: Tuple) -> Tuple[int, Dict]:
+        """Converte as tuplas (sucesso, mensagem[, id]) dos serviços em resposta HTTP"""
+        if not resultado[0]:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {'erro': resultado[1]}
+        corpo = {'mensagem': resultado[1]}
+        if len(resultado) > 2:
+            corpo['id'] = resultado[2]
+        return HTTPStatus.CREATED, corpo
+
+    def _listar_produtos(self, consulta: Dict, dados: Any):
+        apenas_ativos = consulta.get('apenas_ativos', '1') != '0'
+        return HTTPStatus.OK, self.produto_service.listar_produtos(consulta.get('tipo_animal'), apenas_ativos)
+
+    def _buscar_produto(self, consulta: Dict, dados: Any, produto_id: str):
+        produto = self.produto_service.buscar_produto(int(produto_id))
+        if not produto:
+            raise ErroRequisicao(HTTPStatus.NOT_FOUND, f"Produto ID {produto_id} não encontrado")
+        return HTTPStatus.OK, produto
+
+    def _listar_clientes(self, consulta: Dict, dados: Any):
+        apenas_ativos = consulta.get('apenas_ativos', '1') != '0'
+        return HTTPStatus.OK, self.cliente_service.listar_clientes(apenas_ativos)
+
+    def _buscar_cliente(self, consulta: Dict, dados: Any, cliente_id: str):
+        cliente = self.cliente_service.buscar_cliente(int(cliente_id))
+        if not cliente:
+            raise ErroRequisicao(HTTPStatus.NOT_FOUND, f"Cliente ID {cliente_id} não encontrado")
+        return HTTPStatus.OK, cliente
+
+    def _cadastrar_cliente(self, consulta: Dict, dados: Any):
+        campos = ('nome', 'cpf', 'telefone', 'email', 'endereco')
+        cliente = Cliente(**{campo: str(dados.get(campo) or '') for campo in campos})
+        return self._resposta_servico(self.cliente_service.cadastrar_cliente(cliente))
+
+    def _listar_vendas(self, consulta: Dict, dados: Any):
+        cliente_id = consulta.get('cliente_id')
+        return HTTPStatus.OK, self.venda_service.listar_vendas(
+            consulta.get('data_inicio'), consulta.get('data_fim'),
+            _inteiro(cliente_id, 'cliente_id') if cliente_id else None
+        )
+
+    def _estatisticas_vendas(self, consulta: Dict, dados: Any):
+        return HTTPStatus.OK, self.venda_service.obter_estatisticas_vendas(
+            consulta.get('data_inicio'), consulta.get('data_fim')
+        )
+
+    def _mais_vendidos(self, consulta: Dict, dados: Any):
+        dias = _inteiro(consulta.get('dias', 30), 'dias')
+        limite = _inteiro(consulta.get('limite', 10), 'limite')
+        criterio = consulta.get('criterio', 'unidades')
+        try:
+            if consulta.get('agrupar_por'):
+                return HTTPStatus.OK, self.produto_service.mais_vendidos_por_grupo(
+                    consulta['agrupar_por'], dias, limite, criterio
+                )
+            return HTTPStatus.OK, self.produto_service.mais_vendidos(
+                dias, limite, consulta.get('tipo_animal'), consulta.get('marca'), criterio
+            )
+        except ValueError as e:
+            raise ErroRequisicao(HTTPStatus.BAD_REQUEST, str(e))
+
+    def _velocidade_vendas(self, consulta: Dict, dados: Any, produto_id: str):
+        return HTTPStatus.OK, self.produto_service.velocidade_vendas(int(produto_id))
+
+    def _faturamento_diario(self, consulta: Dict, dados: Any):
+        return HTTPStatus.OK, self.venda_service.obter_faturamento_diario(
+            consulta.get('data_inicio'), consulta.get('data_fim')
+        )
+
+    def _buscar_venda(self, consulta: Dict, dados: Any, venda_id: str):
+        venda = self.venda_service.buscar_venda(int(venda_id))
+        if not venda:
+            raise ErroRequisicao(HTTPStatus.NOT_FOUND, f"Venda #{venda_id} não encontrada")
+        return HTTPStatus.OK, venda
+
+    def _criar_venda(self, consulta: Dict, dados: Any):
+        itens = [{'produto_id': _inteiro(item.get('produto_id'), 'produto_id'),
+                  'quantidade': _inteiro(item.get('quantidade'), 'quantidade')}
+                 for item in dados.get('itens') or []]
+        cliente_id = dados.get('cliente_id')
+        return self._resposta_servico(self.venda_service.criar_venda(
+            _inteiro(cliente_id, 'cliente_id') if cliente_id is not None else None,
+            itens,
+            str(dados.get('forma_pagamento') or 'Dinheiro'),
+            _numero(dados.get('desconto', 0), 'desconto'),
+            str(dados.get('observacoes') or ''),
+            _chave(dados)
+        ))
+
+    def _cancelar_venda(self, consulta: Dict, dados: Any, venda_id: str):
+        sucesso, mensagem = self.venda_service.cancelar_venda(
+            int(venda_id), str(dados.get('motivo') or ''), _chave(dados)
+        )
+        if not sucesso:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {'erro': mensagem}
+        return HTTPStatus.OK, {'mensagem': mensagem}
+
+    def _alertas_estoque(self, consulta: Dict, dados: Any):
+        return HTTPStatus.OK, self.estoque_service.produtos_alertas()
+
+    def _previsao_estoque(self, consulta: Dict, dados: Any):
+        return HTTPStatus.OK, self.estoque_service.previsao_ruptura()
+
+    def _reposicao_estoque(self, consulta: Dict, dados: Any):
+        prazo = consulta.get('prazo_reposicao')
+        cobertura = consulta.get('cobertura_dias')
+        return HTTPStatus.OK, self.estoque_service.sugestoes_reposicao(
+            _inteiro(prazo, 'prazo_reposicao') if prazo else None,
+            _inteiro(cobertura, 'cobertura_dias') if cobertura else None
+        )
+
+    def _estoque_historico(self, consulta: Dict, dados: Any):
+        if not consulta.get('data'):
+            raise ErroRequisicao(HTTPStatus.BAD_REQUEST, "Parâmetro 'data' é obrigatório")
+        if consulta.get('produto_id'):
+            produto_id = _inteiro(consulta['produto_id'], 'produto_id')
+            estoque = self.estoque_service.estoque_em(produto_id, consulta['data'])
+            if estoque is None:
+                raise ErroRequisicao(HTTPStatus.NOT_FOUND, f"Produto #{produto_id} não encontrado na data")
+            return HTTPStatus.OK, {'produto_id': produto_id, 'estoque': estoque}
+        return HTTPStatus.OK, self.estoque_service.inventario_em(consulta['data'])
+
+    def _entrada_estoque(self, consulta: Dict, dados: Any):
+        return self._resposta_servico(self.estoque_service.entrada_estoque(
+            _inteiro(dados.get('produto_id'), 'produto_id'),
+            _inteiro(dados.get('quantidade'), 'quantidade'),
+            str(dados.get('observacao') or '')
+        ))
+
+    def _saida_estoque(self, consulta: Dict, dados: Any):
+        return self._resposta_servico(self.estoque_service.saida_estoque(
+            _inteiro(dados.get('produto_id'), 'produto_id'),
+            _inteiro(dados.get('quantidade'), 'quantidade'),
+            str(dados.get('observacao') or '')
+        ))
+
+    def _receber_entrega(self, consulta: Dict, dados: Any):
+        itens = [{'produto_id': _inteiro(item.get('produto_id'), 'produto_id'),
+                  'quantidade': _inteiro(item.get('quantidade'), 'quantidade')}
+                 for item in dados.get('itens') or []]
+        return self._resposta_servico(self.estoque_service.receber_entrega(
+            str(dados.get('referencia') or ''), itens, str(dados.get('observacao') or '')
+        ))
+
+    def _metricas(self, consulta: Dict, dados: Any):
+        # Dentro de /lote o texto vai como string JSON; a rota direta responde text/plain
+        return HTTPStatus.OK, METRICAS.exportar()
+
+    # ==================== DESPACHO ====================
+
+    def _localizar_rota(self, metodo: str, caminho: str):
+        """Retorna (handler, tipo, grupos) da rota ou levanta 404/405"""
+        caminho_existe = False
+        for metodo_rota, padrao, handler, tipo in self._rotas:
+            encontrado = padrao.match(caminho)
+            if not encontrado:
+                continue
+            if metodo_rota == metodo:
+                return handler, tipo, encontrado.groups()
+            caminho_existe = True
+
+        if caminho_existe:
+            raise ErroRequisicao(HTTPStatus.METHOD_NOT_ALLOWED, f"Método {metodo} não permitido")
+        raise ErroRequisicao(HTTPStatus.NOT_FOUND, f"Rota não encontrada: {caminho}")
+
+    async def _executar(self, tipo: str, handler, consulta: Dict, dados: Any, grupos) -> Tuple[int, Any]:
+        """Executa o handler no escritor único ou no pool de leitura"""
+        pool = self._escritor if tipo == 'escrita' else self._leitores
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, partial(handler, consulta, dados, *grupos))
+
+    def _versao_dados(self) -> Optional[int]:
+        """Versão do banco (muda a cada commit de qualquer conexão); None se ocupado"""
+        try:
+            return self._monitor.execute('PRAGMA data_version').fetchone()[0]
+        except sqlite3.Error:
+            return None
+
+    async def _responder_catalogo(self, handler, consulta: Dict, grupos, chave: str,
+                                  if_none_match: str) -> Tuple[int, Dict[str, str], bytes]:
+        """Atende endpoints de catálogo com ETag, If-None-Match e cache por versão"""
+        versao = self._versao_dados()
+        if versao is None:
+            status, corpo = await self._executar('catalogo', handler, consulta, None, grupos)
+            return status, {}, self._serializar(corpo)
+
+        etag = f'"{self._instancia}-{versao}-{zlib.crc32(chave.encode()):08x}"'
+        if etag in (tag.strip() for tag in if_none_match.split(',')):
+            METRICA_CATALOGO['nao_modificado'].incrementar()
+            return HTTPStatus.NOT_MODIFIED, {'ETag': etag}, b''
+
+        em_cache = self._cache_catalogo.get(chave)
+        if em_cache and em_cache[0] == etag:
+            self._cache_catalogo.move_to_end(chave)
+            METRICA_CATALOGO['cache'].incrementar()
+            return HTTPStatus.OK, {'ETag': etag}, em_cache[1]
+
+        METRICA_CATALOGO['banco'].incrementar()
+
+        status, corpo = await self._executar('catalogo', handler, consulta, None, grupos)
+        conteudo = self._serializar(corpo)
+        if status != HTTPStatus.OK:
+            return status, {}, conteudo
+
+        self._cache_catalogo[chave] = (etag, conteudo)
+        self._cache_catalogo.move_to_end(chave)
+        if len(self._cache_catalogo) > API_CONFIG['cache_catalogo']:
+            self._cache_catalogo.popitem(last=False)
+        return status, {'ETag': etag}, conteudo
+
+    async def _executar_lote(self, dados: Any) -> Tuple[int, Any]:
+        """
+        Executa várias sub-requisições {'metodo', 'caminho', 'dados'} em ordem
+        Escritas consecutivas vão juntas ao escritor em uma única chamada;
+        leituras consecutivas rodam em paralelo no pool de leitura.
+        """
+        if not isinstance(dados, list) or len(dados) > 100:
+            raise ErroRequisicao(HTTPStatus.BAD_REQUEST, "Lote deve ser uma lista com até 100 requisições")
+
+        def executar_grupo(chamadas):
+            respostas = []
+            for handler, consulta, sub_dados, grupos in chamadas:
+                respostas.append(self._executar_protegido(handler, consulta, sub_dados, grupos))
+            return respostas
+
+        respostas: List[Any] = [None] * len(dados)
+        grupos_execucao = []  # [(tipo, [(indice, chamada)])]
+        for indice, sub in enumerate(dados):
+            try:
+                if not isinstance(sub, dict):
+                    raise ErroRequisicao(HTTPStatus.BAD_REQUEST, "Sub-requisição inválida")
+                url = urlsplit(str(sub.get('caminho') or ''))
+                handler, tipo, grupos = self._localizar_rota(str(sub.get('metodo') or 'GET').upper(), url.path)
+                if tipo == 'lote':
+                    raise ErroRequisicao(HTTPStatus.BAD_REQUEST, "Lotes não podem ser aninhados")
+            except ErroRequisicao as e:
+                respostas[indice] = {'status': e.status, 'corpo': {'erro': str(e)}}
+                continue
+
+            tipo = 'escrita' if tipo == 'escrita' else 'leitura'
+            chamada = (handler, dict(parse_qsl(url.query)), sub.get('dados') or {}, grupos)
+            if grupos_execucao and grupos_execucao[-1][0] == tipo:
+                grupos_execucao[-1][1].append((indice, chamada))
+            else:
+                grupos_execucao.append((tipo, [(indice, chamada)]))
+
+        loop = asyncio.get_running_loop()
+        for tipo, chamadas in grupos_execucao:
+            if tipo == 'escrita':
+                resultados = await loop.run_in_executor(
+                    self._escritor, executar_grupo, [chamada for _, chamada in chamadas]
+                )
+            else:
+                resultados = await asyncio.gather(*(
+                    loop.run_in_executor(self._leitores, executar_grupo, [chamada])
+                    for _, chamada in chamadas
+                ))
+                resultados = [resultado[0] for resultado in resultados]
+            for (indice, _), resultado in zip(chamadas, resultados):
+                respostas[indice] = resultado
+
+        return HTTPStatus.OK, respostas
+
+    def _executar_protegido(self, handler, consulta: Dict, dados: Any, grupos) -> Dict:
+        """Executa um handler de sub-requisição convertendo erros em resposta"""
+        try:
+            status, corpo = handler(consulta, dados, *grupos)
+            return {'status': int(status), 'corpo': corpo}
+        except ErroRequisicao as e:
+            return {'status': e.status, 'corpo': {'erro': str(e)}}
+        except Exception as e:
+            print(f"❌ Erro na API: {e}")
+            return {'status': HTTPStatus.INTERNAL_SERVER_ERROR, 'corpo': {'erro': "Erro interno"}}
+
+    def _serializar(self, corpo: Any) -> bytes:
+        return json.dumps(corpo, default=_para_json, ensure_ascii=False).encode('utf-8')
+
+    async def _processar(self, metodo: str, alvo: str, cabecalhos: Dict[str, str],
+                         corpo: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """Processa uma requisição HTTP completa e retorna (status, cabeçalhos, corpo)"""
+        try:
+            url = urlsplit(alvo)
+            handler, tipo, grupos = self._localizar_rota(metodo, url.path)
+            consulta = dict(parse_qsl(url.query))
+
+            dados = {}
+            if corpo:
+                try:
+                    dados = json.loads(corpo)
+                except ValueError:
+                    raise ErroRequisicao(HTTPStatus.BAD_REQUEST, "Corpo JSON inválido")
+
+            if tipo == 'catalogo':
+                return await self._responder_catalogo(
+                    handler, consulta, grupos, alvo, cabecalhos.get('if-none-match', '')
+                )
+            if tipo == 'metricas':
+                _, texto = handler(consulta, dados)
+                return HTTPStatus.OK, {'Content-Type': TIPO_CONTEUDO}, texto.encode('utf-8')
+            if tipo == 'lote':
+                status, resposta = await self._executar_lote(dados)
+            else:
+                if tipo == 'escrita' and not isinstance(dados, dict):
+                    raise ErroRequisicao(HTTPStatus.BAD_REQUEST, "Corpo deve ser um objeto JSON")
+                if tipo == 'escrita' and 'idempotency-key' in cabecalhos:
+                    dados.setdefault('chave_idempotencia', cabecalhos['idempotency-key'])
+                status, resposta = await self._executar(tipo, handler, consulta, dados, grupos)
+            return status, {}, self._serializar(resposta)
+        except ErroRequisicao as e:
+            return e.status, {}, self._serializar({'erro': str(e)})
+        except Exception as e:
+            print(f"❌ Erro na API: {e}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {}, self._serializar({'erro': "Erro interno"})
+
+    # ==================== PROTOCOLO HTTP ====================
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atende uma conexão HTTP/1.1 (com keep-alive)"""
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                metodo, alvo, versao = linha.decode('latin-1').split()
+
+                cabecalhos = {}
+                while True:
+                    linha = await reader.readline()
+                    if linha in (b'\r\n', b'\n', b''):
+                        break
+                    nome, _, valor = linha.decode('latin-1').partition(':')
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                tamanho = int(cabecalhos.get('content-length') or 0)
+                if tamanho > API_CONFIG['tamanho_maximo_corpo']:
+                    status, extras, resposta = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {}, b''
+                    fechar = True
+                else:
+                    corpo = await reader.readexactly(tamanho) if tamanho else b''
+                    status, extras, resposta = await self._processar(metodo.upper(), alvo, cabecalhos, corpo)
+                    fechar = (cabecalhos.get('connection', '').lower() == 'close'
+                              or versao == 'HTTP/1.0')
+
+                status = HTTPStatus(status)
+                linhas = [f"HTTP/1.1 {status.value} {status.phrase}"]
+                tipo_conteudo = extras.pop('Content-Type', "application/json; charset=utf-8")
+                if status != HTTPStatus.NOT_MODIFIED:
+                    linhas.append(f"Content-Type: {tipo_conteudo}")
+                    linhas.append(f"Content-Length: {len(resposta)}")
+                linhas.extend(f"{nome}: {valor}" for nome, valor in extras.items())
+                if fechar:
+                    linhas.append("Connection: close")
+                writer.write(('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1') + resposta)
+                await writer.drain()
+
+                if fechar:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    # ==================== CICLO DE VIDA ====================
+
+    async def iniciar(self):
+        """Abre o socket do servidor (porta 0 escolhe uma porta livre)"""
+        self._monitor = sqlite3.connect(self.db.db_path, timeout=0, check_same_thread=False)
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.porta)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+
+    async def parar(self):
+        """Encerra o servidor, os pools e as conexões"""
+        if self._servidor:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        self._escritor.shutdown(wait=True)
+        self._leitores.shutdown(wait=True)
+        # Conexões de cada thread dos pools (escritor e todos os leitores)
+        self.db.fechar_conexoes()
+        if self._monitor:
+            self._monitor.close()
+
+    async def servir(self):
+        """Inicia o servidor e atende requisições até ser interrompido"""
+        await self.iniciar()
+        print(f"✅ API disponível em http://{self.host}:{self.porta}")
+        try:
+            await self._servidor.serve_forever()
+        finally:
+            await self.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor REST local do Marte Pet Shop")
+    parser.add_argument('--host', default=API_CONFIG['host'])
+    parser.add_argument('--porta', type=int, default=API_CONFIG['porta'])
+    parser.add_argument('--leitores', type=int, default=API_CONFIG['leitores'])
+    parser.add_argument('--db', default=None, help="Caminho do banco (padrão: config)")
+    args = parser.parse_args()
+
+    servidor = ServidorAPI(args.db, args.host, args.porta, args.leitores)
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        print("\n🛑 API encerrada")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,4 @@
+"""
+Benchmarks de desempenho do sistema (executar a partir da raiz do projeto)
+Ex.: python -m benchmarks.bench_importacao_clientes
+"""
@@ -0,0 +1,94 @@
+"""
+Benchmark: latência e vazão de vendas em cada modo de durabilidade
+
+Para cada modo ('estrita', 'normal', 'grupo') mede a latência por venda com um
+terminal e a vazão com vários terminais simultâneos. Rode no mesmo tipo de
+armazenamento dos quiosques (ex.: cartão SD) para números representativos;
+use --pasta para apontar o diretório do banco de teste.
+
+Uso: python -m benchmarks.bench_durabilidade [--terminais 8] [--vendas 100] [--pasta DIR]
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from database import DatabaseManager
+from database.db_manager import MODOS_DURABILIDADE
+from business import VendaService, EstoqueService
+
+from .bench_fila_escrita import gerar_carrinho
+
+
+def preparar_banco(caminho: str, durabilidade: str) -> VendaService:
+    """Cria o banco de teste no modo informado, com estoque suficiente"""
+    db = DatabaseManager(caminho, durabilidade=durabilidade)
+    EstoqueService(db).receber_entrega(
+        'BENCH', [{'produto_id': pid, 'quantidade': 1000000} for pid in range(1, 11)]
+    )
+    return VendaService(db)
+
+
+def medir(service: VendaService, terminais: int, vendas: int) -> tuple:
+    """Retorna (tempo total, latências em ms, falhas)"""
+    latencias = []
+    falhas = []
+    trava = threading.Lock()
+    barreira = threading.Barrier(terminais + 1)
+
+    def terminal(semente: int):
+        rng = random.Random(semente)
+        locais = []
+        erros = 0
+        barreira.wait()
+        for _ in range(vendas):
+            inicio = time.perf_counter()
+            sucesso, _, _ = service.criar_venda(None, gerar_carrinho(rng), 'PIX')
+            locais.append((time.perf_counter() - inicio) * 1000)
+            erros += not sucesso
+        with trava:
+            latencias.extend(locais)
+            falhas.append(erros)
+
+    threads = [threading.Thread(target=terminal, args=(i,)) for i in range(terminais)]
+    for thread in threads:
+        thread.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - inicio, latencias, sum(falhas)
+
+
+def percentil(valores, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--terminais', type=int, default=8)
+    parser.add_argument('--vendas', type=int, default=100, help="Vendas por terminal")
+    parser.add_argument('--pasta', help="Diretório do banco de teste (padrão: temporário)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.pasta) as pasta:
+        print(f"\n{'Modo':<10}{'Terminais':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}"
+              f"{'Vendas/s':>10}{'Falhas':>8}")
+        for modo in MODOS_DURABILIDADE:
+            for terminais in (1, args.terminais):
+                service = preparar_banco(str(Path(pasta) / f'{modo}_{terminais}.db'), modo)
+                tempo, latencias, falhas = medir(service, terminais, args.vendas)
+                if service._fila_grupo is not None:
+                    service._fila_grupo.encerrar()
+                total = terminais * args.vendas
+                print(f"{modo:<10}{terminais:>10}{statistics.median(latencias):>10.2f}"
+                      f"{percentil(latencias, 0.99):>10.2f}{(total - falhas) / tempo:>10.0f}"
+                      f"{falhas:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: vendas/segundo com vários terminais simultâneos
+
+Compara o caminho atual (cada terminal chama criar_venda, uma conexão e um
+commit por venda, disputando o bloqueio de escrita) com a FilaEscrita
+(escritor único com group commit em micro-lotes).
+
+Uso: python -m benchmarks.bench_fila_escrita [--terminais 8] [--vendas 200]
+"""
+import argparse
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from database import DatabaseManager
+from business import VendaService, EstoqueService, FilaEscrita
+
+
+def preparar_banco(caminho: str) -> VendaService:
+    """Cria o banco de teste com estoque suficiente para todas as vendas"""
+    db = DatabaseManager(caminho)
+    EstoqueService(db).receber_entrega(
+        'BENCH', [{'produto_id': pid, 'quantidade': 1000000} for pid in range(1, 11)]
+    )
+    return VendaService(db)
+
+
+def gerar_carrinho(rng: random.Random):
+    return [{'produto_id': pid, 'quantidade': rng.randint(1, 3)}
+            for pid in rng.sample(range(1, 11), rng.randint(1, 4))]
+
+
+def executar_terminais(terminais: int, vendas: int, vender) -> tuple:
+    """Dispara os terminais em paralelo; vender(carrinho) -> mensagem de erro ou None"""
+    erros = Counter()
+    barreira = threading.Barrier(terminais + 1)
+
+    def terminal(semente: int):
+        rng = random.Random(semente)
+        barreira.wait()
+        for _ in range(vendas):
+            erro = vender(gerar_carrinho(rng))
+            if erro:
+                erros['database is locked' if 'locked' in erro else erro] += 1
+
+    threads = [threading.Thread(target=terminal, args=(i,)) for i in range(terminais)]
+    for thread in threads:
+        thread.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - inicio, erros
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--terminais', type=int, default=8)
+    parser.add_argument('--vendas', type=int, default=200, help="Vendas por terminal")
+    args = parser.parse_args()
+    total = args.terminais * args.vendas
+
+    with tempfile.TemporaryDirectory() as pasta:
+        # Caminho atual: conexão e commit por venda em cada terminal
+        service = preparar_banco(str(Path(pasta) / 'direto.db'))
+
+        def vender_direto(carrinho):
+            sucesso, mensagem, _ = service.criar_venda(None, carrinho, 'PIX')
+            return None if sucesso else mensagem
+
+        tempo_direto, erros_direto = executar_terminais(args.terminais, args.vendas, vender_direto)
+
+        # Escritor único com group commit
+        service = preparar_banco(str(Path(pasta) / 'fila.db'))
+        fila = FilaEscrita(service)
+
+        def vender_fila(carrinho):
+            try:
+                sucesso, mensagem, _ = fila.enviar_venda(None, carrinho, 'PIX').result()
+                return None if sucesso else mensagem
+            except Exception as e:
+                return str(e)
+
+        tempo_fila, erros_fila = executar_terminais(args.terminais, args.vendas, vender_fila)
+        fila.encerrar()
+
+    print(f"\n{args.terminais} terminais x {args.vendas} vendas = {total} vendas\n")
+    print(f"{'Caminho':<24}{'Tempo (s)':>12}{'Vendas/s':>12}{'Falhas':>10}")
+    for nome, tempo, erros in (("Conexão por venda", tempo_direto, erros_direto),
+                               ("Fila (escritor único)", tempo_fila, erros_fila)):
+        falhas = sum(erros.values())
+        print(f"{nome:<24}{tempo:>12.3f}{(total - falhas) / tempo:>12.0f}{falhas:>10}")
+        for erro, quantidade in erros.most_common(3):
+            print(f"    {quantidade}x {erro}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: custo por célula dos formatadores usados nas tabelas
+
+Simula o preenchimento de uma tabela com muitos valores repetidos (preços
+e datas), comparando as implementações originais com a camada atual.
+
+Uso: python -m benchmarks.bench_formatadores [--linhas 5000] [--atualizacoes 20]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from utils import formatters
+
+
+# ---------- Implementações originais (referência) ----------
+
+def formatar_moeda_original(valor: float) -> str:
+    return f"R$ {valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def formatar_data_original(data: str, formato_entrada: str = "%Y-%m-%d %H:%M:%S",
+                           formato_saida: str = "%d/%m/%Y") -> str:
+    try:
+        return datetime.strptime(data, formato_entrada).strftime(formato_saida)
+    except (TypeError, ValueError):
+        return data
+
+
+# ---------- Execução ----------
+
+def ns_por_celula(funcao, celulas: int, atualizacoes: int) -> float:
+    """Executa a atualização completa várias vezes e retorna ns por célula"""
+    inicio = time.perf_counter()
+    for _ in range(atualizacoes):
+        funcao()
+    return (time.perf_counter() - inicio) / (celulas * atualizacoes) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=5000)
+    parser.add_argument('--atualizacoes', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    precos = [round(rng.choice(range(10, 400)) + rng.choice((0.5, 0.9, 0.0)), 2) for _ in range(args.linhas)]
+    base = datetime(2024, 1, 1)
+    datas = [(base + timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 30) * 60))
+             .strftime("%Y-%m-%d %H:%M:%S") for _ in range(args.linhas)]
+
+    assert [formatar_moeda_original(p) for p in precos] == formatters.formatar_moeda_coluna(precos)
+    assert [formatar_data_original(d) for d in datas] == formatters.formatar_data_coluna(datas)
+
+    formatters.formatar_moeda.cache_clear()
+    formatters.formatar_data.cache_clear()
+
+    cenarios = [
+        ("Moeda",
+         lambda: [formatar_moeda_original(p) for p in precos],
+         lambda: formatters.formatar_moeda_coluna(precos)),
+        ("Data",
+         lambda: [formatar_data_original(d) for d in datas],
+         lambda: formatters.formatar_data_coluna(datas)),
+    ]
+
+    print(f"\n{args.linhas} linhas x {args.atualizacoes} atualizações (ns por célula; menor é melhor)\n")
+    print(f"{'Coluna':<12}{'Original':>12}{'Atual':>12}{'Ganho':>10}")
+    for nome, original, atual in cenarios:
+        antes = ns_por_celula(original, args.linhas, args.atualizacoes)
+        depois = ns_por_celula(atual, args.linhas, args.atualizacoes)
+        print(f"{nome:<12}{antes:>12.0f}{depois:>12.0f}{antes / depois:>9.1f}x")
+
+    for nome, funcao in (("moeda", formatters.formatar_moeda), ("data", formatters.formatar_data)):
+        info = funcao.cache_info()
+        taxa = info.hits / max(1, info.hits + info.misses)
+        print(f"\nCache {nome}: {info.currsize}/{info.maxsize} entradas, taxa de acerto {taxa:.1%}", end='')
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: importação de clientes em lote x cadastro individual
+
+Uso: python -m benchmarks.bench_importacao_clientes [--clientes 5000]
+"""
+import argparse
+import csv
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from database import DatabaseManager, Cliente
+from business import ClienteService
+
+
+def gerar_cpf(rng: random.Random) -> str:
+    """Gera um CPF válido aleatório"""
+    base = [rng.randint(0, 9) for _ in range(9)]
+    for pesos in (range(10, 1, -1), range(11, 1, -1)):
+        soma = sum(d * p for d, p in zip(base, pesos))
+        base.append(soma * 10 % 11 % 10)
+    return ''.join(map(str, base))
+
+
+def gerar_linhas(quantidade: int, semente: int = 42):
+    """Gera linhas de clientes com ~2% de CPFs inválidos e ~2% de duplicados"""
+    rng = random.Random(semente)
+    cpfs = []
+    for i in range(quantidade):
+        sorteio = rng.random()
+        if sorteio < 0.02 and cpfs:
+            cpf = rng.choice(cpfs)
+        elif sorteio < 0.04:
+            cpf = f"{rng.randint(0, 10**11 - 1):011d}"
+        else:
+            cpf = gerar_cpf(rng)
+        cpfs.append(cpf)
+        yield {
+            'nome': f"Cliente {i}",
+            'cpf': cpf,
+            'telefone': f"(27) 9{rng.randint(0, 99999999):08d}",
+            'email': f"cliente{i}@exemplo.com",
+            'endereco': f"Rua {i}, Vitória - ES"
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clientes', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta = Path(pasta)
+        linhas = list(gerar_linhas(args.clientes))
+
+        planilha = pasta / 'clientes.csv'
+        with open(planilha, 'w', encoding='utf-8', newline='') as arquivo:
+            escritor = csv.DictWriter(arquivo, fieldnames=list(linhas[0]), delimiter=';')
+            escritor.writeheader()
+            escritor.writerows(linhas)
+
+        # Caminho atual: um cadastro (e várias conexões) por cliente
+        service = ClienteService(DatabaseManager(str(pasta / 'por_linha.db')))
+        inicio = time.perf_counter()
+        for dados in linhas:
+            service.cadastrar_cliente(Cliente(**dados))
+        tempo_linha = time.perf_counter() - inicio
+
+        # Importação em lote
+        service = ClienteService(DatabaseManager(str(pasta / 'lote.db')))
+        inicio = time.perf_counter()
+        relatorio = service.importar_clientes(planilha)
+        tempo_lote = time.perf_counter() - inicio
+        if relatorio['arquivo_rejeitados']:
+            Path(relatorio['arquivo_rejeitados']).unlink()
+
+    print(f"\n{'Caminho':<20}{'Tempo (s)':>12}{'Clientes/s':>14}")
+    print(f"{'Por linha':<20}{tempo_linha:>12.3f}{args.clientes / tempo_linha:>14.0f}")
+    print(f"{'Em lote':<20}{tempo_lote:>12.3f}{args.clientes / tempo_lote:>14.0f}")
+    print(f"\nInseridos: {relatorio['inseridos']}  Rejeitados: {len(relatorio['rejeitados'])}  "
+          f"Conflitos: {len(relatorio['conflitos'])}  Ganho: {tempo_linha / tempo_lote:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
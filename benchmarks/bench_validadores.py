@@ -0,0 +1,102 @@
+"""
+Micro-benchmark dos validadores usados na importação e no checkout
+
+Compara as implementações originais (regex recompilada, somas com geradores)
+com o módulo atual, chamada a chamada e nas APIs em lote.
+
+Uso: python -m benchmarks.bench_validadores [--linhas 20000]
+"""
+import argparse
+import random
+import re
+import time
+
+from utils import validators
+from benchmarks.bench_importacao_clientes import gerar_cpf
+
+
+# ---------- Implementações originais (referência) ----------
+
+def validar_cpf_original(cpf: str) -> bool:
+    cpf = re.sub(r'\D', '', cpf)
+    if len(cpf) != 11 or cpf == cpf[0] * 11:
+        return False
+    soma = sum(int(cpf[i]) * (10 - i) for i in range(9))
+    if (soma * 10 % 11) % 10 != int(cpf[9]):
+        return False
+    soma = sum(int(cpf[i]) * (11 - i) for i in range(10))
+    return (soma * 10 % 11) % 10 == int(cpf[10])
+
+
+def validar_telefone_original(telefone: str) -> bool:
+    telefone = re.sub(r'\D', '', telefone)
+    if len(telefone) not in [10, 11]:
+        return False
+    return 11 <= int(telefone[:2]) <= 99
+
+
+def validar_email_original(email: str) -> bool:
+    padrao = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return re.match(padrao, email) is not None
+
+
+# ---------- Execução ----------
+
+def medir(funcao, *args, repeticoes: int = 5) -> float:
+    """Retorna o melhor tempo (s) entre as repetições"""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    cpfs = [gerar_cpf(rng) for _ in range(args.linhas)]
+    cpfs_formatados = [f"{c[:3]}.{c[3:6]}.{c[6:9]}-{c[9:]}" for c in cpfs]
+    telefones = [f"(27) 9{rng.randint(0, 99999999):08d}" for _ in range(args.linhas)]
+    emails = [f"cliente{i}@exemplo.com.br" for i in range(args.linhas)]
+    totais = [rng.uniform(10, 500) for _ in range(args.linhas)]
+
+    assert [validar_cpf_original(c) for c in cpfs_formatados] == validators.validar_cpf_lote(cpfs_formatados)
+
+    cenarios = [
+        ("CPF limpo (importação)",
+         lambda: [validar_cpf_original(c) for c in cpfs],
+         lambda: [validators.validar_cpf(c) for c in cpfs],
+         lambda: validators.validar_cpf_lote(cpfs)),
+        ("CPF formatado (checkout)",
+         lambda: [validar_cpf_original(c) for c in cpfs_formatados],
+         lambda: [validators.validar_cpf(c) for c in cpfs_formatados],
+         lambda: validators.validar_cpf_lote(cpfs_formatados)),
+        ("Telefone",
+         lambda: [validar_telefone_original(t) for t in telefones],
+         lambda: [validators.validar_telefone(t) for t in telefones],
+         lambda: validators.validar_telefone_lote(telefones)),
+        ("E-mail",
+         lambda: [validar_email_original(e) for e in emails],
+         lambda: [validators.validar_email(e) for e in emails],
+         lambda: validators.validar_email_lote(emails)),
+        ("Desconto (checkout)",
+         None,
+         lambda: [validators.validar_desconto(t * 0.1, t) for t in totais],
+         None),
+    ]
+
+    print(f"\n{args.linhas} linhas por cenário (linhas/s; maior é melhor)\n")
+    print(f"{'Cenário':<28}{'Original':>14}{'Atual':>14}{'Lote':>14}")
+    for nome, original, atual, lote in cenarios:
+        colunas = []
+        for funcao in (original, atual, lote):
+            colunas.append(f"{args.linhas / medir(funcao):>14,.0f}" if funcao else f"{'-':>14}")
+        print(f"{nome:<28}{''.join(colunas)}")
+
+
+if __name__ == '__main__':
+    main()
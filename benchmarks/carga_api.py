@@ -0,0 +1,173 @@
+"""
+Teste de carga da API REST local
+
+Sem --url, sobe uma instância local da API com um banco temporário (com
+estoque reforçado para as vendas) e dispara requisições concorrentes com
+conexões keep-alive, misturando consultas de catálogo (com If-None-Match),
+consultas de produto e vendas.
+
+Uso: python -m benchmarks.carga_api [--url http://127.0.0.1:8765]
+                                    [--conexoes 50] [--requisicoes 5000]
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from api import ServidorAPI
+
+
+class ClienteHTTP:
+    """Cliente HTTP/1.1 mínimo com keep-alive"""
+
+    def __init__(self, host: str, porta: int):
+        self.host = host
+        self.porta = porta
+        self.reader = None
+        self.writer = None
+
+    async def requisitar(self, metodo: str, caminho: str, corpo=None, cabecalhos=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.porta)
+
+        dados = json.dumps(corpo).encode('utf-8') if corpo is not None else b''
+        linhas = [f"{metodo} {caminho} HTTP/1.1", f"Host: {self.host}", f"Content-Length: {len(dados)}"]
+        linhas += [f"{nome}: {valor}" for nome, valor in (cabecalhos or {}).items()]
+        self.writer.write(('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1') + dados)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        resposta = {}
+        while True:
+            linha = await self.reader.readline()
+            if linha in (b'\r\n', b''):
+                break
+            nome, _, valor = linha.decode('latin-1').partition(':')
+            resposta[nome.strip().lower()] = valor.strip()
+        tamanho = int(resposta.get('content-length') or 0)
+        conteudo = await self.reader.readexactly(tamanho) if tamanho else b''
+        return status, resposta, conteudo
+
+    async def fechar(self):
+        if self.writer:
+            self.writer.close()
+
+
+async def executar_carga(host: str, porta: int, conexoes: int, requisicoes: int, semente: int = 1):
+    """Dispara a carga e retorna latências por cenário e contagem de status"""
+    rng = random.Random(semente)
+    latencias = defaultdict(list)
+    status_contagem = Counter()
+    restantes = [requisicoes]
+
+    inicial = ClienteHTTP(host, porta)
+    _, _, conteudo = await inicial.requisitar('GET', '/produtos')
+    await inicial.fechar()
+    produto_ids = [p['id'] for p in json.loads(conteudo)]
+
+    async def trabalhador():
+        cliente = ClienteHTTP(host, porta)
+        etag = None
+        try:
+            while restantes[0] > 0:
+                restantes[0] -= 1
+                sorteio = rng.random()
+                inicio = time.perf_counter()
+                if sorteio < 0.5:
+                    cenario = 'catalogo'
+                    cabecalhos = {'If-None-Match': etag} if etag else None
+                    status, resposta, _ = await cliente.requisitar('GET', '/produtos', cabecalhos=cabecalhos)
+                    etag = resposta.get('etag', etag)
+                elif sorteio < 0.8:
+                    cenario = 'produto'
+                    status, _, _ = await cliente.requisitar('GET', f'/produtos/{rng.choice(produto_ids)}')
+                else:
+                    cenario = 'venda'
+                    itens = [{'produto_id': pid, 'quantidade': rng.randint(1, 3)}
+                             for pid in rng.sample(produto_ids, rng.randint(1, 3))]
+                    status, _, _ = await cliente.requisitar(
+                        'POST', '/vendas', {'itens': itens, 'forma_pagamento': 'PIX'}
+                    )
+                latencias[cenario].append(time.perf_counter() - inicio)
+                status_contagem[status] += 1
+        finally:
+            await cliente.fechar()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(conexoes)))
+    return latencias, status_contagem, time.perf_counter() - inicio
+
+
+def iniciar_instancia_local(db_path: str):
+    """Sobe a API em uma thread própria e retorna (servidor, loop, thread)"""
+    servidor = ServidorAPI(db_path, porta=0)
+    servidor.estoque_service.receber_entrega(
+        'CARGA-INICIAL', [{'produto_id': p.id, 'quantidade': 100000}
+                          for p in servidor.produto_service.listar_produtos()]
+    )
+    loop = asyncio.new_event_loop()
+    pronto = threading.Event()
+
+    def executar():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(servidor.iniciar())
+        pronto.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=executar, daemon=True)
+    thread.start()
+    pronto.wait()
+    return servidor, loop, thread
+
+
+def percentil(valores, p: float) -> float:
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help="API já em execução (padrão: sobe uma instância local)")
+    parser.add_argument('--conexoes', type=int, default=50)
+    parser.add_argument('--requisicoes', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        local = None
+        if args.url:
+            url = urlsplit(args.url)
+            host, porta = url.hostname, url.port or 80
+        else:
+            local = iniciar_instancia_local(str(Path(pasta) / 'carga.db'))
+            host, porta = local[0].host, local[0].porta
+
+        latencias, status, duracao = asyncio.run(
+            executar_carga(host, porta, args.conexoes, args.requisicoes)
+        )
+
+        if local:
+            servidor, loop, thread = local
+            asyncio.run_coroutine_threadsafe(servidor.parar(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+
+    total = sum(len(v) for v in latencias.values())
+    print(f"\n{total} requisições em {duracao:.2f}s com {args.conexoes} conexões "
+          f"({total / duracao:,.0f} req/s)\n")
+    print(f"{'Cenário':<12}{'Qtd':>8}{'p50 (ms)':>12}{'p95 (ms)':>12}{'p99 (ms)':>12}{'Média (ms)':>12}")
+    for cenario, valores in sorted(latencias.items()):
+        print(f"{cenario:<12}{len(valores):>8}{percentil(valores, .5) * 1000:>12.2f}"
+              f"{percentil(valores, .95) * 1000:>12.2f}{percentil(valores, .99) * 1000:>12.2f}"
+              f"{statistics.mean(valores) * 1000:>12.2f}")
+    print(f"\nStatus HTTP: {dict(sorted(status.items()))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Gerador de banco sintético para os benchmarks
+
+Cria produtos, clientes e vendas (com itens, movimentações de estoque
+encadeadas, resumo diário e um checkpoint de estoque) distribuídas nos
+últimos `dias` dias. Tudo é gravado em lote, direto no SQLite, e é
+reprodutível pela semente.
+
+Uso: python -m benchmarks.dados_sinteticos destino.db [--produtos 500] [--clientes 2000] [--vendas 50000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from config.settings import FORMAS_PAGAMENTO
+from database import DatabaseManager
+
+from .bench_importacao_clientes import gerar_cpf
+
+MARCAS = ['Premier', 'Golden', 'Royal Canin', 'Whiskas', 'Pedigree', 'Farmina', 'Guabi', 'Quatree']
+
+
+def gerar_banco(caminho: str, produtos: int = 500, clientes: int = 2000, vendas: int = 50000,
+                dias: int = 365, semente: int = 42) -> DatabaseManager:
+    """Cria (ou completa) o banco em `caminho` com os volumes informados"""
+    rng = random.Random(semente)
+    db = DatabaseManager(caminho)
+    agora = datetime.now(timezone.utc).replace(tzinfo=None)
+    inicio = agora - timedelta(days=dias)
+    formato = '%Y-%m-%d %H:%M:%S'
+
+    with db._get_transacao() as conn:
+        cursor = conn.cursor()
+
+        # Dados de exemplo do sistema passam a valer desde o início do período
+        cursor.execute('UPDATE produtos SET data_cadastro = ?', (inicio.strftime(formato),))
+        cursor.execute('UPDATE movimentacoes_estoque SET data_movimentacao = ?', (inicio.strftime(formato),))
+
+        cursor.executemany('''
+            INSERT INTO produtos (nome, tipo_animal, marca, peso, preco_custo, preco_venda,
+                                  estoque, estoque_minimo, codigo_barras, data_cadastro)
+            VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?)
+        ''', [
+            (f"Ração Sintética {i}", rng.choice(['cão', 'gato']), rng.choice(MARCAS),
+             rng.choice([1.0, 3.0, 10.1, 15.0]), custo, round(custo * rng.uniform(1.2, 1.8), 2),
+             rng.randint(3, 10), f"789{i:010d}", inicio.strftime(formato))
+            for i, custo in ((i, round(rng.uniform(10, 200), 2)) for i in range(produtos))
+        ])
+
+        cpfs = set()
+        while len(cpfs) < clientes:
+            cpfs.add(gerar_cpf(rng))
+        cursor.executemany('''
+            INSERT OR IGNORE INTO clientes (nome, cpf, telefone, email, endereco) VALUES (?, ?, ?, ?, ?)
+        ''', [(f"Cliente Sintético {i}", cpf, f"(27) 9{rng.randint(0, 99999999):08d}",
+               f"sintetico{i}@exemplo.com", f"Rua {i}, Vitória - ES")
+              for i, cpf in enumerate(sorted(cpfs))])
+
+        cursor.execute('SELECT id, preco_venda FROM produtos WHERE ativo = 1')
+        catalogo = [(row['id'], row['preco_venda']) for row in cursor.fetchall()]
+        cursor.execute('SELECT id, estoque FROM produtos')
+        estoque_inicial = {row['id']: row['estoque'] for row in cursor.fetchall()}
+        cursor.execute('SELECT id FROM clientes')
+        ids_clientes = [row['id'] for row in cursor.fetchall()]
+
+        # Sorteia as vendas em ordem cronológica (IDs crescem com o tempo)
+        instantes = sorted(rng.random() for _ in range(vendas))
+        linhas_vendas, linhas_itens, saidas = [], [], []
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM vendas")
+        venda_id = cursor.fetchone()[0]
+        for fracao in instantes:
+            venda_id += 1
+            data = (inicio + timedelta(seconds=fracao * dias * 86400)).strftime(formato)
+            itens = rng.sample(catalogo, min(len(catalogo), rng.choice([1, 1, 2, 2, 3, 4, 6])))
+            total = 0.0
+            for produto_id, preco in itens:
+                quantidade = rng.randint(1, 3)
+                subtotal = round(preco * quantidade, 2)
+                total += subtotal
+                linhas_itens.append((venda_id, produto_id, quantidade, preco, subtotal))
+                saidas.append((venda_id, data, produto_id, quantidade))
+            total = round(total, 2)
+            desconto = round(total * 0.05, 2) if rng.random() < 0.1 else 0.0
+            cancelada = rng.random() < 0.02
+            linhas_vendas.append((
+                venda_id, rng.choice(ids_clientes) if rng.random() < 0.7 else None, data,
+                total, desconto, round(total - desconto, 2), rng.choice(FORMAS_PAGAMENTO),
+                'Cancelada' if cancelada else 'Concluída'
+            ))
+        cursor.executemany('''
+            INSERT INTO vendas (id, cliente_id, data_venda, valor_total, desconto, valor_final,
+                                forma_pagamento, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', linhas_vendas)
+        cursor.executemany('''
+            INSERT INTO itens_venda (venda_id, produto_id, quantidade, preco_unitario, subtotal)
+            VALUES (?, ?, ?, ?, ?)
+        ''', linhas_itens)
+
+        # Cadeia de movimentações: entrada inicial que cobre tudo o que foi vendido
+        # (mais o estoque final sorteado), seguida das vendas
+        vendido: Dict[int, int] = {}
+        for _, _, produto_id, quantidade in saidas:
+            vendido[produto_id] = vendido.get(produto_id, 0) + quantidade
+        canceladas = {linha[0] for linha in linhas_vendas if linha[7] == 'Cancelada'}
+
+        movimentacoes = []
+        saldo = dict(estoque_inicial)
+        for produto_id, quantidade in sorted(vendido.items()):
+            entrada = quantidade + rng.choice([0, 1, 2, 5, 20, 50, 100])
+            movimentacoes.append((produto_id, 'ENTRADA', entrada, saldo[produto_id],
+                                  saldo[produto_id] + entrada, inicio.strftime(formato), 'Carga sintética', None))
+            saldo[produto_id] += entrada
+        for venda, data, produto_id, quantidade in saidas:
+            movimentacoes.append((produto_id, 'VENDA', quantidade, saldo[produto_id],
+                                  saldo[produto_id] - quantidade, data, f'Venda #{venda}', venda))
+            saldo[produto_id] -= quantidade
+            if venda in canceladas:
+                movimentacoes.append((produto_id, 'ENTRADA', quantidade, saldo[produto_id],
+                                      saldo[produto_id] + quantidade, data,
+                                      f'Cancelamento venda #{venda} - sintético', venda))
+                saldo[produto_id] += quantidade
+        cursor.executemany('''
+            INSERT INTO movimentacoes_estoque
+                (produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual,
+                 data_movimentacao, observacao, venda_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', movimentacoes)
+        cursor.executemany('UPDATE produtos SET estoque = ? WHERE id = ?',
+                           [(quantidade, produto_id) for produto_id, quantidade in saldo.items()])
+
+    db.reconstruir_resumo_diario()
+    db.criar_checkpoint_estoque()
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('destino')
+    parser.add_argument('--produtos', type=int, default=500)
+    parser.add_argument('--clientes', type=int, default=2000)
+    parser.add_argument('--vendas', type=int, default=50000)
+    parser.add_argument('--dias', type=int, default=365)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    gerar_banco(args.destino, args.produtos, args.clientes, args.vendas, args.dias, args.semente)
+    print(f"✅ Banco sintético gerado em {time.perf_counter() - inicio:.1f}s: {args.destino}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Suíte de benchmarks das camadas de banco e serviço
+
+Gera um banco sintético (benchmarks.dados_sinteticos) e mede os caminhos mais
+usados: criar_venda com carrinhos de tamanhos diferentes, listagens,
+estatísticas, alertas de estoque, busca de venda e backup. O resultado vai para
+um JSON; com --baseline, cada cenário é comparado com um resultado anterior e o
+processo termina com código 1 se algum ficou mais lento que a tolerância.
+
+Uso: python -m benchmarks.suite [--saida resultado.json] [--baseline base.json]
+                                [--tolerancia 0.25] [--vendas 50000] [--cenarios listar]
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from business import ClienteService, EstoqueService, ProdutoService, VendaService
+
+from .dados_sinteticos import gerar_banco
+
+
+def montar_cenarios(db, pasta: Path, rng: random.Random) -> List[Tuple[str, Callable[[], object]]]:
+    """Lista de (nome, função sem argumentos) medidos pela suíte"""
+    vendas = VendaService(db)
+    produtos = ProdutoService(db)
+    clientes = ClienteService(db)
+    estoque = EstoqueService(db)
+
+    with db._get_connection() as conn:
+        ids_produtos = [row[0] for row in conn.execute('SELECT id FROM produtos WHERE ativo = 1')]
+        maior_venda = conn.execute('SELECT MAX(id) FROM vendas').fetchone()[0]
+    # Vendas usam um grupo fixo de produtos reabastecido; os demais mantêm o estoque
+    # sorteado (com produtos em alerta para produtos_alertas)
+    ids_produtos = ids_produtos[:40]
+    estoque.receber_entrega('BENCH', [{'produto_id': pid, 'quantidade': 10 ** 6} for pid in ids_produtos])
+    hoje = date.today()
+    ultimo_mes = ((hoje - timedelta(days=30)).isoformat(), hoje.isoformat())
+
+    def vender(tamanho: int):
+        def executar():
+            itens = [{'produto_id': pid, 'quantidade': 1} for pid in rng.sample(ids_produtos, tamanho)]
+            sucesso, mensagem, _ = vendas.criar_venda(None, itens, 'PIX')
+            if not sucesso:
+                raise RuntimeError(mensagem)
+        return executar
+
+    backups = iter(range(10 ** 9))
+
+    return [
+        ('criar_venda[1 item]', vender(1)),
+        ('criar_venda[5 itens]', vender(5)),
+        ('criar_venda[20 itens]', vender(20)),
+        ('listar_produtos', lambda: produtos.listar_produtos()),
+        ('listar_clientes', lambda: clientes.listar_clientes()),
+        ('listar_vendas[30 dias]', lambda: vendas.listar_vendas(*ultimo_mes)),
+        ('listar_vendas[todas]', lambda: vendas.listar_vendas()),
+        ('obter_estatisticas_vendas[todas]', lambda: vendas.obter_estatisticas_vendas()),
+        ('obter_estatisticas_vendas[30 dias]', lambda: vendas.obter_estatisticas_vendas(*ultimo_mes)),
+        ('obter_estatisticas[produtos]', lambda: produtos.obter_estatisticas()),
+        ('obter_estatisticas[clientes]', lambda: clientes.obter_estatisticas()),
+        ('produtos_alertas', lambda: estoque.produtos_alertas()),
+        ('buscar_venda', lambda: vendas.buscar_venda(rng.randint(1, maior_venda))),
+        ('criar_backup', lambda: db.criar_backup(str(pasta / f'backup_{next(backups)}.db'))),
+    ]
+
+
+def medir(funcao: Callable[[], object], repeticoes: int, aquecimento: int = 1) -> Dict[str, float]:
+    """Tempos em ms: mediana, p95 e mínimo das repetições (após o aquecimento)"""
+    for _ in range(aquecimento):
+        funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        'mediana_ms': round(statistics.median(tempos), 3),
+        'p95_ms': round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 3),
+        'min_ms': round(tempos[0], 3),
+        'repeticoes': repeticoes,
+    }
+
+
+def comparar(atual: Dict, baseline: Dict, tolerancia: float) -> List[str]:
+    """Imprime a comparação pela mediana e retorna os cenários que regrediram"""
+    regressoes = []
+    print(f"\n{'Cenário':<38}{'Base (ms)':>11}{'Atual (ms)':>11}{'Variação':>10}")
+    for nome, resultado in atual['cenarios'].items():
+        anterior = baseline.get('cenarios', {}).get(nome)
+        if anterior is None:
+            print(f"{nome:<38}{'-':>11}{resultado['mediana_ms']:>11.2f}{'novo':>10}")
+            continue
+        variacao = resultado['mediana_ms'] / anterior['mediana_ms'] - 1 if anterior['mediana_ms'] else 0.0
+        marca = '  ⚠️' if variacao > tolerancia else ''
+        print(f"{nome:<38}{anterior['mediana_ms']:>11.2f}{resultado['mediana_ms']:>11.2f}"
+              f"{variacao:>+10.0%}{marca}")
+        if variacao > tolerancia:
+            regressoes.append(nome)
+    if baseline.get('parametros') != atual['parametros']:
+        print("⚠️ Baseline gerada com outros parâmetros; a comparação pode não ser válida")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--produtos', type=int, default=500)
+    parser.add_argument('--clientes', type=int, default=2000)
+    parser.add_argument('--vendas', type=int, default=50000)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--cenarios', help="Executa só os cenários cujo nome contém este texto")
+    parser.add_argument('--saida', help="Arquivo JSON com os resultados")
+    parser.add_argument('--baseline', help="JSON de uma execução anterior para comparação")
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help="Aumento máximo aceito na mediana (0.25 = 25%%)")
+    parser.add_argument('--pasta', help="Diretório do banco de teste (padrão: temporário)")
+    args = parser.parse_args()
+
+    parametros = {'produtos': args.produtos, 'clientes': args.clientes, 'vendas': args.vendas,
+                  'semente': args.semente}
+    resultado = {
+        'data': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'ambiente': {'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+                     'plataforma': platform.platform()},
+        'parametros': parametros,
+        'cenarios': {},
+    }
+
+    with tempfile.TemporaryDirectory(dir=args.pasta) as pasta:
+        pasta = Path(pasta)
+        inicio = time.perf_counter()
+        db = gerar_banco(str(pasta / 'bench.db'), args.produtos, args.clientes, args.vendas,
+                         semente=args.semente)
+        print(f"Banco sintético gerado em {time.perf_counter() - inicio:.1f}s")
+
+        rng = random.Random(args.semente)
+        print(f"\n{'Cenário':<38}{'Mediana (ms)':>13}{'p95 (ms)':>10}{'Mín (ms)':>10}")
+        for nome, funcao in montar_cenarios(db, pasta, rng):
+            if args.cenarios and args.cenarios not in nome:
+                continue
+            with contextlib.redirect_stdout(io.StringIO()):  # Mensagens dos serviços (ex.: backup)
+                medicao = medir(funcao, args.repeticoes)
+            resultado['cenarios'][nome] = medicao
+            print(f"{nome:<38}{medicao['mediana_ms']:>13.2f}{medicao['p95_ms']:>10.2f}"
+                  f"{medicao['min_ms']:>10.2f}")
+
+    if args.saida:
+        Path(args.saida).write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"\nResultados gravados em {args.saida}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressoes = comparar(resultado, baseline, args.tolerancia)
+        if regressoes:
+            print(f"\n❌ {len(regressoes)} cenário(s) acima da tolerância de {args.tolerancia:.0%}: "
+                  f"{', '.join(regressoes)}")
+            sys.exit(1)
+        print(f"\n✅ Nenhuma regressão acima de {args.tolerancia:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,17 @@ from .produto_service import ProdutoService
 from .cliente_service import ClienteService
 from .venda_service import VendaService
 from .estoque_service import EstoqueService
+from .fila_escrita import FilaEscrita
+from .diario_vendas import DiarioVendas
+from .acesso_assincrono import AcessoAssincrono, AcessoSobrecarregado
 
 __all__ = [
     'ProdutoService',
     'ClienteService',
     'VendaService',
-    'EstoqueService'
+    'EstoqueService',
+    'FilaEscrita',
+    'DiarioVendas',
+    'AcessoAssincrono',
+    'AcessoSobrecarregado'
 ]
\ No newline at end of file
@@ -0,0 +1,245 @@
+"""
+Acesso assíncrono (asyncio) aos serviços, para rotinas fora da interface
+
+Rotinas de sincronização, integrações e relatórios podem chamar os serviços
+com await sem bloquear o laço de eventos:
+
+    async with AcessoAssincrono() as acesso:
+        produtos = await acesso.produtos.listar_produtos()
+        ok, msg, venda_id = await acesso.vendas.criar_venda(None, itens, 'PIX')
+
+O trabalho no SQLite roda em threads próprias, cada uma com uma conexão
+reutilizada: ASSINCRONO_CONFIG['leitores'] threads de leitura e um escritor
+único (como na API), então mil chamadas simultâneas usam no máximo
+leitores + 1 conexões. No máximo ASSINCRONO_CONFIG['maximo_pendentes'] chamadas
+ficam na fila ou em execução; as seguintes aguardam uma vaga (back-pressure) e,
+passada a espera_maxima, recebem AcessoSobrecarregado.
+
+Cancelar a tarefa que aguarda (task.cancel(), asyncio.wait_for) tira a chamada
+da fila se ainda não começou; uma leitura já em execução é interrompida com
+conn.interrupt(). Escritas já iniciadas terminam normalmente (o commit ocorre),
+para não deixar operações de várias etapas pela metade.
+
+Um AcessoAssincrono deve ser usado por um único laço de eventos.
+"""
+import asyncio
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Callable, Dict, FrozenSet, Optional
+
+from database import DatabaseManager
+from config.settings import ASSINCRONO_CONFIG
+from utils.metricas import METRICAS
+from .produto_service import ProdutoService
+from .cliente_service import ClienteService
+from .venda_service import VendaService
+from .estoque_service import EstoqueService
+
+METRICA_SOBRECARGA = METRICAS.contador(
+    'petshop_assincrono_sobrecarga_total', "Chamadas recusadas por falta de vaga (espera_maxima)")
+METRICA_CANCELADAS = METRICAS.contador(
+    'petshop_assincrono_canceladas_total', "Chamadas canceladas antes de terminar")
+
+# Métodos expostos de cada serviço: (leituras, escritas). Escritas vão para o escritor único
+METODOS = {
+    'produtos': (
+        frozenset({'buscar_produto', 'listar_produtos', 'produtos_estoque_baixo',
+                   'calcular_valor_total_estoque', 'obter_estatisticas', 'mais_vendidos',
+                   'mais_vendidos_por_grupo', 'velocidade_vendas'}),
+        frozenset({'cadastrar_produto', 'atualizar_produto', 'deletar_produto',
+                   'reajustar_precos', 'importar_produtos'}),
+    ),
+    'clientes': (
+        frozenset({'buscar_cliente', 'buscar_cliente_por_cpf', 'listar_clientes',
+                   'obter_estatisticas'}),
+        frozenset({'cadastrar_cliente', 'atualizar_cliente', 'deletar_cliente',
+                   'importar_clientes'}),
+    ),
+    'vendas': (
+        frozenset({'buscar_venda', 'listar_vendas', 'obter_estatisticas_vendas',
+                   'obter_faturamento_diario'}),
+        frozenset({'criar_venda', 'criar_vendas_lote', 'cancelar_venda'}),
+    ),
+    'estoque': (
+        frozenset({'verificar_disponibilidade', 'produtos_alertas', 'contagem_alertas',
+                   'previsao_ruptura', 'sugestoes_reposicao', 'estoque_em', 'inventario_em'}),
+        frozenset({'entrada_estoque', 'receber_entrega', 'saida_estoque', 'ajuste_estoque',
+                   'criar_checkpoint', 'checkpoint_se_necessario', 'reconciliar_estoque'}),
+    ),
+}
+
+_ENCERRAR = object()
+
+
+def _liberar_vaga(loop: asyncio.AbstractEventLoop, vagas: asyncio.Semaphore, _futuro: Future):
+    try:
+        loop.call_soon_threadsafe(vagas.release)
+    except RuntimeError:
+        pass   # Laço já encerrado
+
+
+class AcessoSobrecarregado(Exception):
+    """Nenhuma vaga livre dentro de espera_maxima"""
+
+
+class _Executor:
+    """Threads com conexão própria consumindo uma fila de chamadas"""
+
+    def __init__(self, db: DatabaseManager, nome: str, threads: int, interromper: bool):
+        self.db = db
+        self.interromper_em_execucao = interromper
+        self._fila = queue.SimpleQueue()
+        self._em_execucao: Dict[Future, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._executar, name=f'{nome}-{i}', daemon=True)
+                         for i in range(threads)]
+        for thread in self._threads:
+            thread.start()
+
+    def enviar(self, funcao: Callable[[], Any]) -> Future:
+        futuro = Future()
+        self._fila.put((futuro, funcao))
+        return futuro
+
+    def interromper(self, futuro: Future):
+        """Interrompe o comando SQL em andamento da chamada (se ela ainda estiver rodando)"""
+        if not self.interromper_em_execucao:
+            return
+        with self._lock:
+            conn = self._em_execucao.get(futuro)
+            if conn is not None:
+                conn.interrupt()
+
+    def encerrar(self):
+        """Termina as chamadas já enfileiradas e fecha as conexões"""
+        for _ in self._threads:
+            self._fila.put(_ENCERRAR)
+        for thread in self._threads:
+            thread.join()
+
+    def _executar(self):
+        try:
+            while True:
+                item = self._fila.get()
+                if item is _ENCERRAR:
+                    break
+                futuro, funcao = item
+                if not futuro.set_running_or_notify_cancel():
+                    continue   # Cancelada enquanto esperava na fila
+
+                with self._lock:
+                    self._em_execucao[futuro] = self.db.conexao_da_thread()
+                try:
+                    resultado = funcao()
+                except BaseException as e:
+                    erro = e
+                else:
+                    erro = None
+                with self._lock:
+                    del self._em_execucao[futuro]
+
+                if erro is None:
+                    futuro.set_result(resultado)
+                else:
+                    futuro.set_exception(erro)
+        finally:
+            self.db.fechar_conexao_thread()
+
+
+class ServicoAssincrono:
+    """Versões async dos métodos de um serviço (ex.: await acesso.produtos.listar_produtos())"""
+
+    def __init__(self, acesso: 'AcessoAssincrono', servico: Any,
+                 leituras: FrozenSet[str], escritas: FrozenSet[str]):
+        self._acesso = acesso
+        self._servico = servico
+        self._leituras = leituras
+        self._escritas = escritas
+
+    def __getattr__(self, nome: str):
+        if nome in self._escritas:
+            escrita = True
+        elif nome in self._leituras:
+            escrita = False
+        else:
+            raise AttributeError(f"{type(self._servico).__name__} não expõe '{nome}' de forma assíncrona")
+        metodo = getattr(self._servico, nome)
+
+        async def chamar(*args, **kwargs):
+            return await self._acesso.executar(metodo, *args, escrita=escrita, **kwargs)
+
+        chamar.__name__ = nome
+        chamar.__doc__ = metodo.__doc__
+        setattr(self, nome, chamar)
+        return chamar
+
+
+class AcessoAssincrono:
+    """Serviços de negócio com métodos async sobre um pool limitado de conexões"""
+
+    def __init__(self, db_path: Optional[str] = None, leitores: Optional[int] = None,
+                 maximo_pendentes: Optional[int] = None, espera_maxima: Optional[float] = None):
+        self.db = DatabaseManager(db_path, reutilizar_conexoes=True)
+        self.maximo_pendentes = maximo_pendentes or ASSINCRONO_CONFIG['maximo_pendentes']
+        self.espera_maxima = (ASSINCRONO_CONFIG['espera_maxima']
+                              if espera_maxima is None else espera_maxima)
+        self._vagas: Optional[asyncio.Semaphore] = None
+
+        self._leitura = _Executor(self.db, 'async-leitor', leitores or ASSINCRONO_CONFIG['leitores'],
+                                  interromper=True)
+        self._escrita = _Executor(self.db, 'async-escritor', 1, interromper=False)
+
+        servicos = {
+            'produtos': ProdutoService(self.db),
+            'clientes': ClienteService(self.db),
+            'vendas': VendaService(self.db),
+            'estoque': EstoqueService(self.db),
+        }
+        self.produtos, self.clientes, self.vendas, self.estoque = (
+            ServicoAssincrono(self, servicos[nome], *METODOS[nome])
+            for nome in ('produtos', 'clientes', 'vendas', 'estoque')
+        )
+
+    async def executar(self, funcao: Callable, *args, escrita: bool = False, **kwargs) -> Any:
+        """
+        Executa funcao(*args, **kwargs) em uma thread do banco e aguarda o resultado
+        (útil para relatórios que combinam várias consultas na mesma chamada)
+        """
+        if self._vagas is None:
+            self._vagas = asyncio.Semaphore(self.maximo_pendentes)
+        vagas = self._vagas
+        try:
+            await asyncio.wait_for(vagas.acquire(), self.espera_maxima)
+        except asyncio.TimeoutError:
+            METRICA_SOBRECARGA.incrementar()
+            raise AcessoSobrecarregado(
+                f"{self.maximo_pendentes} chamadas pendentes; espera de {self.espera_maxima}s esgotada"
+            )
+
+        executor = self._escrita if escrita else self._leitura
+        loop = asyncio.get_running_loop()
+        futuro = executor.enviar(partial(funcao, *args, **kwargs))
+        # A vaga só volta quando a thread termina (mesmo se quem aguardava desistiu)
+        futuro.add_done_callback(partial(_liberar_vaga, loop, vagas))
+        try:
+            return await asyncio.wrap_future(futuro)
+        except asyncio.CancelledError:
+            METRICA_CANCELADAS.incrementar()
+            if not futuro.cancel():
+                executor.interromper(futuro)
+            raise
+
+    async def fechar(self):
+        """Aguarda as chamadas pendentes e fecha as conexões"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._leitura.encerrar)
+        await loop.run_in_executor(None, self._escrita.encerrar)
+
+    async def __aenter__(self) -> 'AcessoAssincrono':
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.fechar()
@@ -1,10 +1,13 @@
 """
 Serviço de lógica de negócio para Clientes
 """
-from typing import List, Optional, Tuple
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 from database import DatabaseManager, Cliente
-from utils.validators import validar_cpf, validar_telefone, validar_email
+from utils.validators import validar_cpf, validar_telefone, validar_email, validar_cpf_lote
 from utils.formatters import limpar_cpf, limpar_telefone
+from utils.planilhas import ler_planilha, salvar_rejeitados
+from config.settings import REPORT_CONFIG
 
 class ClienteService:
     """Gerencia a lógica de negócio relacionada a clientes"""
@@ -145,4 +148,90 @@ class ClienteService:
             'total_clientes': total_clientes,
             'clientes_com_cpf': clientes_com_cpf,
             'clientes_com_email': clientes_com_email
-        }
\ No newline at end of file
+        }
+    
+    # ==================== IMPORTAÇÃO EM LOTE ====================
+    
+    def _cliente_de_linha(self, dados: Dict[str, Any]) -> Tuple[Optional[Cliente], str]:
+        """Converte uma linha de planilha em Cliente (o CPF é validado depois, em lote)"""
+        cliente = Cliente(
+            nome=str(dados.get('nome') or '').strip(),
+            cpf=limpar_cpf(str(dados.get('cpf') or '')),
+            telefone=limpar_telefone(str(dados.get('telefone') or '')),
+            email=str(dados.get('email') or '').strip(),
+            endereco=str(dados.get('endereco') or '').strip()
+        )
+        
+        if len(cliente.nome) < 3:
+            return None, "Nome deve ter pelo menos 3 caracteres"
+        if not cliente.telefone:
+            return None, "Telefone é obrigatório"
+        if not validar_telefone(cliente.telefone):
+            return None, "Telefone inválido"
+        if cliente.email and not validar_email(cliente.email):
+            return None, "E-mail inválido"
+        return cliente, ""
+    
+    def _processar_lote_importacao(self, lote: List[Tuple[int, Dict[str, Any], Cliente]],
+                                   cpfs_cadastrados: set, relatorio: dict):
+        """Valida os CPFs do lote de uma vez, separa duplicados e grava o restante"""
+        cpfs_validos = validar_cpf_lote([cliente.cpf for _, _, cliente in lote])
+        
+        aceitos = []
+        for (linha, dados, cliente), cpf_valido in zip(lote, cpfs_validos):
+            if cliente.cpf:
+                if not cpf_valido:
+                    relatorio['rejeitados'].append({'linha': linha, 'motivo': "CPF inválido", 'dados': dados})
+                    continue
+                if cliente.cpf in cpfs_cadastrados:
+                    relatorio['conflitos'].append({'linha': linha, 'motivo': "CPF já cadastrado", 'dados': dados})
+                    continue
+                cpfs_cadastrados.add(cliente.cpf)
+            aceitos.append((linha, dados, cliente))
+        
+        if not aceitos:
+            return
+        
+        inseridos = self.db.criar_clientes_lote([cliente for _, _, cliente in aceitos])
+        if inseridos is None:
+            relatorio['rejeitados'].extend(
+                {'linha': linha, 'motivo': "Erro ao gravar lote no banco de dados", 'dados': dados}
+                for linha, dados, _ in aceitos
+            )
+        else:
+            relatorio['inseridos'] += inseridos
+    
+    def importar_clientes(self, caminho, tamanho_lote: int = 2000) -> dict:
+        """
+        Importa clientes de uma planilha (CSV/XLSX) em lotes
+        CPFs são validados de forma vetorizada e deduplicados contra os já cadastrados
+        e contra a própria planilha antes da gravação.
+        Retorna: relatório com inseridos, rejeitados (dados inválidos) e conflitos (CPF duplicado)
+        """
+        relatorio = {'inseridos': 0, 'rejeitados': [], 'conflitos': [], 'arquivo_rejeitados': None}
+        cpfs_cadastrados = self.db.listar_cpfs()
+        lote = []
+        
+        for linha, dados in ler_planilha(caminho):
+            cliente, motivo = self._cliente_de_linha(dados)
+            if not cliente:
+                relatorio['rejeitados'].append({'linha': linha, 'motivo': motivo, 'dados': dados})
+                continue
+            
+            lote.append((linha, dados, cliente))
+            if len(lote) >= tamanho_lote:
+                self._processar_lote_importacao(lote, cpfs_cadastrados, relatorio)
+                lote = []
+        
+        if lote:
+            self._processar_lote_importacao(lote, cpfs_cadastrados, relatorio)
+        
+        problemas = sorted(relatorio['rejeitados'] + relatorio['conflitos'], key=lambda r: r['linha'])
+        if problemas:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            relatorio['arquivo_rejeitados'] = salvar_rejeitados(
+                problemas,
+                REPORT_CONFIG['export_dir'] / f"importacao_clientes_rejeitados_{timestamp}.csv"
+            )
+        
+        return relatorio
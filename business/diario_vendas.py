@@ -0,0 +1,340 @@
+"""
+Diário local de vendas para captura offline no PDV
+
+A venda é conferida como em criar_venda (produtos, estoque, desconto), gravada
+primeiro em um arquivo local somente de acréscimo (uma linha JSON por venda) e
+confirmada ao operador assim que a linha está em disco. Uma
+thread em segundo plano reenvia as vendas pendentes ao banco em lotes, usando a
+chave de idempotência de cada registro: reenviar uma venda já gravada não a
+duplica. Assim o caixa continua vendendo com o banco compartilhado bloqueado ou
+indisponível: a conferência prévia usa uma conexão própria que espera no máximo
+DIARIO_CONFIG['espera_validacao'] e, passado esse tempo, segue só com a
+conferência local.
+
+Arquivos (na pasta de DIARIO_CONFIG['caminho']):
+    vendas.jsonl             - registros das vendas
+    vendas.pos               - posição (bytes) até onde o diário já foi aplicado
+    vendas_rejeitadas.jsonl  - vendas que o banco recusou (ex.: estoque), para conferência
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.settings import DIARIO_CONFIG
+from utils.metricas import METRICAS
+from utils.validators import validar_desconto
+from .venda_service import METRICA_VENDAS, METRICA_VENDAS_RECUSADAS, VendaService
+
+METRICA_REGISTRO = METRICAS.histograma('petshop_diario_registro_segundos',
+                                       "Latência de registrar_venda no diário (até o fsync)")
+
+
+class DiarioVendas:
+    """Registra vendas localmente e as aplica ao banco em segundo plano"""
+
+    def __init__(self, venda_service: VendaService, caminho=None,
+                 intervalo_reenvio: Optional[float] = None,
+                 tamanho_lote: Optional[int] = None):
+        self.venda_service = venda_service
+        self.db = venda_service.db
+        self.caminho = Path(caminho or DIARIO_CONFIG['caminho'])
+        self.intervalo_reenvio = intervalo_reenvio or DIARIO_CONFIG['intervalo_reenvio']
+        self.tamanho_lote = tamanho_lote or DIARIO_CONFIG['tamanho_lote']
+        self.ultimo_erro: Optional[str] = None
+        self.rejeitadas = 0   # Vendas recusadas pelo banco desde a abertura
+        self._ouvintes_rejeicao: List[Callable[[List[str]], None]] = []
+
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._caminho_posicao = self.caminho.with_suffix('.pos')
+        self._caminho_rejeitadas = self.caminho.with_name(f'{self.caminho.stem}_rejeitadas.jsonl')
+
+        self._recuperar()
+        self._arquivo = open(self.caminho, 'ab')
+        self._posicao = min(self._ler_posicao(), os.path.getsize(self.caminho))
+        self._itens_pendentes: Dict[str, List[Dict]] = {}   # chave -> itens ainda não aplicados
+        self._pendentes = self._contar_pendentes()
+
+        self._lock_escrita = threading.Lock()
+        self._lock_validacao = threading.Lock()
+        self._conn_validacao: Optional[sqlite3.Connection] = None
+        self._lock_fsync = threading.Lock()
+        self._lock_reenvio = threading.Lock()
+        self._escritos = 0
+        self._sincronizados = 0
+
+        METRICAS.medidor('petshop_diario_pendentes', "Vendas do diário ainda não gravadas no banco",
+                         funcao=lambda: self._pendentes)
+
+        self._novo = threading.Event()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name='diario-vendas', daemon=True)
+        self._thread.start()
+        if self._pendentes:
+            self._novo.set()
+
+    # ==================== API PÚBLICA ====================
+
+    @property
+    def pendentes(self) -> int:
+        """Quantidade de vendas registradas que ainda não foram gravadas no banco"""
+        return self._pendentes
+
+    @property
+    def arquivo_rejeitadas(self) -> Path:
+        """Arquivo onde ficam as vendas recusadas pelo banco, com o motivo"""
+        return self._caminho_rejeitadas
+
+    def ao_rejeitar(self, callback: Callable[[List[str]], None]):
+        """
+        Registra uma função chamada com os motivos quando o banco recusa vendas do
+        diário (executada na thread de reenvio; deve ser rápida)
+        """
+        self._ouvintes_rejeicao.append(callback)
+
+    def registrar_venda(self, cliente_id: Optional[int], itens: List[Dict],
+                        forma_pagamento: str, desconto: float = 0.0,
+                        observacoes: str = "") -> Tuple[bool, str, Optional[str]]:
+        """
+        Valida a venda como criar_venda (produtos, estoque, desconto) e a registra no
+        diário local (retorna após o fsync)
+        itens: lista de dicts com {'produto_id': int, 'quantidade': int}
+        O estoque considerado desconta as vendas do diário ainda não gravadas. A
+        conferência no banco espera no máximo DIARIO_CONFIG['espera_validacao']; com
+        o banco bloqueado ou com erro, só o desconto é conferido (pelo 'subtotal' dos
+        itens). Uma venda recusada depois, ao aplicar, vai para o arquivo de
+        rejeitadas e é avisada pelos callbacks de ao_rejeitar.
+        Retorna: (sucesso, mensagem, chave de idempotência)
+        """
+        inicio = time.perf_counter()
+        valido, msg = self._validar(itens, desconto)
+        if not valido:
+            return False, msg, None
+
+        chave = uuid.uuid4().hex
+        registro = {
+            'chave_idempotencia': chave,
+            # Mesmo formato/fuso do CURRENT_TIMESTAMP do SQLite
+            'data_venda': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+            'cliente_id': cliente_id,
+            'itens': [{'produto_id': item['produto_id'], 'quantidade': item['quantidade']}
+                      for item in itens],
+            'forma_pagamento': forma_pagamento,
+            'desconto': desconto,
+            'observacoes': observacoes,
+        }
+        linha = (json.dumps(registro, ensure_ascii=False) + '\n').encode('utf-8')
+
+        with self._lock_escrita:
+            self._arquivo.write(linha)
+            self._arquivo.flush()
+            self._escritos += 1
+            self._pendentes += 1
+            self._itens_pendentes[chave] = registro['itens']
+            numero = self._escritos
+
+        self._sincronizar(numero)
+        self._novo.set()
+        METRICA_REGISTRO.observar(time.perf_counter() - inicio)
+        return True, "Venda registrada com sucesso!", chave
+
+    def _validar(self, itens: List[Dict], desconto: float) -> Tuple[bool, str]:
+        """Confere a venda no banco por uma conexão própria de espera curta, ou localmente"""
+        with self._lock_escrita:
+            pendentes = dict(self._itens_pendentes)
+        with self._lock_validacao:
+            try:
+                if self._conn_validacao is None:
+                    self._conn_validacao = self.db._conectar(
+                        timeout=DIARIO_CONFIG['espera_validacao'], check_same_thread=False)
+                return self.venda_service.validar_venda(itens, desconto, pendentes,
+                                                        conn=self._conn_validacao)
+            except sqlite3.Error:
+                self._fechar_conexao_validacao()
+        return validar_desconto(desconto, sum(item.get('subtotal', 0) for item in itens))
+
+    def _fechar_conexao_validacao(self):
+        if self._conn_validacao is not None:
+            try:
+                self._conn_validacao.close()
+            except sqlite3.Error:
+                pass
+            self._conn_validacao = None
+
+    def reenviar_pendentes(self) -> bool:
+        """
+        Aplica ao banco as vendas pendentes do diário
+        Retorna: False se o banco estava indisponível (nova tentativa depois)
+        """
+        with self._lock_reenvio:
+            while True:
+                registros, ilegiveis, fim = self._ler_pendentes()
+                if not registros and not ilegiveis:
+                    self._compactar()
+                    self.ultimo_erro = None
+                    return True
+
+                rejeitadas = [(linha, "Registro ilegível") for linha in ilegiveis]
+                if registros:
+                    operacoes = [partial(self.venda_service._operacao_venda, registro)
+                                 for registro in registros]
+                    try:
+                        resultados = self.db.executar_em_lote(operacoes)
+                    except Exception as e:
+                        self.ultimo_erro = str(e)
+                        return False
+
+                    for registro, resultado in zip(registros, resultados):
+                        if isinstance(resultado, sqlite3.OperationalError):
+                            # Bloqueio/indisponibilidade: o lote é reenviado depois e
+                            # as vendas já gravadas são reconhecidas pela chave
+                            self.ultimo_erro = str(resultado)
+                            return False
+                        if isinstance(resultado, Exception):
+                            rejeitadas.append((registro, str(resultado)))
+                        elif not resultado[0]:
+                            rejeitadas.append((registro, resultado[1]))
+
+                    recusadas = len(rejeitadas) - len(ilegiveis)
+                    METRICA_VENDAS.incrementar(len(registros) - recusadas)
+                    METRICA_VENDAS_RECUSADAS.incrementar(recusadas)
+
+                if rejeitadas:
+                    self._salvar_rejeitadas(rejeitadas)
+                self._salvar_posicao(fim)
+                with self._lock_escrita:
+                    self._pendentes -= len(registros) + len(ilegiveis)
+                    for registro in registros:
+                        self._itens_pendentes.pop(registro.get('chave_idempotencia'), None)
+                if rejeitadas:
+                    self._avisar_rejeitadas([motivo for _, motivo in rejeitadas])
+
+    def encerrar(self):
+        """Para a thread de reenvio, tenta aplicar o restante e fecha o diário"""
+        self._parar.set()
+        self._novo.set()
+        self._thread.join()
+        self.reenviar_pendentes()
+        with self._lock_validacao:
+            self._fechar_conexao_validacao()
+        with self._lock_escrita:
+            self._arquivo.close()
+
+    # ==================== ARQUIVO ====================
+
+    def _sincronizar(self, numero: int):
+        """
+        Garante o fsync da linha de número informado. Quem chega enquanto outro
+        fsync está em andamento normalmente já é coberto por ele (fsync em grupo).
+        """
+        with self._lock_fsync:
+            if self._sincronizados >= numero:
+                return
+            with self._lock_escrita:
+                alvo = self._escritos
+            os.fsync(self._arquivo.fileno())
+            self._sincronizados = alvo
+
+    def _recuperar(self):
+        """Descarta uma última linha incompleta (queda durante a escrita, nunca confirmada)"""
+        if not self.caminho.exists():
+            return
+        with open(self.caminho, 'r+b') as arquivo:
+            conteudo = arquivo.read()
+            if conteudo and not conteudo.endswith(b'\n'):
+                arquivo.truncate(conteudo.rfind(b'\n') + 1)
+
+    def _ler_posicao(self) -> int:
+        try:
+            return int(self._caminho_posicao.read_text().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _salvar_posicao(self, posicao: int):
+        temporario = self._caminho_posicao.with_suffix('.pos.tmp')
+        temporario.write_text(str(posicao))
+        os.replace(temporario, self._caminho_posicao)
+        self._posicao = posicao
+
+    def _contar_pendentes(self) -> int:
+        """Conta as linhas ainda não aplicadas e guarda os itens de cada uma pela chave"""
+        pendentes = 0
+        with open(self.caminho, 'rb') as arquivo:
+            arquivo.seek(self._posicao)
+            for linha in arquivo:
+                if not linha.endswith(b'\n'):
+                    continue
+                pendentes += 1
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    continue
+                if isinstance(registro, dict) and registro.get('chave_idempotencia'):
+                    self._itens_pendentes[registro['chave_idempotencia']] = registro.get('itens') or []
+        return pendentes
+
+    def _ler_pendentes(self) -> Tuple[List[Dict], List[str], int]:
+        """Lê até tamanho_lote linhas completas a partir da posição aplicada"""
+        registros, ilegiveis = [], []
+        fim = self._posicao
+        with open(self.caminho, 'rb') as arquivo:
+            arquivo.seek(self._posicao)
+            while len(registros) + len(ilegiveis) < self.tamanho_lote:
+                linha = arquivo.readline()
+                if not linha.endswith(b'\n'):
+                    break
+                fim += len(linha)
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    registro = None
+                if isinstance(registro, dict):
+                    registros.append(registro)
+                else:
+                    ilegiveis.append(linha.decode('utf-8', 'replace').strip())
+        return registros, ilegiveis, fim
+
+    def _salvar_rejeitadas(self, rejeitadas: List[Tuple[object, str]]):
+        with open(self._caminho_rejeitadas, 'a', encoding='utf-8') as arquivo:
+            for registro, motivo in rejeitadas:
+                arquivo.write(json.dumps({'motivo': motivo, 'registro': registro},
+                                         ensure_ascii=False) + '\n')
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        print(f"⚠️ {len(rejeitadas)} venda(s) do diário recusada(s); veja {self._caminho_rejeitadas}")
+
+    def _avisar_rejeitadas(self, motivos: List[str]):
+        self.rejeitadas += len(motivos)
+        for callback in list(self._ouvintes_rejeicao):
+            try:
+                callback(motivos)
+            except Exception as e:
+                print(f"⚠️ Erro ao avisar vendas recusadas: {e}")
+
+    def _compactar(self):
+        """Esvazia o diário quando tudo já foi aplicado"""
+        with self._lock_escrita:
+            if self._posicao and self._posicao == os.path.getsize(self.caminho):
+                # Posição zerada antes do truncate: numa queda entre os dois passos
+                # o diário é reaplicado e as chaves evitam duplicidade
+                self._salvar_posicao(0)
+                os.ftruncate(self._arquivo.fileno(), 0)
+                os.fsync(self._arquivo.fileno())
+
+    # ==================== REENVIO ====================
+
+    def _executar(self):
+        """Laço da thread de reenvio"""
+        while not self._parar.is_set():
+            self._novo.wait(self.intervalo_reenvio)
+            self._novo.clear()
+            if self._parar.is_set():
+                return
+            if not self.reenviar_pendentes():
+                self._parar.wait(self.intervalo_reenvio)
@@ -1,15 +1,54 @@
 """
 Serviço de lógica de negócio para Estoque
 """
-from typing import List, Tuple
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+from config.settings import CHECKPOINT_CONFIG
 from database import DatabaseManager, Produto
-from utils.validators import validar_estoque
+from utils.metricas import METRICAS
+from utils.validators import eh_inteiro, validar_estoque
+from .previsao_estoque import PrevisaoEstoque
+
+METRICA_ALERTAS = METRICAS.histograma('petshop_estoque_alertas_segundos', "Latência de produtos_alertas")
+METRICA_PRODUTOS_ALERTA = {
+    nivel: METRICAS.medidor('petshop_produtos_alerta', "Produtos em alerta de estoque (última consulta)",
+                            nivel=nivel)
+    for nivel in ('sem_estoque', 'critico', 'baixo', 'ruptura_prevista')
+}
+METRICA_MOVIMENTACOES = {
+    tipo: (METRICAS.contador('petshop_estoque_movimentacoes_total',
+                             "Movimentações de estoque registradas", tipo=tipo),
+           METRICAS.contador('petshop_estoque_unidades_total',
+                             "Unidades movimentadas no estoque", tipo=tipo))
+    for tipo in ('ENTRADA', 'SAIDA', 'AJUSTE', 'RECEBIMENTO')
+}
+
+
+def _contar_movimentacao(tipo: str, unidades: int):
+    movimentacoes, total_unidades = METRICA_MOVIMENTACOES[tipo]
+    movimentacoes.incrementar()
+    total_unidades.incrementar(unidades)
+
 
 class EstoqueService:
     """Gerencia a lógica de negócio relacionada ao estoque"""
     
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
+        self._previsao = None
+        self._lock_previsao = threading.Lock()
+        self._contagem_alertas = None   # (versão do banco, contagem)
+    
+    def _obter_previsao(self) -> PrevisaoEstoque:
+        """Motor de previsão (carregado na primeira consulta e depois atualizado incrementalmente)"""
+        with self._lock_previsao:
+            if self._previsao is None:
+                self._previsao = PrevisaoEstoque(self.db)
+            else:
+                self._previsao.atualizar()
+            return self._previsao
     
     def entrada_estoque(self, produto_id: int, quantidade: int, 
                        observacao: str = "") -> Tuple[bool, str]:
@@ -27,10 +66,58 @@ class EstoqueService:
         
         # Registrar entrada
         if self.db.ajustar_estoque(produto_id, quantidade, 'ENTRADA', observacao):
+            _contar_movimentacao('ENTRADA', quantidade)
             return True, f"Entrada de {quantidade} unidades registrada com sucesso!"
         else:
             return False, "Erro ao registrar entrada de estoque"
     
+    def receber_entrega(self, referencia: str, itens: List[Dict],
+                        observacao: str = "") -> Tuple[bool, str, Optional[int]]:
+        """
+        Registra o recebimento de uma entrega inteira em uma única transação
+        itens: lista de dicts com {'produto_id': int, 'quantidade': int}
+        Reenviar a mesma referência (nota de entrega) é seguro e não altera o estoque.
+        Retorna: (sucesso, mensagem, id_recebimento)
+        """
+        referencia = (referencia or "").strip()
+        if not referencia:
+            return False, "Referência da entrega é obrigatória", None
+        
+        if not itens:
+            return False, "Entrega sem itens", None
+        
+        # Caminho rápido para notas reenviadas: apenas leitura, sem bloquear escritas
+        recebimento = self.db.buscar_recebimento(referencia)
+        if recebimento:
+            return True, f"Entrega '{referencia}' já havia sido registrada", recebimento['id']
+        
+        # Consolidar linhas repetidas do mesmo produto
+        quantidades = {}
+        for item in itens:
+            produto_id = item.get('produto_id')
+            quantidade = item.get('quantidade', 0)
+            if not eh_inteiro(produto_id):
+                return False, f"Produto inválido: {produto_id!r}", None
+            if not eh_inteiro(quantidade) or quantidade <= 0:
+                return False, f"Quantidade inválida para o produto ID {produto_id}", None
+            quantidades[produto_id] = quantidades.get(produto_id, 0) + quantidade
+        
+        recebimento_id, duplicado, nao_encontrados = self.db.registrar_recebimento(
+            referencia, quantidades, observacao
+        )
+        
+        if nao_encontrados:
+            ids = ', '.join(str(pid) for pid in nao_encontrados)
+            return False, f"Produtos não encontrados: {ids}", None
+        if recebimento_id is None:
+            return False, "Erro ao registrar recebimento", None
+        if duplicado:
+            return True, f"Entrega '{referencia}' já havia sido registrada", recebimento_id
+        
+        total = sum(quantidades.values())
+        _contar_movimentacao('RECEBIMENTO', total)
+        return True, f"Entrega '{referencia}' registrada: {len(quantidades)} produtos, {total} unidades", recebimento_id
+    
     def saida_estoque(self, produto_id: int, quantidade: int, 
                      observacao: str = "") -> Tuple[bool, str]:
         """
@@ -51,6 +138,7 @@ class EstoqueService:
         
         # Registrar saída (quantidade negativa)
         if self.db.ajustar_estoque(produto_id, -quantidade, 'SAIDA', observacao):
+            _contar_movimentacao('SAIDA', quantidade)
             return True, f"Saída de {quantidade} unidades registrada com sucesso!"
         else:
             return False, "Erro ao registrar saída de estoque"
@@ -78,6 +166,7 @@ class EstoqueService:
         
         # Registrar ajuste
         if self.db.ajustar_estoque(produto_id, diferenca, 'AJUSTE', observacao):
+            _contar_movimentacao('AJUSTE', abs(diferenca))
             return True, f"Estoque ajustado de {produto.estoque} para {novo_estoque}"
         else:
             return False, "Erro ao ajustar estoque"
@@ -100,14 +189,172 @@ class EstoqueService:
         """
         Retorna produtos com alertas de estoque
         """
+        inicio = time.perf_counter()
         produtos = self.db.listar_produtos(apenas_ativos=True)
         
         sem_estoque = [p for p in produtos if p.estoque == 0]
         critico = [p for p in produtos if 0 < p.estoque <= 2]
         baixo = [p for p in produtos if 2 < p.estoque <= p.estoque_minimo]
         
-        return {
+        # Acima do mínimo, mas a demanda prevista esgota o estoque antes da reposição
+        sugeridos = self._obter_previsao().ids_ruptura_prevista()
+        ruptura_prevista = [p for p in produtos
+                            if p.estoque > p.estoque_minimo and p.id in sugeridos]
+        
+        alertas = {
             'sem_estoque': sem_estoque,
             'critico': critico,
-            'baixo': baixo
-        }
\ No newline at end of file
+            'baixo': baixo,
+            'ruptura_prevista': ruptura_prevista
+        }
+        for nivel, lista in alertas.items():
+            METRICA_PRODUTOS_ALERTA[nivel].definir(len(lista))
+        METRICA_ALERTAS.observar(time.perf_counter() - inicio)
+        return alertas
+    
+    def contagem_alertas(self) -> Optional[Dict[str, int]]:
+        """
+        Quantidade de produtos em cada nível de alerta (mesmos critérios de produtos_alertas)
+        Uma consulta COUNT, reaproveitada até o próximo commit no banco (de qualquer
+        conexão ou processo). A ruptura prevista vem da última previsão calculada
+        (produtos_alertas, previsao_ruptura, sugestoes_reposicao): a contagem não
+        carrega nem atualiza a previsão.
+        Retorna: {'sem_estoque', 'critico', 'baixo', 'ruptura_prevista', 'total'} ou None
+        """
+        versao = self.db.versao_dados()
+        em_cache = self._contagem_alertas
+        if versao is not None and em_cache and em_cache[0] == versao:
+            contagem = dict(em_cache[1])
+        else:
+            contagem = self.db.contar_alertas_estoque()
+            if contagem is None:
+                return None
+            self._contagem_alertas = (versao, dict(contagem))
+        
+        previsao = self._previsao
+        contagem['ruptura_prevista'] = previsao.contar_ruptura_prevista() if previsao else 0
+        contagem['total'] = sum(contagem.values())
+        return contagem
+    
+    def previsao_ruptura(self) -> List[Dict[str, Any]]:
+        """
+        Dias até a ruptura de cada produto ativo, pela demanda diária suavizada
+        Retorna: lista de {'produto_id', 'nome', 'estoque', 'demanda_diaria', 'dias_ate_ruptura'}
+        """
+        return self._obter_previsao().previsao()
+    
+    def sugestoes_reposicao(self, prazo_reposicao: Optional[int] = None,
+                            cobertura_dias: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Lista de compra: produtos que acabam antes do prazo de reposição ou estão
+        no mínimo, com a quantidade sugerida para o pedido
+        """
+        return self._obter_previsao().sugestoes_reposicao(prazo_reposicao, cobertura_dias)
+    
+    # ==================== ESTOQUE HISTÓRICO ====================
+    
+    def _normalizar_momento(self, momento: Union[str, date, datetime]) -> str:
+        """
+        Converte para o formato das datas gravadas ('AAAA-MM-DD HH:MM:SS')
+        Uma data sem horário significa o fim daquele dia.
+        """
+        if isinstance(momento, datetime):
+            return momento.strftime('%Y-%m-%d %H:%M:%S')
+        if isinstance(momento, date):
+            return f"{momento.isoformat()} 23:59:59"
+        momento = str(momento).strip()
+        if len(momento) == 10:
+            return f"{momento} 23:59:59"
+        return momento
+    
+    def criar_checkpoint(self) -> Tuple[bool, str, Optional[int]]:
+        """
+        Grava um checkpoint com o estoque atual de todos os produtos
+        Retorna: (sucesso, mensagem, id_checkpoint)
+        """
+        checkpoint_id = self.db.criar_checkpoint_estoque()
+        if checkpoint_id is None:
+            return False, "Erro ao criar checkpoint de estoque", None
+        return True, f"Checkpoint de estoque #{checkpoint_id} criado", checkpoint_id
+    
+    def checkpoint_se_necessario(self, intervalo_horas: Optional[float] = None) -> Optional[int]:
+        """
+        Cria um checkpoint se o último for mais antigo que o intervalo configurado
+        Retorna: ID do checkpoint criado ou None se não foi necessário (ou em erro)
+        """
+        intervalo = intervalo_horas or CHECKPOINT_CONFIG['intervalo_horas']
+        ultimo = self.db.ultimo_checkpoint_estoque()
+        if ultimo:
+            # data_checkpoint está em UTC (CURRENT_TIMESTAMP)
+            data = datetime.strptime(ultimo['data_checkpoint'], '%Y-%m-%d %H:%M:%S')
+            if datetime.now(timezone.utc).replace(tzinfo=None) - data < timedelta(hours=intervalo):
+                return None
+        return self.db.criar_checkpoint_estoque()
+    
+    def estoque_em(self, produto_id: int, momento: Union[str, date, datetime]) -> Optional[int]:
+        """
+        Estoque de um produto em um instante passado (mesmo fuso das datas gravadas)
+        Retorna: quantidade ou None se o produto não existia / erro
+        """
+        estoques = self.db.estoque_na_data(self._normalizar_momento(momento), produto_id)
+        if not estoques or produto_id not in estoques:
+            return None
+        return estoques[produto_id]['estoque']
+    
+    def inventario_em(self, momento: Union[str, date, datetime]) -> Optional[Dict[str, Any]]:
+        """
+        Inventário valorizado em um instante passado (ex.: fechamento para a contabilidade)
+        O custo é o do checkpoint usado como ponto de partida, ou o atual.
+        Retorna: {'momento', 'itens': [{'produto_id', 'nome', 'estoque', 'preco_custo',
+                 'valor'}], 'total_unidades', 'valor_total'} ou None em caso de erro
+        """
+        momento = self._normalizar_momento(momento)
+        estoques = self.db.estoque_na_data(momento)
+        if estoques is None:
+            return None
+        
+        itens = [
+            {'produto_id': produto_id, 'nome': dados['nome'], 'estoque': dados['estoque'],
+             'preco_custo': dados['preco_custo'],
+             'valor': round(dados['estoque'] * dados['preco_custo'], 2)}
+            for produto_id, dados in estoques.items() if dados['estoque']
+        ]
+        itens.sort(key=lambda item: item['nome'])
+        
+        return {
+            'momento': momento,
+            'itens': itens,
+            'total_unidades': sum(item['estoque'] for item in itens),
+            'valor_total': round(sum(item['valor'] for item in itens), 2)
+        }
+    
+    # ==================== RECONCILIAÇÃO ====================
+    
+    def reconciliar_estoque(self, corrigir: bool = False, tamanho_lote: int = 5000) -> Optional[Dict[str, Any]]:
+        """
+        Confere a cadeia de movimentações de todos os produtos contra o estoque
+        atual, lendo o histórico uma única vez (resultados em blocos de tamanho_lote linhas).
+        Com corrigir=True, produtos cujo saldo final não bate com o cadastro
+        recebem uma movimentação de AJUSTE. Quebras e quantidades inválidas no meio
+        da cadeia não são corrigíveis sem reescrever o histórico: continuam em
+        'quebras'/'quantidades' e também em 'nao_corrigidas' (a próxima verificação
+        as relata de novo).
+        Retorna: relatório de db.verificar_cadeia_estoque, mais 'corrigidos' e
+                 'nao_corrigidas', ou None em caso de erro
+        """
+        relatorio = self.db.verificar_cadeia_estoque(tamanho_leitura=tamanho_lote)
+        if relatorio is None:
+            return None
+        relatorio['corrigidos'] = 0
+        relatorio['nao_corrigidas'] = []
+        
+        if corrigir:
+            produto_ids = [item['produto_id'] for item in
+                           relatorio['divergencias'] + relatorio['sem_movimentacao']]
+            if produto_ids:
+                corrigidos = self.db.corrigir_divergencias_estoque(produto_ids)
+                if corrigidos is None:
+                    return None
+                relatorio['corrigidos'] = corrigidos
+            relatorio['nao_corrigidas'] = relatorio['quebras'] + relatorio['quantidades']
+        return relatorio
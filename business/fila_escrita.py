@@ -0,0 +1,137 @@
+"""
+Fila de escrita com escritor único para vários terminais (PDV)
+
+Vendas, movimentações de estoque e cancelamentos são enfileirados e gravados
+por uma única thread, que agrupa as operações pendentes em micro-lotes com um
+único commit (group commit). Assim os terminais não disputam o bloqueio de
+escrita do SQLite e não recebem "database is locked".
+
+Com janela_ms > 0 o escritor espera até esse tempo por mais operações antes de
+gravar, dividindo um único fsync entre mais vendas (modo de durabilidade 'grupo').
+O future só é resolvido após o commit, então uma venda confirmada está em disco.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from .venda_service import VendaService
+
+
+_ENCERRAR = object()
+
+
+class FilaEscrita:
+    """Serializa as escritas em uma thread e as grava em micro-lotes"""
+
+    def __init__(self, venda_service: VendaService, tamanho_lote: int = 64,
+                 tamanho_maximo_fila: int = 10000, janela_ms: float = 0):
+        self.venda_service = venda_service
+        self.db = venda_service.db
+        self.tamanho_lote = tamanho_lote
+        self.janela = janela_ms / 1000.0
+        self._fila = queue.Queue(maxsize=tamanho_maximo_fila)
+        self._thread = threading.Thread(target=self._executar, name='fila-escrita', daemon=True)
+        self._thread.start()
+
+    # ==================== API PÚBLICA ====================
+
+    def enviar_venda(self, cliente_id: Optional[int], itens: List[Dict],
+                     forma_pagamento: str, desconto: float = 0.0,
+                     observacoes: str = "", chave_idempotencia: Optional[str] = None) -> Future:
+        """
+        Enfileira uma venda
+        Retorna: Future com (sucesso, mensagem, id_venda), resolvido após o commit
+        """
+        venda = {'cliente_id': cliente_id, 'itens': itens, 'forma_pagamento': forma_pagamento,
+                 'desconto': desconto, 'observacoes': observacoes,
+                 'chave_idempotencia': chave_idempotencia}
+        return self._enviar(partial(self.venda_service._operacao_venda, venda))
+
+    def enviar_movimentacao(self, produto_id: int, quantidade: int,
+                            tipo: str = 'AJUSTE', observacao: str = "") -> Future:
+        """
+        Enfileira uma movimentação de estoque (quantidade negativa para saídas)
+        Retorna: Future com True/False, resolvido após o commit
+        """
+        return self._enviar(lambda cursor: self.db._aplicar_ajuste(
+            cursor, produto_id, quantidade, tipo, observacao
+        ))
+
+    def enviar_cancelamento(self, venda_id: int, motivo: str = "",
+                            chave_idempotencia: Optional[str] = None) -> Future:
+        """
+        Enfileira o cancelamento de uma venda
+        Retorna: Future com (sucesso, mensagem), resolvido após o commit
+        """
+        return self._enviar(partial(self.venda_service._registrar_cancelamento,
+                                    venda_id=venda_id, motivo=motivo,
+                                    chave_idempotencia=chave_idempotencia))
+
+    def encerrar(self, aguardar: bool = True):
+        """Processa o que já está na fila e encerra a thread escritora"""
+        self._fila.put(_ENCERRAR)
+        if aguardar:
+            self._thread.join()
+
+    # ==================== ESCRITOR ====================
+
+    def _enviar(self, operacao: Callable) -> Future:
+        if not self._thread.is_alive():
+            raise RuntimeError("Fila de escrita encerrada")
+        futuro = Future()
+        self._fila.put((operacao, futuro))
+        return futuro
+
+    def _coletar_lote(self) -> list:
+        """
+        Aguarda a primeira operação e junta as pendentes, esperando no máximo
+        a janela configurada (a partir da primeira) por novas operações
+        """
+        lote = [self._fila.get()]
+        limite = time.monotonic() + self.janela
+        while len(lote) < self.tamanho_lote and lote[-1] is not _ENCERRAR:
+            restante = limite - time.monotonic()
+            try:
+                if restante > 0:
+                    lote.append(self._fila.get(timeout=restante))
+                else:
+                    lote.append(self._fila.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _executar(self):
+        """Laço da thread escritora"""
+        while True:
+            lote = self._coletar_lote()
+            encerrar = lote[-1] is _ENCERRAR
+            if encerrar:
+                lote.pop()
+            if lote:
+                self._gravar_lote(lote)
+            if encerrar:
+                self.db.fechar_conexao_thread()
+                return
+
+    def _gravar_lote(self, lote: list):
+        """Grava um micro-lote em uma transação e resolve os futures após o commit"""
+        pendentes = [(operacao, futuro) for operacao, futuro in lote
+                     if futuro.set_running_or_notify_cancel()]
+        if not pendentes:
+            return
+
+        try:
+            resultados = self.db.executar_em_lote([operacao for operacao, _ in pendentes])
+        except Exception as e:
+            for _, futuro in pendentes:
+                futuro.set_exception(e)
+            return
+
+        for (_, futuro), resultado in zip(pendentes, resultados):
+            if isinstance(resultado, Exception):
+                futuro.set_exception(resultado)
+            else:
+                futuro.set_result(resultado)
@@ -0,0 +1,210 @@
+"""
+Previsão de ruptura de estoque e sugestão de reposição
+
+A demanda diária de cada produto é estimada por suavização exponencial
+(taxa = alfa * vendas_do_dia + (1 - alfa) * taxa_anterior), com todos os
+produtos em vetores NumPy. A carga inicial usa vendas_produto_diario; depois
+disso apenas as movimentações de estoque novas são lidas (pelo último ID
+processado), então cada atualização custa poucos milissegundos.
+
+A taxa considera somente dias já encerrados; as vendas de hoje entram na taxa
+na virada do dia, mas o estoque é atualizado a cada movimentação. Vendas
+canceladas saem da demanda no dia da venda, como no resumo diário.
+"""
+import math
+import threading
+import time
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from config.settings import PREVISAO_CONFIG
+from database import DatabaseManager
+
+
+class PrevisaoEstoque:
+    """Mantém a taxa de demanda e o estoque de todos os produtos em memória"""
+
+    def __init__(self, db_manager: DatabaseManager, alfa: Optional[float] = None,
+                 dias_historico: Optional[int] = None):
+        self.db = db_manager
+        self.alfa = alfa or PREVISAO_CONFIG['alfa']
+        self.dias_historico = dias_historico or PREVISAO_CONFIG['dias_historico']
+        self._lock = threading.Lock()
+        self.carregar()
+
+    # ==================== CARGA E ATUALIZAÇÃO ====================
+
+    @staticmethod
+    def _hoje() -> date:
+        """Data atual em UTC (mesmo referencial do CURRENT_TIMESTAMP do SQLite)"""
+        return datetime.now(timezone.utc).date()
+
+    def carregar(self):
+        """Carga completa: cadastro, estoque e histórico de vendas"""
+        base = self.db.carregar_base_previsao(self.dias_historico)
+        if base is None:
+            base = {'hoje': self._hoje().isoformat(), 'produtos': [], 'vendas': [],
+                    'ultima_movimentacao': 0}
+
+        with self._lock:
+            produtos = base['produtos']
+            self.ids = np.array([p['id'] for p in produtos], dtype=np.int64)
+            self.nomes = [p['nome'] for p in produtos]
+            self._indice = {int(pid): i for i, pid in enumerate(self.ids)}
+            self.estoque = np.array([p['estoque'] for p in produtos], dtype=np.float64)
+            self.estoque_minimo = np.array([p['estoque_minimo'] for p in produtos], dtype=np.float64)
+            self.ativo = np.array([bool(p['ativo']) for p in produtos], dtype=bool)
+
+            self._dia = date.fromisoformat(base['hoje']).toordinal()
+            self.vendas_hoje = np.zeros(len(produtos))
+            self.taxa = self._suavizar_historico(base['vendas'])
+            self._ultima_movimentacao = base['ultima_movimentacao']
+            self._carregado_em = time.monotonic()
+
+    def _suavizar_historico(self, vendas: List[tuple]) -> np.ndarray:
+        """
+        Aplica a suavização exponencial a todo o histórico de uma vez:
+        matriz produtos x dias multiplicada pelo vetor de pesos alfa*(1-alfa)^idade
+        """
+        dias = self.dias_historico
+        matriz = np.zeros((len(self.ids), dias))
+        if vendas:
+            datas, produtos, unidades = zip(*vendas)
+            linhas = np.array([self._indice.get(pid, -1) for pid in produtos])
+            idades = self._dia - np.array([date.fromisoformat(d).toordinal() for d in datas])
+            unidades = np.array(unidades, dtype=np.float64)
+
+            conhecidos = linhas >= 0
+            hoje = conhecidos & (idades == 0)
+            np.add.at(self.vendas_hoje, linhas[hoje], unidades[hoje])
+
+            passados = conhecidos & (idades >= 1) & (idades <= dias)
+            np.add.at(matriz, (linhas[passados], dias - idades[passados]), unidades[passados])
+
+        # Coluna dias-1 é ontem (peso alfa); normalizado pela soma dos pesos
+        pesos = self.alfa * (1 - self.alfa) ** np.arange(dias - 1, -1, -1)
+        return matriz @ pesos / pesos.sum()
+
+    def _avancar_dia(self, dia: int):
+        """Encerra os dias passados: incorpora as vendas do dia à taxa"""
+        decorridos = dia - self._dia
+        if decorridos <= 0:
+            return
+        self.taxa = self.alfa * self.vendas_hoje + (1 - self.alfa) * self.taxa
+        if decorridos > 1:
+            # Dias sem nenhuma movimentação contam como demanda zero
+            self.taxa *= (1 - self.alfa) ** (decorridos - 1)
+        self.vendas_hoje[:] = 0
+        self._dia = dia
+
+    def atualizar(self):
+        """Aplica as movimentações de estoque gravadas desde a última atualização"""
+        if time.monotonic() - self._carregado_em > PREVISAO_CONFIG['recarga_completa']:
+            self.carregar()
+            return
+
+        movimentacoes = self.db.movimentacoes_desde(self._ultima_movimentacao)
+        if any(m['produto_id'] not in self._indice for m in movimentacoes):
+            # Produto cadastrado depois da carga
+            self.carregar()
+            return
+
+        with self._lock:
+            for mov in movimentacoes:
+                self._avancar_dia(date.fromisoformat(mov['data']).toordinal())
+                i = self._indice[mov['produto_id']]
+                if mov['tipo_movimentacao'] == 'VENDA':
+                    self.vendas_hoje[i] += mov['quantidade']
+                elif mov['data_venda']:
+                    self._descontar_cancelamento(i, mov['quantidade'], mov['data_venda'])
+                self.estoque[i] = mov['estoque_atual']
+            if movimentacoes:
+                self._ultima_movimentacao = movimentacoes[-1]['id']
+            self._avancar_dia(self._hoje().toordinal())
+
+    def _descontar_cancelamento(self, i: int, quantidade: int, data_venda: str):
+        """
+        Retira da demanda as unidades de uma venda cancelada, no dia da venda
+        (como em vendas_produto_diario): de vendas_hoje se a venda é de hoje,
+        senão da taxa com o peso que aquele dia recebeu na suavização
+        """
+        idade = self._dia - date.fromisoformat(data_venda).toordinal()
+        if idade <= 0:
+            self.vendas_hoje[i] = max(self.vendas_hoje[i] - quantidade, 0)
+        elif idade <= self.dias_historico:
+            peso = self.alfa * (1 - self.alfa) ** (idade - 1)
+            self.taxa[i] = max(self.taxa[i] - peso * quantidade, 0)
+
+    # ==================== RESULTADOS ====================
+
+    def _dias_ate_ruptura(self) -> np.ndarray:
+        """Estoque / demanda diária (infinito para produtos sem demanda)"""
+        return np.divide(self.estoque, self.taxa, out=np.full(len(self.ids), np.inf),
+                         where=self.taxa > 1e-6)
+
+    def previsao(self) -> List[Dict[str, Any]]:
+        """
+        Previsão de ruptura dos produtos ativos, dos mais urgentes para os menos
+        Retorna: lista de {'produto_id', 'nome', 'estoque', 'demanda_diaria',
+                 'dias_ate_ruptura' (None se não há demanda)}
+        """
+        with self._lock:
+            dias = self._dias_ate_ruptura()
+            ordem = np.argsort(dias, kind='stable')
+            return [self._linha(i, dias[i]) for i in ordem if self.ativo[i]]
+
+    def sugestoes_reposicao(self, prazo_reposicao: Optional[int] = None,
+                            cobertura_dias: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Produtos que devem ser pedidos agora: acabam antes do prazo de reposição
+        ou já estão no mínimo. A quantidade cobre o prazo + cobertura_dias de
+        demanda prevista mais o estoque mínimo.
+        Retorna: lista como em previsao() com 'quantidade_sugerida'
+        """
+        with self._lock:
+            dias, sugerida, repor = self._reposicao(prazo_reposicao, cobertura_dias)
+            sugestoes = []
+            for i in np.flatnonzero(repor)[np.argsort(dias[repor], kind='stable')]:
+                linha = self._linha(i, dias[i])
+                linha['quantidade_sugerida'] = int(sugerida[i])
+                sugestoes.append(linha)
+            return sugestoes
+
+    def contar_ruptura_prevista(self, prazo_reposicao: Optional[int] = None,
+                                cobertura_dias: Optional[int] = None) -> int:
+        """Produtos acima do mínimo que estão nas sugestões de reposição (acabam antes do prazo)"""
+        with self._lock:
+            return int(np.count_nonzero(self._ruptura_prevista(prazo_reposicao, cobertura_dias)))
+
+    def ids_ruptura_prevista(self, prazo_reposicao: Optional[int] = None,
+                             cobertura_dias: Optional[int] = None) -> Set[int]:
+        """IDs dos produtos contados em contar_ruptura_prevista"""
+        with self._lock:
+            return set(self.ids[self._ruptura_prevista(prazo_reposicao, cobertura_dias)].tolist())
+
+    def _ruptura_prevista(self, prazo_reposicao: Optional[int], cobertura_dias: Optional[int]) -> np.ndarray:
+        _, _, repor = self._reposicao(prazo_reposicao, cobertura_dias)
+        return repor & (self.estoque > self.estoque_minimo)
+
+    def _reposicao(self, prazo_reposicao: Optional[int], cobertura_dias: Optional[int]):
+        """(dias até a ruptura, quantidade sugerida, máscara dos produtos a repor)"""
+        prazo = PREVISAO_CONFIG['prazo_reposicao'] if prazo_reposicao is None else prazo_reposicao
+        cobertura = PREVISAO_CONFIG['cobertura_dias'] if cobertura_dias is None else cobertura_dias
+
+        dias = self._dias_ate_ruptura()
+        alvo = np.ceil(self.taxa * (prazo + cobertura) + self.estoque_minimo)
+        sugerida = np.maximum(alvo - np.maximum(self.estoque, 0), 0)
+        repor = (self.ativo & ((dias <= prazo) | (self.estoque <= self.estoque_minimo))
+                 & (sugerida > 0))
+        return dias, sugerida, repor
+
+    def _linha(self, i: int, dias: float) -> Dict[str, Any]:
+        return {
+            'produto_id': int(self.ids[i]),
+            'nome': self.nomes[i],
+            'estoque': int(self.estoque[i]),
+            'demanda_diaria': round(float(self.taxa[i]), 2),
+            'dias_ate_ruptura': None if math.isinf(dias) else round(float(dias), 1)
+        }
@@ -1,10 +1,15 @@
 """
 Serviço de lógica de negócio para Produtos
 """
-from typing import List, Optional, Tuple
-from database import DatabaseManager, Produto
+import heapq
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from database import DatabaseManager, Produto, ProdutoAlerta
+from database.db_manager import REGRAS_REAJUSTE
 from utils.validators import validar_preco, validar_peso, validar_estoque
-from config.settings import TIPOS_ANIMAIS
+from utils.planilhas import ler_planilha, converter_decimal, converter_inteiro, salvar_rejeitados
+from config.settings import TIPOS_ANIMAIS, REPORT_CONFIG
 
 class ProdutoService:
     """Gerencia a lógica de negócio relacionada a produtos"""
@@ -148,9 +153,12 @@ class ProdutoService:
         else:
             return False, "Erro ao desativar produto"
     
-    def produtos_estoque_baixo(self) -> List[Produto]:
-        """Retorna produtos com estoque baixo ou crítico"""
-        return self.db.produtos_estoque_baixo()
+    def produtos_estoque_baixo(self, limite: Optional[int] = None) -> List[ProdutoAlerta]:
+        """
+        Retorna produtos com estoque baixo ou crítico (menor estoque primeiro)
+        Como ProdutoAlerta: id, nome, tipo_animal, marca, estoque, estoque_minimo e status_estoque
+        """
+        return self.db.produtos_estoque_baixo(limite)
     
     def calcular_valor_total_estoque(self) -> float:
         """Calcula o valor total do estoque"""
@@ -193,4 +201,195 @@ class ProdutoService:
             'maior_estoque': maior_estoque,
             'maior_margem': maior_margem
         }
-    
\ No newline at end of file
+    
+    def reajustar_precos(self, regra: str, valor: float, marca: Optional[str] = None,
+                         tipo_animal: Optional[str] = None,
+                         simular: bool = False) -> Tuple[bool, str, List[Dict[str, Any]]]:
+        """
+        Reajusta em lote o preço de venda dos produtos filtrados por marca e/ou tipo de animal
+        regra: 'percentual' (valor em %), 'fixo' (valor em R$ somado ao preço)
+               ou 'markup' (valor em % aplicado sobre o preço de custo)
+        Retorna: (sucesso, mensagem, prévia com preços anteriores e novos)
+        """
+        if regra not in REGRAS_REAJUSTE:
+            return False, f"Regra de reajuste inválida: {regra}", []
+        
+        if regra == 'markup' and valor <= 0:
+            return False, "Markup deve ser maior que zero", []
+        
+        if tipo_animal:
+            tipo_animal = self._normalizar_tipo_animal(tipo_animal)
+            if not tipo_animal:
+                return False, "Tipo de animal inválido", []
+        
+        previa = self.db.reajustar_precos(regra, valor, marca, tipo_animal, simular)
+        
+        if previa is None:
+            return False, "Erro ao reajustar preços", []
+        if not previa:
+            return False, "Nenhum produto encontrado para reajuste", []
+        if simular:
+            return True, f"{len(previa)} produtos seriam reajustados", previa
+        return True, f"{len(previa)} produtos reajustados com sucesso!", previa
+    
+    # ==================== RANKINGS E VELOCIDADE DE VENDAS ====================
+    
+    JANELAS_VENDAS = (7, 30, 90)
+    CRITERIOS_RANKING = ('unidades', 'receita')
+    
+    def _top(self, linhas: List[Dict[str, Any]], dias: int, limite: int,
+             criterio: str) -> List[Dict[str, Any]]:
+        """Seleciona os `limite` maiores com heap (O(N log K)) e inclui unidades/dia"""
+        top = heapq.nlargest(limite, linhas, key=lambda linha: linha[criterio])
+        for linha in top:
+            linha['unidades_por_dia'] = round(linha['unidades'] / dias, 2)
+        return top
+    
+    def _validar_ranking(self, dias: int, criterio: str, tipo_animal: Optional[str]) -> Optional[str]:
+        if dias <= 0:
+            raise ValueError("A janela deve ter pelo menos 1 dia")
+        if criterio not in self.CRITERIOS_RANKING:
+            raise ValueError(f"Critério de ranking inválido: {criterio}")
+        if tipo_animal:
+            tipo_normalizado = self._normalizar_tipo_animal(tipo_animal)
+            if not tipo_normalizado:
+                raise ValueError("Tipo de animal inválido")
+            return tipo_normalizado
+        return None
+    
+    def mais_vendidos(self, dias: int = 30, limite: int = 10,
+                      tipo_animal: Optional[str] = None, marca: Optional[str] = None,
+                      criterio: str = 'unidades') -> List[Dict[str, Any]]:
+        """
+        Produtos mais vendidos nos últimos `dias` dias
+        criterio: 'unidades' ou 'receita'
+        Retorna: lista de {'produto_id', 'nome', 'marca', 'tipo_animal', 'unidades',
+                 'receita', 'unidades_por_dia'} em ordem decrescente
+        """
+        tipo_animal = self._validar_ranking(dias, criterio, tipo_animal)
+        linhas = self.db.vendas_por_produto(dias, tipo_animal=tipo_animal, marca=marca)
+        return self._top(linhas, dias, limite, criterio)
+    
+    def mais_vendidos_por_grupo(self, agrupar_por: str = 'tipo_animal', dias: int = 30,
+                                limite: int = 5,
+                                criterio: str = 'unidades') -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Top-N de cada tipo de animal ou de cada marca
+        agrupar_por: 'tipo_animal' ou 'marca'
+        Retorna: {grupo: lista como em mais_vendidos}
+        """
+        if agrupar_por not in ('tipo_animal', 'marca'):
+            raise ValueError(f"Agrupamento inválido: {agrupar_por}")
+        self._validar_ranking(dias, criterio, None)
+        
+        grupos = defaultdict(list)
+        for linha in self.db.vendas_por_produto(dias):
+            grupos[linha[agrupar_por]].append(linha)
+        return {grupo: self._top(linhas, dias, limite, criterio)
+                for grupo, linhas in sorted(grupos.items())}
+    
+    def velocidade_vendas(self, produto_id: int,
+                          janelas: Tuple[int, ...] = JANELAS_VENDAS) -> Dict[int, Dict[str, float]]:
+        """
+        Velocidade de vendas de um produto em janelas móveis (padrão: 7, 30 e 90 dias)
+        Retorna: {dias: {'unidades', 'receita', 'unidades_por_dia'}}
+        """
+        velocidade = {}
+        for dias in janelas:
+            linhas = self.db.vendas_por_produto(dias, produto_id=produto_id)
+            unidades = linhas[0]['unidades'] if linhas else 0
+            velocidade[dias] = {
+                'unidades': unidades,
+                'receita': linhas[0]['receita'] if linhas else 0.0,
+                'unidades_por_dia': round(unidades / dias, 2)
+            }
+        return velocidade
+    
+    # ==================== IMPORTAÇÃO EM LOTE ====================
+    
+    def _produto_de_linha(self, dados: Dict[str, Any]) -> Tuple[Optional[Produto], str]:
+        """
+        Converte uma linha de planilha em Produto validado
+        Sem estoque mínimo na linha, o produto volta com estoque_minimo None: novos
+        recebem o padrão e os já cadastrados mantêm o mínimo ajustado na loja
+        """
+        try:
+            estoque_minimo = converter_inteiro(dados.get('estoque_minimo'))
+            produto = Produto(
+                nome=str(dados.get('nome') or '').strip(),
+                tipo_animal=str(dados.get('tipo_animal') or ''),
+                marca=str(dados.get('marca') or '').strip(),
+                peso=converter_decimal(dados.get('peso')) or 0.0,
+                preco_custo=converter_decimal(dados.get('preco_custo')) or 0.0,
+                preco_venda=converter_decimal(dados.get('preco_venda')) or 0.0,
+                estoque=converter_inteiro(dados.get('estoque')) or 0,
+                estoque_minimo=Produto.estoque_minimo if estoque_minimo is None else estoque_minimo,
+                codigo_barras=str(dados.get('codigo_barras') or '').strip()
+            )
+        except ValueError as e:
+            return None, f"Valor numérico inválido: {e}"
+        
+        if not produto.codigo_barras:
+            return None, "Código de barras é obrigatório na importação"
+        
+        valido, mensagem = self._validar_produto(produto)
+        if not valido:
+            return None, mensagem
+        if estoque_minimo is None:
+            produto.estoque_minimo = None
+        return produto, ""
+    
+    def importar_produtos(self, caminho, tamanho_lote: int = 1000) -> dict:
+        """
+        Importa uma tabela de preços de fornecedor (CSV/XLSX) em lotes
+        Cada lote é validado e gravado em uma única transação, inserindo ou
+        atualizando os produtos pelo código de barras. Produtos desativados continuam
+        desativados; os atualizados nessa situação são contados em 'inativos'.
+        Retorna: relatório com inseridos, atualizados, inativos e linhas rejeitadas
+        """
+        relatorio = {'inseridos': 0, 'atualizados': 0, 'inativos': 0, 'rejeitados': [],
+                     'arquivo_rejeitados': None}
+        codigos_vistos = set()
+        lote = []
+        
+        def gravar_lote():
+            resultado = self.db.importar_produtos_lote([produto for _, produto in lote])
+            if resultado is None:
+                relatorio['rejeitados'].extend(
+                    {'linha': linha, 'motivo': "Erro ao gravar lote no banco de dados",
+                     'dados': produto.codigo_barras}
+                    for linha, produto in lote
+                )
+            else:
+                relatorio['inseridos'] += resultado[0]
+                relatorio['atualizados'] += resultado[1]
+                relatorio['inativos'] += resultado[2]
+            lote.clear()
+        
+        for linha, dados in ler_planilha(caminho):
+            produto, motivo = self._produto_de_linha(dados)
+            
+            if produto and produto.codigo_barras in codigos_vistos:
+                produto, motivo = None, "Código de barras repetido na planilha"
+            
+            if not produto:
+                relatorio['rejeitados'].append({'linha': linha, 'motivo': motivo, 'dados': dados})
+                continue
+            
+            codigos_vistos.add(produto.codigo_barras)
+            lote.append((linha, produto))
+            
+            if len(lote) >= tamanho_lote:
+                gravar_lote()
+        
+        if lote:
+            gravar_lote()
+        
+        if relatorio['rejeitados']:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            relatorio['arquivo_rejeitados'] = salvar_rejeitados(
+                relatorio['rejeitados'],
+                REPORT_CONFIG['export_dir'] / f"importacao_produtos_rejeitados_{timestamp}.csv"
+            )
+        
+        return relatorio
@@ -1,139 +1,328 @@
 """
 Serviço de lógica de negócio para Vendas
 """
+import json
+import sqlite3
+import threading
+import time
 from typing import List, Optional, Tuple, Dict
 from datetime import datetime
-from database import DatabaseManager, Venda, ItemVenda
-from utils.validators import validar_desconto
+from functools import partial
+from config.settings import DATABASE
+from database import DatabaseManager, Venda, ItemVenda, Produto
+from utils.metricas import METRICAS
+from utils.validators import eh_inteiro, validar_desconto
+
+METRICA_VENDAS = METRICAS.contador('petshop_vendas_total', "Vendas registradas", resultado='sucesso')
+METRICA_VENDAS_RECUSADAS = METRICAS.contador('petshop_vendas_total', "Vendas registradas",
+                                             resultado='recusada')
+METRICA_CHECKOUT = METRICAS.histograma('petshop_checkout_segundos', "Latência de criar_venda")
+METRICA_CANCELAMENTOS = METRICAS.contador('petshop_vendas_canceladas_total', "Vendas canceladas")
+
+
+def _contar_vendas(resultados: List[Tuple[bool, str, Optional[int]]]):
+    sucessos = sum(1 for sucesso, _, _ in resultados if sucesso)
+    if sucessos:
+        METRICA_VENDAS.incrementar(sucessos)
+    if len(resultados) > sucessos:
+        METRICA_VENDAS_RECUSADAS.incrementar(len(resultados) - sucessos)
+
 
 class VendaService:
     """Gerencia a lógica de negócio relacionada a vendas"""
     
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
+        self._fila_grupo = None
+        self._lock_fila = threading.Lock()
+    
+    def _obter_fila_grupo(self):
+        """Fila de escrita usada no modo de durabilidade 'grupo' (criada sob demanda)"""
+        with self._lock_fila:
+            if self._fila_grupo is None:
+                from .fila_escrita import FilaEscrita
+                self._fila_grupo = FilaEscrita(self, janela_ms=DATABASE['janela_grupo_ms'])
+            return self._fila_grupo
+    
+    def _id_por_chave(self, coluna: str, chave: str) -> Optional[int]:
+        """Busca a venda associada a uma chave de idempotência (leitura sem transação)"""
+        with self.db._get_connection() as conn:
+            row = conn.execute(f'SELECT id FROM vendas WHERE {coluna} = ?', (chave,)).fetchone()
+            return row['id'] if row else None
     
     def criar_venda(self, cliente_id: Optional[int], itens: List[Dict],
                    forma_pagamento: str, desconto: float = 0.0,
-                   observacoes: str = "") -> Tuple[bool, str, Optional[int]]:
+                   observacoes: str = "",
+                   chave_idempotencia: Optional[str] = None) -> Tuple[bool, str, Optional[int]]:
         """
         Cria uma nova venda
         itens: lista de dicts com {'produto_id': int, 'quantidade': int}
+        chave_idempotencia: identificador único da requisição; repetir a chamada com
+        a mesma chave (ex.: após timeout) retorna a venda original sem gravar outra
         Retorna: (sucesso, mensagem, id_venda)
         """
         
         if not itens:
             return False, "Carrinho vazio! Adicione produtos para vender", None
         
-        # Validar e calcular totais
+        inicio = time.perf_counter()
+        resultado = self._criar_venda(cliente_id, itens, forma_pagamento, desconto, observacoes,
+                                      chave_idempotencia)
+        METRICA_CHECKOUT.observar(time.perf_counter() - inicio)
+        _contar_vendas([resultado])
+        return resultado
+    
+    def _criar_venda(self, cliente_id: Optional[int], itens: List[Dict], forma_pagamento: str,
+                     desconto: float, observacoes: str,
+                     chave_idempotencia: Optional[str]) -> Tuple[bool, str, Optional[int]]:
+        """Caminho de criar_venda até o commit (método interno)"""
+        try:
+            if chave_idempotencia:
+                venda_id = self._id_por_chave('chave_idempotencia', chave_idempotencia)
+                if venda_id:
+                    return True, f"Venda #{venda_id} já registrada", venda_id
+            
+            if self.db.durabilidade == 'grupo':
+                # Commit compartilhado com as vendas de outros terminais na mesma janela
+                return self._obter_fila_grupo().enviar_venda(
+                    cliente_id, itens, forma_pagamento, desconto, observacoes, chave_idempotencia
+                ).result()
+            
+            with self.db._get_transacao() as conn:
+                return self._registrar_venda(
+                    conn.cursor(), cliente_id, itens, forma_pagamento, desconto, observacoes,
+                    chave_idempotencia
+                )
+        except Exception as e:
+            return False, f"Erro ao processar venda: {str(e)}", None
+    
+    def criar_vendas_lote(self, vendas: List[Dict]) -> List[Tuple[bool, str, Optional[int]]]:
+        """
+        Cria várias vendas em uma única transação (um commit para o lote)
+        vendas: lista de dicts com os argumentos de criar_venda
+        Uma venda recusada não afeta as demais. Erros que impedem a transação
+        inteira (ex.: banco bloqueado ou indisponível) são propagados.
+        Retorna: lista de (sucesso, mensagem, id_venda) na ordem recebida
+        """
+        operacoes = [partial(self._operacao_venda, venda) for venda in vendas]
+        resultados = [
+            (False, f"Erro ao processar venda: {resultado}", None)
+            if isinstance(resultado, Exception) else resultado
+            for resultado in self.db.executar_em_lote(operacoes)
+        ]
+        _contar_vendas(resultados)
+        return resultados
+    
+    def _operacao_venda(self, venda: Dict, cursor) -> Tuple[bool, str, Optional[int]]:
+        """Adapta um dict de venda para _registrar_venda (usado em lotes)"""
+        if not venda.get('itens'):
+            return False, "Carrinho vazio! Adicione produtos para vender", None
+        return self._registrar_venda(
+            cursor, venda.get('cliente_id'), venda['itens'],
+            venda.get('forma_pagamento', 'Dinheiro'), venda.get('desconto', 0.0),
+            venda.get('observacoes', ''), venda.get('chave_idempotencia'),
+            venda.get('data_venda')
+        )
+    
+    def validar_venda(self, itens: List[Dict], desconto: float = 0.0,
+                      pendentes: Optional[Dict[str, List[Dict]]] = None,
+                      conn: Optional[sqlite3.Connection] = None) -> Tuple[bool, str]:
+        """
+        Confere a venda como criar_venda faria, sem gravar nada (produtos, estoque, desconto)
+        pendentes: {chave_idempotencia: itens} de vendas já confirmadas em outro lugar
+        (diário local) que podem ainda não estar no banco; as que não estão têm as
+        quantidades descontadas do estoque disponível
+        conn: conexão de leitura própria (ex.: com timeout curto); padrão é uma nova
+        Retorna: (valido, mensagem)
+        """
+        if not itens:
+            return False, "Carrinho vazio! Adicione produtos para vender"
+        if conn is not None:
+            try:
+                return self._conferir_venda(conn.cursor(), itens, desconto, pendentes)
+            finally:
+                conn.rollback()   # Encerra a transação de leitura
+        with self.db._get_connection() as conn:
+            return self._conferir_venda(conn.cursor(), itens, desconto, pendentes)
+    
+    def _conferir_venda(self, cursor, itens: List[Dict], desconto: float,
+                        pendentes: Optional[Dict[str, List[Dict]]]) -> Tuple[bool, str]:
+        """Leituras de validar_venda pelo cursor informado (método interno)"""
+        reservado = {}
+        if pendentes:
+            # Mesma transação de leitura para as chaves e o estoque: uma venda
+            # gravada entre as duas consultas não é contada duas vezes
+            if not cursor.connection.in_transaction:
+                cursor.execute('BEGIN')
+            cursor.execute(
+                'SELECT chave_idempotencia FROM vendas '
+                'WHERE chave_idempotencia IN (SELECT value FROM json_each(?))',
+                (json.dumps(list(pendentes)),)
+            )
+            gravadas = {row[0] for row in cursor.fetchall()}
+            for chave, itens_pendentes in pendentes.items():
+                if chave not in gravadas:
+                    for item in itens_pendentes:
+                        reservado[item['produto_id']] = (reservado.get(item['produto_id'], 0)
+                                                         + item['quantidade'])
+        valido, msg, _, _, _ = self._validar_itens(cursor, itens, desconto, reservado)
+        return valido, msg
+    
+    def _validar_itens(self, cursor, itens: List[Dict], desconto: float,
+                       reservado: Optional[Dict[int, int]] = None) -> Tuple:
+        """
+        Lê os produtos pelo cursor, confere quantidades, estoque e desconto (método interno)
+        Retorna: (valido, mensagem, valor_total, itens_venda, produtos por id)
+        """
+        reservado = reservado or {}
         valor_total = 0.0
         itens_venda = []
+        produtos = {}
         
         for item in itens:
             produto_id = item.get('produto_id')
             quantidade = item.get('quantidade', 0)
             
-            if quantidade <= 0:
-                return False, f"Quantidade inválida para o produto", None
+            if not eh_inteiro(produto_id):
+                return False, f"Produto inválido: {produto_id!r}", 0.0, [], {}
+            if not eh_inteiro(quantidade) or quantidade <= 0:
+                return False, f"Quantidade inválida para o produto", 0.0, [], {}
             
             # Buscar produto
-            produto = self.db.buscar_produto(produto_id)
-            if not produto:
-                return False, f"Produto ID {produto_id} não encontrado", None
+            produto = produtos.get(produto_id)
+            if produto is None:
+                cursor.execute('SELECT * FROM produtos WHERE id = ?', (produto_id,))
+                row = cursor.fetchone()
+                if not row:
+                    return False, f"Produto ID {produto_id} não encontrado", 0.0, [], {}
+                produto = produtos[produto_id] = Produto(**dict(row))
             
             if not produto.ativo:
-                return False, f"Produto '{produto.nome}' está inativo", None
+                return False, f"Produto '{produto.nome}' está inativo", 0.0, [], {}
             
-            # Verificar estoque
-            if produto.estoque < quantidade:
-                return False, f"Estoque insuficiente para '{produto.nome}'! Disponível: {produto.estoque}", None
+            # Verificar estoque (considerando linhas repetidas do mesmo produto)
+            disponivel = produto.estoque - reservado.get(produto_id, 0)
+            no_carrinho = sum(iv.quantidade for iv in itens_venda if iv.produto_id == produto_id)
+            if disponivel - no_carrinho < quantidade:
+                return (False, f"Estoque insuficiente para '{produto.nome}'! Disponível: {disponivel}",
+                        0.0, [], {})
             
             # Calcular subtotal
             subtotal = produto.preco_venda * quantidade
             valor_total += subtotal
             
             # Criar item de venda
-            item_venda = ItemVenda(
+            itens_venda.append(ItemVenda(
                 produto_id=produto_id,
                 produto_nome=produto.nome,
                 quantidade=quantidade,
                 preco_unitario=produto.preco_venda,
                 subtotal=subtotal
-            )
-            itens_venda.append((item_venda, produto))
+            ))
         
         # Validar desconto
         valido, msg = validar_desconto(desconto, valor_total)
+        if not valido:
+            return False, msg, 0.0, [], {}
+        
+        return True, "", valor_total, itens_venda, produtos
+    
+    def _registrar_venda(self, cursor, cliente_id: Optional[int], itens: List[Dict],
+                         forma_pagamento: str, desconto: float, observacoes: str,
+                         chave_idempotencia: Optional[str] = None,
+                         data_venda: Optional[str] = None) -> Tuple[bool, str, Optional[int]]:
+        """
+        Valida e grava uma venda dentro de uma transação já aberta (método interno)
+        Os produtos são lidos pelo mesmo cursor, então o estoque considerado já inclui
+        as vendas anteriores do mesmo lote. Nada é gravado se a validação falhar.
+        Se já existir venda com a chave de idempotência informada, retorna o ID dela.
+        data_venda: horário original (vendas capturadas offline); padrão é o atual
+        """
+        if chave_idempotencia:
+            cursor.execute('SELECT id FROM vendas WHERE chave_idempotencia = ?', (chave_idempotencia,))
+            row = cursor.fetchone()
+            if row:
+                return True, f"Venda #{row['id']} já registrada", row['id']
+        
+        valido, msg, valor_total, itens_venda, produtos = self._validar_itens(cursor, itens, desconto)
         if not valido:
             return False, msg, None
         
         valor_final = valor_total - desconto
         
-        # Criar venda no banco
-        try:
-            with self.db._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Inserir venda
-                cursor.execute('''
-                    INSERT INTO vendas (cliente_id, valor_total, desconto, valor_final, forma_pagamento, observacoes)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (cliente_id, valor_total, desconto, valor_final, forma_pagamento, observacoes))
-                
-                venda_id = cursor.lastrowid
-                
-                # Inserir itens da venda e baixar estoque
-                for item_venda, produto in itens_venda:
-                    # Inserir item
-                    cursor.execute('''
-                        INSERT INTO itens_venda (venda_id, produto_id, quantidade, preco_unitario, subtotal)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (venda_id, item_venda.produto_id, item_venda.quantidade,
-                          item_venda.preco_unitario, item_venda.subtotal))
-                    
-                    # Baixar estoque
-                    estoque_anterior = produto.estoque
-                    estoque_novo = estoque_anterior - item_venda.quantidade
-                    
-                    cursor.execute(
-                        'UPDATE produtos SET estoque = ? WHERE id = ?',
-                        (estoque_novo, produto.id)
-                    )
-                    
-                    # Registrar movimentação
-                    cursor.execute('''
-                        INSERT INTO movimentacoes_estoque 
-                        (produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual, observacao)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (produto.id, 'VENDA', item_venda.quantidade, estoque_anterior, 
-                          estoque_novo, f'Venda #{venda_id}'))
-                
-                conn.commit()
-                
-                return True, f"Venda #{venda_id} realizada com sucesso!", venda_id
-                
-        except Exception as e:
-            return False, f"Erro ao processar venda: {str(e)}", None
+        # Inserir venda
+        cursor.execute('''
+            INSERT INTO vendas (cliente_id, valor_total, desconto, valor_final, forma_pagamento,
+                                observacoes, chave_idempotencia, data_venda)
+            VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+        ''', (cliente_id, valor_total, desconto, valor_final, forma_pagamento, observacoes,
+              chave_idempotencia, data_venda))
+        
+        venda_id = cursor.lastrowid
+        
+        # Inserir itens da venda e baixar estoque
+        for item_venda in itens_venda:
+            produto = produtos[item_venda.produto_id]
+            
+            # Inserir item
+            cursor.execute('''
+                INSERT INTO itens_venda (venda_id, produto_id, quantidade, preco_unitario, subtotal)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (venda_id, item_venda.produto_id, item_venda.quantidade,
+                  item_venda.preco_unitario, item_venda.subtotal))
+            
+            # Baixar estoque
+            estoque_anterior = produto.estoque
+            estoque_novo = estoque_anterior - item_venda.quantidade
+            produto.estoque = estoque_novo
+            
+            cursor.execute(
+                'UPDATE produtos SET estoque = ? WHERE id = ?',
+                (estoque_novo, produto.id)
+            )
+            
+            # Registrar movimentação
+            cursor.execute('''
+                INSERT INTO movimentacoes_estoque 
+                (produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual,
+                 observacao, venda_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (produto.id, 'VENDA', item_venda.quantidade, estoque_anterior, 
+                  estoque_novo, f'Venda #{venda_id}', venda_id))
+        
+        self.db._atualizar_resumo_diario(cursor, venda_id)
+        
+        return True, f"Venda #{venda_id} realizada com sucesso!", venda_id
     
     def buscar_venda(self, venda_id: int) -> Optional[Dict]:
-        """Busca uma venda completa com seus itens"""
+        """Busca uma venda completa com seus itens (também em vendas arquivadas)"""
         try:
             with self.db._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 # Buscar venda
+                esquema = 'main'
                 cursor.execute('SELECT * FROM vendas WHERE id = ?', (venda_id,))
                 venda_row = cursor.fetchone()
                 
                 if not venda_row:
-                    return None
+                    # Venda antiga: consultar apenas o arquivo do ano que a contém
+                    ano = self.db._ano_arquivado_venda(conn, venda_id)
+                    if ano is None:
+                        return None
+                    esquema = self.db._anexar_arquivos(conn, [ano])[0]
+                    cursor.execute(f'SELECT * FROM {esquema}.vendas WHERE id = ?', (venda_id,))
+                    venda_row = cursor.fetchone()
+                    if not venda_row:
+                        return None
                 
                 venda = Venda(**dict(venda_row))
                 
                 # Buscar itens da venda
-                cursor.execute('''
+                cursor.execute(f'''
                     SELECT iv.*, p.nome as produto_nome
-                    FROM itens_venda iv
-                    JOIN produtos p ON iv.produto_id = p.id
+                    FROM {esquema}.itens_venda iv
+                    JOIN main.produtos p ON iv.produto_id = p.id
                     WHERE iv.venda_id = ?
                 ''', (venda_id,))
                 
@@ -158,12 +347,17 @@ class VendaService:
     def listar_vendas(self, data_inicio: Optional[str] = None,
                      data_fim: Optional[str] = None,
                      cliente_id: Optional[int] = None) -> List[Venda]:
-        """Lista vendas com filtros opcionais"""
+        """
+        Lista vendas com filtros opcionais
+        Os arquivos anuais só entram na consulta se o período alcança vendas arquivadas.
+        """
         try:
             with self.db._get_connection() as conn:
                 cursor = conn.cursor()
                 
-                query = 'SELECT * FROM vendas WHERE 1=1'
+                anos = self.db._anos_arquivados(conn, data_inicio or None, data_fim or None)
+                vendas = self.db._fonte_historica(conn, 'vendas', self.db._anexar_arquivos(conn, anos))
+                query = f'SELECT * FROM {vendas} WHERE 1=1'
                 params = []
                 
                 if data_inicio:
@@ -189,83 +383,140 @@ class VendaService:
             print(f"❌ Erro ao listar vendas: {e}")
             return []
     
-    def cancelar_venda(self, venda_id: int, motivo: str = "") -> Tuple[bool, str]:
+    def cancelar_venda(self, venda_id: int, motivo: str = "",
+                       chave_idempotencia: Optional[str] = None) -> Tuple[bool, str]:
         """
         Cancela uma venda e devolve produtos ao estoque
+        Verificações e atualizações ocorrem em uma única transação.
+        chave_idempotencia: repetir o cancelamento com a mesma chave retorna sucesso
+        sem devolver o estoque novamente
         Retorna: (sucesso, mensagem)
         """
-        venda_completa = self.buscar_venda(venda_id)
+        try:
+            if chave_idempotencia:
+                cancelada_id = self._id_por_chave('chave_cancelamento', chave_idempotencia)
+                if cancelada_id is not None:
+                    return self._resposta_chave_cancelamento(venda_id, cancelada_id)
+            
+            with self.db._get_transacao() as conn:
+                sucesso, mensagem = self._registrar_cancelamento(
+                    conn.cursor(), venda_id, motivo, chave_idempotencia
+                )
+            if sucesso:
+                METRICA_CANCELAMENTOS.incrementar()
+            return sucesso, mensagem
+        except Exception as e:
+            return False, f"Erro ao cancelar venda: {str(e)}"
+    
+    def _resposta_chave_cancelamento(self, venda_id: int, cancelada_id: int) -> Tuple[bool, str]:
+        """Resposta para um cancelamento repetido com chave já utilizada"""
+        if cancelada_id == venda_id:
+            return True, f"Venda #{venda_id} já cancelada"
+        return False, f"Chave de idempotência já usada no cancelamento da venda #{cancelada_id}"
+    
+    def _registrar_cancelamento(self, cursor, venda_id: int, motivo: str = "",
+                                chave_idempotencia: Optional[str] = None) -> Tuple[bool, str]:
+        """Verifica e cancela uma venda dentro de uma transação já aberta (método interno)"""
+        if chave_idempotencia:
+            cursor.execute('SELECT id FROM vendas WHERE chave_cancelamento = ?', (chave_idempotencia,))
+            row = cursor.fetchone()
+            if row:
+                return self._resposta_chave_cancelamento(venda_id, row['id'])
         
-        if not venda_completa:
-            return False, f"Venda #{venda_id} não encontrada"
+        cursor.execute('SELECT status FROM vendas WHERE id = ?', (venda_id,))
+        venda_row = cursor.fetchone()
         
-        venda = venda_completa['venda']
+        if not venda_row:
+            return False, f"Venda #{venda_id} não encontrada"
         
-        if venda.status == 'Cancelada':
+        if venda_row['status'] == 'Cancelada':
             return False, "Venda já está cancelada"
         
-        try:
-            with self.db._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Devolver produtos ao estoque
-                for item in venda_completa['itens']:
-                    # Buscar estoque atual
-                    cursor.execute('SELECT estoque FROM produtos WHERE id = ?', (item.produto_id,))
-                    row = cursor.fetchone()
-                    
-                    if row:
-                        estoque_anterior = row['estoque']
-                        estoque_novo = estoque_anterior + item.quantidade
-                        
-                        # Atualizar estoque
-                        cursor.execute(
-                            'UPDATE produtos SET estoque = ? WHERE id = ?',
-                            (estoque_novo, item.produto_id)
-                        )
-                        
-                        # Registrar movimentação
-                        cursor.execute('''
-                            INSERT INTO movimentacoes_estoque 
-                            (produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual, observacao)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                        ''', (item.produto_id, 'ENTRADA', item.quantidade, estoque_anterior,
-                              estoque_novo, f'Cancelamento venda #{venda_id} - {motivo}'))
+        cursor.execute(
+            'SELECT produto_id, quantidade FROM itens_venda WHERE venda_id = ?', (venda_id,)
+        )
+        
+        # Devolver produtos ao estoque
+        for item in cursor.fetchall():
+            # Buscar estoque atual
+            cursor.execute('SELECT estoque FROM produtos WHERE id = ?', (item['produto_id'],))
+            row = cursor.fetchone()
+            
+            if row:
+                estoque_anterior = row['estoque']
+                estoque_novo = estoque_anterior + item['quantidade']
                 
-                # Atualizar status da venda
-                observacao_cancelamento = f"CANCELADA - {motivo}" if motivo else "CANCELADA"
+                # Atualizar estoque
                 cursor.execute(
-                    'UPDATE vendas SET status = ?, observacoes = ? WHERE id = ?',
-                    ('Cancelada', observacao_cancelamento, venda_id)
+                    'UPDATE produtos SET estoque = ? WHERE id = ?',
+                    (estoque_novo, item['produto_id'])
                 )
                 
-                conn.commit()
-                
-                return True, f"Venda #{venda_id} cancelada e produtos devolvidos ao estoque"
-                
-        except Exception as e:
-            return False, f"Erro ao cancelar venda: {str(e)}"
+                # Registrar movimentação
+                cursor.execute('''
+                    INSERT INTO movimentacoes_estoque 
+                    (produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual,
+                     observacao, venda_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (item['produto_id'], 'ENTRADA', item['quantidade'], estoque_anterior,
+                      estoque_novo, f'Cancelamento venda #{venda_id} - {motivo}', venda_id))
+        
+        self.db._atualizar_resumo_diario(cursor, venda_id, sinal=-1)
+        
+        # Atualizar status da venda
+        observacao_cancelamento = f"CANCELADA - {motivo}" if motivo else "CANCELADA"
+        cursor.execute(
+            'UPDATE vendas SET status = ?, observacoes = ?, chave_cancelamento = ? WHERE id = ?',
+            ('Cancelada', observacao_cancelamento, chave_idempotencia, venda_id)
+        )
+        
+        return True, f"Venda #{venda_id} cancelada e produtos devolvidos ao estoque"
+    
+    def _filtro_periodo_resumo(self, data_inicio: Optional[str],
+                               data_fim: Optional[str]) -> Tuple[str, list]:
+        """Monta o filtro de período sobre vendas_resumo_diario"""
+        query = ' WHERE 1=1'
+        params = []
+        if data_inicio:
+            query += ' AND data >= date(?)'
+            params.append(data_inicio)
+        if data_fim:
+            query += ' AND data <= date(?)'
+            params.append(data_fim)
+        return query, params
     
     def obter_estatisticas_vendas(self, data_inicio: Optional[str] = None,
                                   data_fim: Optional[str] = None) -> dict:
-        """Retorna estatísticas de vendas para um período"""
-        vendas = self.listar_vendas(data_inicio, data_fim)
+        """
+        Retorna estatísticas de vendas para um período
+        Lê o resumo diário (uma linha por dia e forma de pagamento), não as vendas
+        """
+        formas_pagamento = {}
+        total_descontos = 0.0
         
-        vendas_concluidas = [v for v in vendas if v.status == 'Concluída']
+        try:
+            filtro, params = self._filtro_periodo_resumo(data_inicio, data_fim)
+            with self.db._get_connection() as conn:
+                rows = conn.execute(f'''
+                    SELECT forma_pagamento, SUM(quantidade_vendas) AS quantidade,
+                           SUM(valor_liquido) AS valor, SUM(valor_desconto) AS descontos
+                    FROM vendas_resumo_diario{filtro}
+                    GROUP BY forma_pagamento
+                    HAVING SUM(quantidade_vendas) > 0
+                ''', params).fetchall()
+            
+            for row in rows:
+                formas_pagamento[row['forma_pagamento']] = {
+                    'quantidade': row['quantidade'], 'valor': round(row['valor'], 2)
+                }
+                total_descontos += row['descontos']
+        except Exception as e:
+            print(f"❌ Erro ao obter estatísticas de vendas: {e}")
         
-        total_vendas = len(vendas_concluidas)
-        valor_total = sum(v.valor_final for v in vendas_concluidas)
+        total_vendas = sum(f['quantidade'] for f in formas_pagamento.values())
+        valor_total = round(sum(f['valor'] for f in formas_pagamento.values()), 2)
         ticket_medio = valor_total / total_vendas if total_vendas > 0 else 0
-        total_descontos = sum(v.desconto for v in vendas_concluidas)
-        
-        # Vendas por forma de pagamento
-        formas_pagamento = {}
-        for venda in vendas_concluidas:
-            forma = venda.forma_pagamento
-            if forma not in formas_pagamento:
-                formas_pagamento[forma] = {'quantidade': 0, 'valor': 0.0}
-            formas_pagamento[forma]['quantidade'] += 1
-            formas_pagamento[forma]['valor'] += venda.valor_final
+        total_descontos = round(total_descontos, 2)
         
         return {
             'total_vendas': total_vendas,
@@ -273,4 +524,26 @@ class VendaService:
             'ticket_medio': ticket_medio,
             'total_descontos': total_descontos,
             'formas_pagamento': formas_pagamento
-        }
\ No newline at end of file
+        }
+    
+    def obter_faturamento_diario(self, data_inicio: Optional[str] = None,
+                                 data_fim: Optional[str] = None) -> List[Dict]:
+        """
+        Série diária de faturamento para gráficos (uma linha por dia com venda)
+        Retorna: lista de {'data', 'quantidade', 'valor', 'itens'} em ordem de data
+        """
+        try:
+            filtro, params = self._filtro_periodo_resumo(data_inicio, data_fim)
+            with self.db._get_connection() as conn:
+                rows = conn.execute(f'''
+                    SELECT data, SUM(quantidade_vendas) AS quantidade,
+                           ROUND(SUM(valor_liquido), 2) AS valor, SUM(itens_vendidos) AS itens
+                    FROM vendas_resumo_diario{filtro}
+                    GROUP BY data
+                    HAVING SUM(quantidade_vendas) > 0
+                    ORDER BY data
+                ''', params).fetchall()
+                return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"❌ Erro ao obter faturamento diário: {e}")
+            return []
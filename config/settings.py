@@ -7,7 +7,17 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Configurações do Banco de Dados
 DATABASE = {
     'name': 'petshop.db',
-    'path': BASE_DIR / 'petshop.db'
+    'path': BASE_DIR / 'petshop.db',
+    # Modo de durabilidade das gravações (ver MODOS_DURABILIDADE em database/db_manager.py):
+    #   'estrita' - fsync a cada commit, journal tradicional (padrão; funciona em pasta de rede)
+    #   'normal'  - WAL com synchronous=NORMAL (mais rápido; pode perder as últimas vendas
+    #               em queda de energia, nunca corrompe o banco)
+    #   'grupo'   - WAL com fsync por commit, vendas agrupadas em uma janela curta
+    'durabilidade': 'estrita',
+    'janela_grupo_ms': 5,  # Espera máxima para agrupar vendas no modo 'grupo'
+    # Comandos compilados mantidos por conexão (cache LRU do sqlite3, padrão 128). Cobre os
+    # comandos distintos do DatabaseManager para que as conexões reutilizadas não recompilem
+    'cache_comandos': 256
 }
 
 # Configurações da Aplicação
@@ -17,7 +27,9 @@ APP_CONFIG = {
     'company': 'Marte Systems',
     'window_title': '🐾 Sistema Marte Pet Shop',
     'min_width': 1200,
-    'min_height': 700
+    'min_height': 700,
+    # Intervalo da verificação de commits de outros terminais/processos (PRAGMA data_version)
+    'intervalo_versao_ms': 3000
 }
 
 # Configurações de Estoque
@@ -36,6 +48,75 @@ REPORT_CONFIG = {
 REPORT_CONFIG['export_dir'].mkdir(exist_ok=True)
 REPORT_CONFIG['backup_dir'].mkdir(exist_ok=True)
 
+# Diário local de vendas (captura offline). Deve ficar no disco do próprio caixa,
+# não na pasta compartilhada do banco.
+DIARIO_CONFIG = {
+    'caminho': BASE_DIR / 'diario' / 'vendas.jsonl',
+    'intervalo_reenvio': 2.0,   # Segundos entre tentativas quando o banco está indisponível
+    'tamanho_lote': 200,        # Vendas gravadas no banco por transação
+    # Espera máxima (segundos) da conferência no banco ao fechar a venda; com o banco
+    # bloqueado ou inacessível a venda segue só com a conferência local
+    'espera_validacao': 0.2
+}
+
+# Previsão de ruptura e sugestão de reposição
+PREVISAO_CONFIG = {
+    'alfa': 0.2,               # Suavização exponencial da demanda diária (0-1)
+    'dias_historico': 180,     # Dias de vendas usados na carga inicial
+    'prazo_reposicao': 7,      # Dias entre o pedido e a chegada do fornecedor
+    'cobertura_dias': 30,      # Dias de venda que o pedido deve cobrir
+    'recarga_completa': 3600   # Segundos até recarregar cadastro (mínimos, inativos)
+}
+
+# Checkpoints de estoque (consultas de estoque em datas passadas)
+CHECKPOINT_CONFIG = {
+    'intervalo_horas': 24   # Novo checkpoint ao abrir o sistema se o último for mais antigo
+}
+
+# Arquivamento de histórico (vendas e movimentações antigas em arquivos anuais)
+ARQUIVO_CONFIG = {
+    'horizonte_dias': 730   # Registros mais antigos que isso saem do banco principal
+}
+
+# Instrumentação das consultas SQL (diagnóstico de lentidão; desativada não tem custo)
+INSTRUMENTACAO_CONFIG = {
+    'ativa': False,
+    'limite_lenta_ms': 50,                                  # Comandos mais lentos vão para o log
+    'log_lentas': BASE_DIR / 'logs' / 'consultas_lentas.log',
+    'lentas_em_memoria': 100                                # Últimas lentas mantidas para consulta
+}
+
+# Métricas da aplicação (formato Prometheus)
+METRICAS_CONFIG = {
+    'exportar': False,     # Servir /metrics em host:porta enquanto a interface estiver aberta
+    'host': '127.0.0.1',   # Apenas na máquina local
+    'porta': 9464
+}
+
+# Perfilamento das ações da interface (também ligado pelo menu Ajuda ou PETSHOP_PERFIL=1)
+PERFIL_CONFIG = {
+    'ativo': os.environ.get('PETSHOP_PERFIL', '') not in ('', '0'),
+    'pasta': REPORT_CONFIG['export_dir'] / 'perfis',
+    'intervalo_ms': 1,     # Intervalo entre amostras da pilha
+    'minimo_ms': 100       # Ações mais rápidas só entram em acoes.csv (sem arquivos de perfil)
+}
+
+# Configurações da API REST local (servidor sem interface gráfica)
+API_CONFIG = {
+    'host': '127.0.0.1',
+    'porta': 8765,
+    'leitores': 4,                    # Conexões/threads de leitura
+    'tamanho_maximo_corpo': 1048576,  # 1 MB
+    'cache_catalogo': 256             # Respostas de catálogo mantidas em memória
+}
+
+# Acesso assíncrono aos serviços (business/acesso_assincrono.py) para rotinas fora da interface
+ASSINCRONO_CONFIG = {
+    'leitores': 4,             # Threads/conexões de leitura (além do escritor único)
+    'maximo_pendentes': 1000,  # Chamadas na fila ou em execução; as demais aguardam uma vaga
+    'espera_maxima': None      # Segundos aguardando vaga antes de AcessoSobrecarregado (None = sem limite)
+}
+
 # Tipos de animais válidos
 TIPOS_ANIMAIS = ['gato', 'cão']
 
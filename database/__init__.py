@@ -2,6 +2,7 @@ from .db_manager import DatabaseManager
 from .models import (
     Cliente,
     Produto,
+    ProdutoAlerta,
     Venda,
     ItemVenda,
     MovimentacaoEstoque
@@ -11,6 +12,7 @@ __all__ = [
     'DatabaseManager',
     'Cliente',
     'Produto',
+    'ProdutoAlerta',
     'Venda',
     'ItemVenda',
     'MovimentacaoEstoque'
@@ -0,0 +1,53 @@
+"""
+Registro dos comandos SQL montados em tempo de execução
+
+O sqlite3 guarda, por conexão, os comandos já compilados em um cache LRU
+indexado pelo texto exato do SQL (tamanho DATABASE['cache_comandos']). Os
+comandos literais do DatabaseManager já são sempre o mesmo texto; os UPDATEs
+parciais (atualizar_produto/atualizar_cliente) dependiam da ordem dos kwargs.
+Aqui cada combinação de campos vira uma chave com as colunas na ordem canônica
+da tabela, e o texto é montado uma única vez: {'nome', 'marca'} e
+{'marca', 'nome'} reutilizam o mesmo comando compilado.
+"""
+import threading
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+# Colunas que cada atualização parcial pode alterar, na ordem usada no SQL
+CAMPOS_ATUALIZAVEIS: Dict[str, Tuple[str, ...]] = {
+    'produtos': ('nome', 'tipo_animal', 'marca', 'peso', 'preco_custo', 'preco_venda',
+                 'estoque_minimo', 'codigo_barras', 'ativo'),
+    'clientes': ('nome', 'cpf', 'telefone', 'email', 'endereco', 'ativo'),
+}
+
+
+class RegistroComandos:
+    """Textos SQL por chave (tabela, campos); cada texto é montado uma vez"""
+
+    def __init__(self):
+        self._atualizacoes: Dict[Tuple[str, FrozenSet[str]], Tuple[str, Tuple[str, ...]]] = {}
+        self._lock = threading.Lock()
+
+    def atualizacao(self, tabela: str, campos: Iterable[str]) -> Optional[Tuple[str, Tuple[str, ...]]]:
+        """
+        UPDATE parcial da tabela pelo id para os campos permitidos entre `campos`
+        Retorna: (sql, colunas na ordem dos '?') ou None se nenhum campo é permitido
+        """
+        permitidos = CAMPOS_ATUALIZAVEIS[tabela]
+        chave = (tabela, frozenset(campos).intersection(permitidos))
+        if not chave[1]:
+            return None
+        comando = self._atualizacoes.get(chave)
+        if comando is not None:
+            return comando
+        colunas = tuple(campo for campo in permitidos if campo in chave[1])
+        sql = f"UPDATE {tabela} SET {', '.join(f'{coluna} = ?' for coluna in colunas)} WHERE id = ?"
+        with self._lock:
+            return self._atualizacoes.setdefault(chave, (sql, colunas))
+
+    def quantidade(self) -> int:
+        """Combinações de campos já montadas"""
+        return len(self._atualizacoes)
+
+
+# Registro usado por todos os DatabaseManager
+COMANDOS = RegistroComandos()
@@ -2,43 +2,288 @@
 Gerenciador principal do banco de dados SQLite
 """
 import sqlite3
-import shutil
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Callable, Set
 from contextlib import contextmanager
 
-from config.settings import DATABASE, REPORT_CONFIG
-from .models import Cliente, Produto, Venda, ItemVenda, MovimentacaoEstoque
+from config.settings import DATABASE, INSTRUMENTACAO_CONFIG, REPORT_CONFIG
+from utils.metricas import METRICAS
+from .comandos import COMANDOS
+from .instrumentacao import ConexaoInstrumentada, Instrumentacao
+from .models import Cliente, Produto, ProdutoAlerta, Venda, ItemVenda, MovimentacaoEstoque
+
+# Modos de durabilidade (DATABASE['durabilidade']) e garantias contra perda de dados:
+#   estrita - journal tradicional + fsync completo a cada commit. Toda venda confirmada
+#             está em disco; nada se perde em queda de energia. Maior latência por venda.
+#   normal  - WAL + synchronous=NORMAL. Queda do programa não perde nada; queda de
+#             energia/sistema pode perder os commits feitos desde o último checkpoint
+#             do WAL, mas o banco nunca fica corrompido.
+#   grupo   - WAL + fsync a cada commit, com as vendas agrupadas pela FilaEscrita em
+#             uma janela de até DATABASE['janela_grupo_ms']. Venda confirmada nunca se
+#             perde; a latência sobe no máximo a janela e o custo do fsync é dividido.
+# Os modos com WAL exigem o banco em disco local (WAL não funciona em pasta de rede).
+MODOS_DURABILIDADE = {
+    'estrita': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+    'normal': {'journal_mode': 'WAL', 'synchronous': 'NORMAL'},
+    'grupo': {'journal_mode': 'WAL', 'synchronous': 'FULL'},
+}
+
+# Tabelas cujos registros antigos vão para os arquivos anuais (arquivar_historico)
+TABELAS_ARQUIVO = ('vendas', 'itens_venda', 'movimentacoes_estoque')
+
+# Índices criados em cada arquivo anual: (nome, tabela, coluna)
+INDICES_ARQUIVO = (
+    ('idx_vendas_data', 'vendas', 'data_venda'),
+    ('idx_itens_venda_venda', 'itens_venda', 'venda_id'),
+    ('idx_movimentacoes_data', 'movimentacoes_estoque', 'data_movimentacao'),
+    ('idx_movimentacoes_produto', 'movimentacoes_estoque', 'produto_id'),
+)
+
+# Métricas do acesso ao banco (utils.metricas)
+METRICA_CONEXOES = METRICAS.contador(
+    'petshop_db_conexoes_abertas_total', "Conexões SQLite abertas")
+METRICA_ESPERA_ESCRITA = METRICAS.histograma(
+    'petshop_db_espera_bloqueio_segundos', "Espera pelo bloqueio de escrita (BEGIN IMMEDIATE)")
+METRICA_BLOQUEADO = METRICAS.contador(
+    'petshop_db_bloqueado_total', "Operações interrompidas por banco bloqueado (database is locked)")
+
+# Produtos em algum nível de alerta de estoque (sem estoque, crítico ou baixo). É a
+# condição do índice parcial idx_produtos_alerta: as consultas de alerta repetem o texto
+# exato para que o SQLite use o índice (que só contém esses produtos)
+CONDICAO_ALERTA_ESTOQUE = 'ativo = 1 AND (estoque <= 2 OR estoque <= estoque_minimo)'
+
+# Último instante já gravado no histórico de estoque (movimentações e checkpoints),
+# fora a linha NEW que o gatilho está tratando
+_ULTIMO_INSTANTE = '''MAX(
+        COALESCE((SELECT data_movimentacao FROM movimentacoes_estoque
+                  WHERE id <> {movimentacao} ORDER BY data_movimentacao DESC LIMIT 1), ''),
+        COALESCE((SELECT data_checkpoint FROM estoque_checkpoints
+                  WHERE id <> {checkpoint} ORDER BY data_checkpoint DESC LIMIT 1), ''))
+'''
+
+# Cada terminal grava data_movimentacao/data_checkpoint com o próprio relógio
+# (CURRENT_TIMESTAMP do processo que escreve). Dentro da transação de escrita, que é
+# serializada, o instante nunca fica antes do último já gravado: a ordem dos IDs e a
+# das datas coincidem mesmo com relógios dessincronizados (ver estoque_na_data)
+GATILHOS_ORDEM_ESTOQUE = (
+    ('trg_movimentacoes_ordem', 'movimentacoes_estoque', 'data_movimentacao',
+     _ULTIMO_INSTANTE.format(movimentacao='NEW.id', checkpoint='0')),
+    ('trg_estoque_checkpoints_ordem', 'estoque_checkpoints', 'data_checkpoint',
+     _ULTIMO_INSTANTE.format(movimentacao='0', checkpoint='NEW.id')),
+)
+
+# Nome usado nas mensagens de erro das atualizações parciais
+TABELAS_SINGULAR = {'produtos': 'produto', 'clientes': 'cliente'}
+
+# Expressões SQL do novo preço de venda para cada regra de reajuste em lote
+REGRAS_REAJUSTE = {
+    'percentual': 'ROUND(preco_venda * (1 + ? / 100.0), 2)',
+    'fixo': 'ROUND(preco_venda + ?, 2)',
+    'markup': 'ROUND(preco_custo * (1 + ? / 100.0), 2)',
+}
+
+
+def _contar_bloqueio(erro: Exception):
+    if isinstance(erro, sqlite3.OperationalError) and 'locked' in str(erro):
+        METRICA_BLOQUEADO.incrementar()
 
 
 class DatabaseManager:
     """Gerencia todas as operações com o banco de dados"""
     
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, reutilizar_conexoes: bool = False,
+                 durabilidade: Optional[str] = None):
+        """
+        reutilizar_conexoes: mantém uma conexão aberta por thread em vez de abrir
+        uma nova a cada operação (usado por serviços com threads dedicadas)
+        durabilidade: 'estrita', 'normal' ou 'grupo' (padrão: DATABASE['durabilidade'])
+        """
         self.db_path = db_path or str(DATABASE['path'])
+        self.durabilidade = durabilidade or DATABASE['durabilidade']
+        if self.durabilidade not in MODOS_DURABILIDADE:
+            raise ValueError(f"Modo de durabilidade inválido: {self.durabilidade}")
+        self._conexoes = threading.local() if reutilizar_conexoes else None
+        self._conexoes_abertas: Set[sqlite3.Connection] = set()   # Reutilizadas de todas as threads
+        self._lock_conexoes = threading.Lock()
+        self._ouvintes_escrita: List[Callable[[], None]] = []
+        self._monitor: Optional[sqlite3.Connection] = None
+        self._lock_monitor = threading.Lock()
+        self.instrumentacao: Optional[Instrumentacao] = (
+            Instrumentacao() if INSTRUMENTACAO_CONFIG['ativa'] else None
+        )
         self._init_database()
         self._insert_test_data()
     
+    def _conectar(self, **opcoes) -> sqlite3.Connection:
+        """Abre uma nova conexão configurada (opcoes vão para sqlite3.connect, ex.: timeout)"""
+        instrumentacao = self.instrumentacao
+        if instrumentacao is None:
+            conn = sqlite3.connect(self.db_path, cached_statements=DATABASE['cache_comandos'], **opcoes)
+        else:
+            inicio = time.perf_counter()
+            conn = sqlite3.connect(self.db_path, factory=ConexaoInstrumentada,
+                                   cached_statements=DATABASE['cache_comandos'], **opcoes)
+            conn.instrumentacao = instrumentacao
+            conn.tamanho_cache = DATABASE['cache_comandos']
+        METRICA_CONEXOES.incrementar()
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA synchronous = {MODOS_DURABILIDADE[self.durabilidade]['synchronous']}")
+        if instrumentacao is not None:
+            instrumentacao.registrar_conexao((time.perf_counter() - inicio) * 1000)
+        return conn
+    
+    def ativar_instrumentacao(self, limite_lenta_ms: Optional[float] = None) -> Instrumentacao:
+        """
+        Passa a medir os comandos SQL das conexões abertas a partir de agora
+        (conexões reutilizadas já abertas continuam sem medição)
+        """
+        if self.instrumentacao is None:
+            self.instrumentacao = Instrumentacao(limite_lenta_ms)
+        elif limite_lenta_ms is not None:
+            self.instrumentacao.limite_lenta_ms = limite_lenta_ms
+        return self.instrumentacao
+    
+    def desativar_instrumentacao(self):
+        """Novas conexões voltam a ser comuns (sem custo de medição)"""
+        self.instrumentacao = None
+    
+    def estatisticas_consultas(self, limite: int = 20) -> Optional[Dict[str, Any]]:
+        """Resumo da instrumentação (ver Instrumentacao.resumo) ou None se desativada"""
+        if self.instrumentacao is None:
+            return None
+        return self.instrumentacao.resumo(limite)
+    
+    def ao_confirmar_escrita(self, callback: Callable[[], None]):
+        """
+        Registra uma função chamada após cada commit que alterou o banco
+        (executada na thread que gravou; deve ser rápida e não acessar o banco)
+        """
+        self._ouvintes_escrita.append(callback)
+    
+    def _notificar_escrita(self):
+        for callback in list(self._ouvintes_escrita):
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Erro ao notificar alteração do banco: {e}")
+    
+    def versao_dados(self) -> Optional[int]:
+        """
+        Número que muda a cada commit de qualquer conexão ao arquivo (inclusive de
+        outros processos), lido por PRAGMA data_version em uma conexão dedicada
+        """
+        try:
+            with self._lock_monitor:
+                if self._monitor is None:
+                    self._monitor = sqlite3.connect(self.db_path, check_same_thread=False)
+                return self._monitor.execute('PRAGMA data_version').fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao ler versão do banco: {e}")
+            return None
+    
     @contextmanager
     def _get_connection(self):
         """Context manager para conexões ao banco de dados"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        if self._conexoes is not None:
+            with self._get_connection_reutilizada() as conn:
+                yield conn
+            return
+        
+        conn = self._conectar()
         try:
             yield conn
             conn.commit()
+            if conn.total_changes and self._ouvintes_escrita:
+                self._notificar_escrita()
         except Exception as e:
             conn.rollback()
+            _contar_bloqueio(e)
+            raise e
+        finally:
+            conn.close()
+    
+    @contextmanager
+    def _get_connection_reutilizada(self):
+        """Usa a conexão da thread atual; só o bloco mais externo faz commit/rollback"""
+        conn = self.conexao_da_thread()
+        
+        self._conexoes.nivel += 1
+        try:
+            yield conn
+            if self._conexoes.nivel == 1:
+                conn.commit()
+                if conn.total_changes != self._conexoes.alteracoes:
+                    self._conexoes.alteracoes = conn.total_changes
+                    self._notificar_escrita()
+        except Exception as e:
+            if self._conexoes.nivel == 1:
+                conn.rollback()
+                _contar_bloqueio(e)
             raise e
         finally:
+            self._conexoes.nivel -= 1
+    
+    def conexao_da_thread(self) -> sqlite3.Connection:
+        """
+        Conexão reutilizada da thread atual, aberta se ainda não existir
+        (só com reutilizar_conexoes; usada para interromper a thread com conn.interrupt())
+        """
+        if self._conexoes is None:
+            raise ValueError("conexao_da_thread exige reutilizar_conexoes=True")
+        conn = getattr(self._conexoes, 'conn', None)
+        if conn is None:
+            # check_same_thread=False só para fechar_conexoes poder fechá-la de fora
+            conn = self._conexoes.conn = self._conectar(check_same_thread=False)
+            self._conexoes.nivel = 0
+            self._conexoes.alteracoes = 0
+            with self._lock_conexoes:
+                self._conexoes_abertas.add(conn)
+        return conn
+    
+    def fechar_conexao_thread(self):
+        """Fecha a conexão reutilizada da thread atual (se houver)"""
+        if self._conexoes is None:
+            return
+        conn = getattr(self._conexoes, 'conn', None)
+        if conn is not None:
+            with self._lock_conexoes:
+                self._conexoes_abertas.discard(conn)
+            conn.close()
+            self._conexoes.conn = None
+    
+    def fechar_conexoes(self):
+        """
+        Fecha as conexões reutilizadas de todas as threads (ex.: após o shutdown de
+        um pool de threads); só deve ser chamado com essas threads paradas
+        """
+        with self._lock_conexoes:
+            conexoes, self._conexoes_abertas = self._conexoes_abertas, set()
+        for conn in conexoes:
             conn.close()
     
+    @contextmanager
+    def _get_transacao(self):
+        """Context manager para transações de escrita em lote (BEGIN IMMEDIATE)"""
+        with self._get_connection() as conn:
+            if not conn.in_transaction:
+                inicio = time.perf_counter()
+                try:
+                    conn.execute('BEGIN IMMEDIATE')
+                finally:
+                    METRICA_ESPERA_ESCRITA.observar(time.perf_counter() - inicio)
+            yield conn
+    
     def _init_database(self):
         """Inicializa todas as tabelas do banco de dados"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
+            # Modo de journal é persistente no arquivo; aplicar conforme a durabilidade
+            cursor.execute(f"PRAGMA journal_mode = {MODOS_DURABILIDADE[self.durabilidade]['journal_mode']}")
+            
             # Tabela de Clientes
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS clientes (
@@ -83,6 +328,8 @@ class DatabaseManager:
                     forma_pagamento TEXT NOT NULL,
                     status TEXT DEFAULT 'Concluída' CHECK (status IN ('Concluída', 'Cancelada')),
                     observacoes TEXT,
+                    chave_idempotencia TEXT,
+                    chave_cancelamento TEXT,
                     FOREIGN KEY (cliente_id) REFERENCES clientes(id)
                 )
             ''')
@@ -112,19 +359,172 @@ class DatabaseManager:
                     estoque_atual INTEGER NOT NULL,
                     data_movimentacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     observacao TEXT,
+                    venda_id INTEGER,  -- Venda que gerou a movimentação (VENDA ou devolução do cancelamento)
                     FOREIGN KEY (produto_id) REFERENCES produtos(id)
                 )
             ''')
             
+            # Tabela de Histórico de Preços (auditoria de reajustes)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS historico_precos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    produto_id INTEGER NOT NULL,
+                    preco_anterior REAL NOT NULL,
+                    preco_novo REAL NOT NULL,
+                    regra TEXT NOT NULL,
+                    valor_regra REAL NOT NULL,
+                    data_alteracao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (produto_id) REFERENCES produtos(id)
+                )
+            ''')
+            
+            # Tabela de Recebimentos de Mercadoria (uma linha por nota de entrega)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS recebimentos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    referencia TEXT NOT NULL UNIQUE,
+                    data_recebimento TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    total_itens INTEGER NOT NULL,
+                    total_unidades INTEGER NOT NULL,
+                    observacao TEXT
+                )
+            ''')
+            
+            # Resumo diário de vendas concluídas (mantido pelas operações de venda e
+            # cancelamento; pode ser recalculado com reconstruir_resumo_diario)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS vendas_resumo_diario (
+                    data DATE NOT NULL,
+                    forma_pagamento TEXT NOT NULL,
+                    quantidade_vendas INTEGER NOT NULL DEFAULT 0,
+                    valor_bruto REAL NOT NULL DEFAULT 0,
+                    valor_desconto REAL NOT NULL DEFAULT 0,
+                    valor_liquido REAL NOT NULL DEFAULT 0,
+                    itens_vendidos INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (data, forma_pagamento)
+                ) WITHOUT ROWID
+            ''')
+            
+            # Unidades e receita por produto e dia (base dos rankings e da velocidade de
+            # vendas; mantida junto com o resumo diário)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS vendas_produto_diario (
+                    data DATE NOT NULL,
+                    produto_id INTEGER NOT NULL,
+                    unidades INTEGER NOT NULL DEFAULT 0,
+                    receita REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (data, produto_id)
+                ) WITHOUT ROWID
+            ''')
+            
+            # Checkpoints de estoque: foto do estoque de todos os produtos e a última
+            # movimentação já incluída, para consultas históricas sem reprocessar tudo
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS estoque_checkpoints (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    data_checkpoint TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    ultima_movimentacao INTEGER NOT NULL
+                )
+            ''')
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS estoque_checkpoint_itens (
+                    checkpoint_id INTEGER NOT NULL,
+                    produto_id INTEGER NOT NULL,
+                    estoque INTEGER NOT NULL,
+                    preco_custo REAL NOT NULL,
+                    PRIMARY KEY (checkpoint_id, produto_id),
+                    FOREIGN KEY (checkpoint_id) REFERENCES estoque_checkpoints(id) ON DELETE CASCADE
+                ) WITHOUT ROWID
+            ''')
+            
+            # Arquivos anuais com vendas e movimentações antigas (ver arquivar_historico).
+            # arquivado_ate: data (exclusiva) até a qual o ano já foi arquivado
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS arquivos_historico (
+                    ano INTEGER PRIMARY KEY,
+                    arquivo TEXT NOT NULL,
+                    arquivado_ate DATE NOT NULL,
+                    primeira_venda INTEGER,
+                    ultima_venda INTEGER,
+                    vendas INTEGER NOT NULL DEFAULT 0,
+                    movimentacoes INTEGER NOT NULL DEFAULT 0,
+                    data_arquivamento TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Colunas adicionadas depois da criação das tabelas (bancos existentes)
+            self._adicionar_coluna(cursor, 'vendas', 'chave_idempotencia', 'TEXT')
+            self._adicionar_coluna(cursor, 'vendas', 'chave_cancelamento', 'TEXT')
+            if self._adicionar_coluna(cursor, 'movimentacoes_estoque', 'venda_id', 'INTEGER'):
+                # Movimentações antigas: a venda só estava no texto da observação
+                cursor.execute('''
+                    UPDATE movimentacoes_estoque
+                    SET venda_id = CAST(substr(observacao, CASE tipo_movimentacao
+                                                           WHEN 'VENDA' THEN 8 ELSE 21 END) AS INTEGER)
+                    WHERE (tipo_movimentacao = 'VENDA' AND observacao LIKE 'Venda #%')
+                       OR (tipo_movimentacao = 'ENTRADA' AND observacao LIKE 'Cancelamento venda #%')
+                ''')
+            
             # Criar índices para melhor performance
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_produtos_tipo ON produtos(tipo_animal)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_produtos_estoque ON produtos(estoque)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_produtos_codigo_barras ON produtos(codigo_barras)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_produtos_marca ON produtos(marca)')
+            # Parcial e cobrindo as colunas das consultas de alerta (leitura só do índice)
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_produtos_alerta
+                ON produtos(estoque, estoque_minimo, nome, tipo_animal, marca, ativo)
+                WHERE {CONDICAO_ALERTA_ESTOQUE}
+            ''')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendas_data ON vendas(data_venda)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_itens_venda_venda ON itens_venda(venda_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_movimentacoes_data ON movimentacoes_estoque(data_movimentacao)')
+            # Índice em produto_id já ordena por id (rowid) dentro de cada produto
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_movimentacoes_produto ON movimentacoes_estoque(produto_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_estoque_checkpoints_data ON estoque_checkpoints(data_checkpoint)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_historico_precos_produto ON historico_precos(produto_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_clientes_cpf ON clientes(cpf)')
+            cursor.execute(
+                'CREATE UNIQUE INDEX IF NOT EXISTS idx_vendas_chave_idempotencia '
+                'ON vendas(chave_idempotencia)'
+            )
+            cursor.execute(
+                'CREATE UNIQUE INDEX IF NOT EXISTS idx_vendas_chave_cancelamento '
+                'ON vendas(chave_cancelamento)'
+            )
+            for gatilho, tabela, coluna, ultimo_instante in GATILHOS_ORDEM_ESTOQUE:
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {gatilho} AFTER INSERT ON {tabela}
+                    WHEN NEW.{coluna} < {ultimo_instante}
+                    BEGIN
+                        UPDATE {tabela} SET {coluna} = {ultimo_instante} WHERE id = NEW.id;
+                    END
+                ''')
+            
+            # Banco anterior ao resumo diário: preencher a partir das vendas existentes
+            cursor.execute('''
+                SELECT (NOT EXISTS (SELECT 1 FROM vendas_resumo_diario)
+                        OR NOT EXISTS (SELECT 1 FROM vendas_produto_diario))
+                   AND EXISTS (SELECT 1 FROM vendas WHERE status = 'Concluída')
+            ''')
+            if cursor.fetchone()[0]:
+                self._preencher_resumo_diario(cursor)
             
             conn.commit()
             print("✅ Banco de dados inicializado com sucesso!")
     
+    def _adicionar_coluna(self, cursor, tabela: str, coluna: str, definicao: str) -> bool:
+        """
+        Adiciona uma coluna à tabela se ela ainda não existir (método interno)
+        Retorna: True se a coluna foi criada agora
+        """
+        cursor.execute(f'PRAGMA table_info({tabela})')
+        if coluna in {row['name'] for row in cursor.fetchall()}:
+            return False
+        cursor.execute(f'ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}')
+        return True
+    
     def _insert_test_data(self):
         """Insere dados de teste apenas se o banco estiver vazio"""
         with self._get_connection() as conn:
@@ -235,102 +635,957 @@ class DatabaseManager:
     
     def atualizar_produto(self, produto_id: int, **kwargs) -> bool:
         """Atualiza um produto existente"""
+        return self._atualizar('produtos', produto_id, kwargs)
+    
+    def deletar_produto(self, produto_id: int) -> bool:
+        """Desativa um produto (soft delete)"""
+        return self.atualizar_produto(produto_id, ativo=False)
+    
+    def ajustar_estoque(self, produto_id: int, quantidade: int, 
+                       tipo: str = 'AJUSTE', observacao: str = '') -> bool:
+        """Ajusta o estoque de um produto e registra a movimentação"""
+        try:
+            with self._get_transacao() as conn:
+                return self._aplicar_ajuste(conn.cursor(), produto_id, quantidade, tipo, observacao)
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao ajustar estoque: {e}")
+            return False
+    
+    def _aplicar_ajuste(self, cursor, produto_id: int, quantidade: int,
+                        tipo: str = 'AJUSTE', observacao: str = '') -> bool:
+        """Ajusta o estoque dentro de uma transação já aberta (método interno)"""
+        # Buscar estoque atual
+        cursor.execute('SELECT estoque FROM produtos WHERE id = ?', (produto_id,))
+        row = cursor.fetchone()
+        
+        if not row:
+            print(f"❌ Produto {produto_id} não encontrado")
+            return False
+        
+        estoque_anterior = row['estoque']
+        estoque_novo = estoque_anterior + quantidade
+        
+        if estoque_novo < 0:
+            print(f"❌ Estoque insuficiente! Estoque atual: {estoque_anterior}")
+            return False
+        
+        # Atualizar estoque
+        cursor.execute(
+            'UPDATE produtos SET estoque = ? WHERE id = ?',
+            (estoque_novo, produto_id)
+        )
+        
+        # Registrar movimentação
+        self._registrar_movimentacao(
+            cursor, produto_id, tipo, abs(quantidade),
+            estoque_anterior, estoque_novo, observacao
+        )
+        
+        return True
+    
+    def executar_em_lote(self, operacoes: List[Callable[[sqlite3.Cursor], Any]]) -> List[Any]:
+        """
+        Executa várias operações de escrita em uma única transação (group commit)
+        Cada operação roda em um SAVEPOINT: qualquer exceção (do SQLite ou de dados
+        malformados) desfaz apenas ela e é devolvida como resultado daquela posição.
+        Erros da transação como um todo (ex.: banco bloqueado) são propagados.
+        Retorna: lista de resultados na ordem das operações
+        """
+        resultados = []
+        with self._get_transacao() as conn:
+            cursor = conn.cursor()
+            for operacao in operacoes:
+                cursor.execute('SAVEPOINT operacao')
+                try:
+                    resultados.append(operacao(cursor))
+                    cursor.execute('RELEASE operacao')
+                except Exception as e:
+                    cursor.execute('ROLLBACK TO operacao')
+                    cursor.execute('RELEASE operacao')
+                    resultados.append(e)
+        return resultados
+    
+    def _registrar_movimentacao(self, cursor, produto_id: int, tipo: str,
+                               quantidade: int, estoque_anterior: int,
+                               estoque_atual: int, observacao: str = ''):
+        """Registra uma movimentação de estoque (método interno)"""
+        cursor.execute('''
+            INSERT INTO movimentacoes_estoque 
+            (produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual, observacao)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (produto_id, tipo, quantidade, estoque_anterior, estoque_atual, observacao))
+    
+    def _atualizar_resumo_diario(self, cursor, venda_id: int, sinal: int = 1):
+        """
+        Soma (sinal=1) ou subtrai (sinal=-1, cancelamento) uma venda do resumo
+        diário e das vendas por produto, dentro da transação que grava a venda
+        (método interno)
+        """
+        cursor.execute('''
+            INSERT INTO vendas_resumo_diario
+                (data, forma_pagamento, quantidade_vendas, valor_bruto, valor_desconto,
+                 valor_liquido, itens_vendidos)
+            SELECT date(v.data_venda), v.forma_pagamento, ?1, ROUND(?1 * v.valor_total, 2),
+                   ROUND(?1 * v.desconto, 2), ROUND(?1 * v.valor_final, 2),
+                   ?1 * (SELECT COALESCE(SUM(quantidade), 0) FROM itens_venda WHERE venda_id = v.id)
+            FROM vendas v
+            WHERE v.id = ?2
+            ON CONFLICT (data, forma_pagamento) DO UPDATE SET
+                quantidade_vendas = quantidade_vendas + excluded.quantidade_vendas,
+                valor_bruto = ROUND(valor_bruto + excluded.valor_bruto, 2),
+                valor_desconto = ROUND(valor_desconto + excluded.valor_desconto, 2),
+                valor_liquido = ROUND(valor_liquido + excluded.valor_liquido, 2),
+                itens_vendidos = itens_vendidos + excluded.itens_vendidos
+        ''', (sinal, venda_id))
+        
+        cursor.execute('''
+            INSERT INTO vendas_produto_diario (data, produto_id, unidades, receita)
+            SELECT date(v.data_venda), i.produto_id, ?1 * SUM(i.quantidade), ROUND(?1 * SUM(i.subtotal), 2)
+            FROM itens_venda i, vendas v
+            WHERE v.id = ?2 AND i.venda_id = v.id
+            GROUP BY i.produto_id
+            ON CONFLICT (data, produto_id) DO UPDATE SET
+                unidades = unidades + excluded.unidades,
+                receita = ROUND(receita + excluded.receita, 2)
+        ''', (sinal, venda_id))
+    
+    def _preencher_resumo_diario(self, cursor):
+        """
+        Recalcula o resumo diário e as vendas por produto a partir das vendas (método interno)
+        Dias já arquivados não estão mais em vendas: o resumo deles é mantido.
+        """
+        cursor.execute("SELECT COALESCE(MAX(arquivado_ate), '') FROM arquivos_historico")
+        arquivado_ate = cursor.fetchone()[0]
+        
+        cursor.execute('DELETE FROM vendas_produto_diario WHERE data >= ?', (arquivado_ate,))
+        cursor.execute('''
+            INSERT INTO vendas_produto_diario (data, produto_id, unidades, receita)
+            SELECT date(v.data_venda), i.produto_id, SUM(i.quantidade), ROUND(SUM(i.subtotal), 2)
+            FROM vendas v
+            JOIN itens_venda i ON i.venda_id = v.id
+            WHERE v.status = 'Concluída'
+            GROUP BY date(v.data_venda), i.produto_id
+        ''')
+        
+        cursor.execute('DELETE FROM vendas_resumo_diario WHERE data >= ?', (arquivado_ate,))
+        cursor.execute('''
+            INSERT INTO vendas_resumo_diario
+                (data, forma_pagamento, quantidade_vendas, valor_bruto, valor_desconto,
+                 valor_liquido, itens_vendidos)
+            SELECT date(v.data_venda), v.forma_pagamento, COUNT(*), ROUND(SUM(v.valor_total), 2),
+                   ROUND(SUM(v.desconto), 2), ROUND(SUM(v.valor_final), 2), SUM(COALESCE(i.itens, 0))
+            FROM vendas v
+            LEFT JOIN (SELECT venda_id, SUM(quantidade) AS itens
+                       FROM itens_venda GROUP BY venda_id) i ON i.venda_id = v.id
+            WHERE v.status = 'Concluída'
+            GROUP BY date(v.data_venda), v.forma_pagamento
+        ''')
+        return cursor.rowcount
+    
+    def reconstruir_resumo_diario(self) -> Optional[int]:
+        """
+        Recalcula todo o resumo diário de vendas (manutenção)
+        Retorna: quantidade de linhas (dia x forma de pagamento) geradas ou None em erro
+        """
+        try:
+            with self._get_transacao() as conn:
+                return self._preencher_resumo_diario(conn.cursor())
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao reconstruir resumo diário: {e}")
+            return None
+    
+    def vendas_por_produto(self, dias: int, produto_id: Optional[int] = None,
+                           tipo_animal: Optional[str] = None,
+                           marca: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Unidades e receita por produto nos últimos `dias` dias (incluindo hoje)
+        Lê apenas as linhas da janela em vendas_produto_diario, sem reler o histórico.
+        Retorna: lista de {'produto_id', 'nome', 'marca', 'tipo_animal', 'unidades', 'receita'}
+        """
+        filtro = ''
+        params = [f'-{dias - 1} days']
+        if produto_id is not None:
+            filtro += ' AND d.produto_id = ?'
+            params.append(produto_id)
+        if tipo_animal:
+            filtro += ' AND p.tipo_animal = ?'
+            params.append(tipo_animal)
+        if marca:
+            filtro += ' AND p.marca = ?'
+            params.append(marca)
+        
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
+                cursor.execute(f'''
+                    SELECT d.produto_id, p.nome, p.marca, p.tipo_animal,
+                           SUM(d.unidades) AS unidades, ROUND(SUM(d.receita), 2) AS receita
+                    FROM vendas_produto_diario d
+                    JOIN produtos p ON p.id = d.produto_id
+                    WHERE d.data >= date('now', ?){filtro}
+                    GROUP BY d.produto_id
+                    HAVING SUM(d.unidades) > 0
+                ''', params)
+                return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao consultar vendas por produto: {e}")
+            return []
+    
+    def _ids_por_codigo_barras(self, cursor, codigos: List[str]) -> Dict[str, int]:
+        """Mapeia códigos de barras para IDs de produtos (consultas em blocos)"""
+        ids = {}
+        for inicio in range(0, len(codigos), 500):
+            bloco = codigos[inicio:inicio + 500]
+            marcadores = ', '.join('?' * len(bloco))
+            cursor.execute(
+                f'SELECT id, codigo_barras FROM produtos WHERE codigo_barras IN ({marcadores})',
+                bloco
+            )
+            ids.update((row['codigo_barras'], row['id']) for row in cursor.fetchall())
+        return ids
+    
+    def importar_produtos_lote(self, produtos: List[Produto]) -> Optional[Tuple[int, int, int]]:
+        """
+        Insere ou atualiza (por código de barras) um lote de produtos em uma única transação
+        Produtos novos recebem a movimentação de estoque inicial; nos existentes
+        apenas os dados cadastrais são atualizados (o estoque e o ativo não são
+        alterados). estoque_minimo None: novos recebem o padrão, existentes mantêm o atual.
+        Retorna: (inseridos, atualizados, atualizados que estão desativados) ou None em caso de erro
+        """
+        try:
+            with self._get_transacao() as conn:
+                cursor = conn.cursor()
                 
-                campos_permitidos = ['nome', 'tipo_animal', 'marca', 'peso', 'preco_custo',
-                                   'preco_venda', 'estoque_minimo', 'codigo_barras', 'ativo']
+                existentes = self._ids_por_codigo_barras(
+                    cursor, [p.codigo_barras for p in produtos]
+                )
+                novos = [p for p in produtos if p.codigo_barras not in existentes]
+                atualizados = [p for p in produtos if p.codigo_barras in existentes]
                 
-                updates = []
-                valores = []
+                cursor.executemany('''
+                    INSERT INTO produtos (nome, tipo_animal, marca, peso, preco_custo, preco_venda, 
+                                        estoque, estoque_minimo, codigo_barras, ativo)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [(p.nome, p.tipo_animal, p.marca, p.peso, p.preco_custo, p.preco_venda, p.estoque,
+                       Produto.estoque_minimo if p.estoque_minimo is None else p.estoque_minimo,
+                       p.codigo_barras, p.ativo) for p in novos])
                 
-                for campo, valor in kwargs.items():
-                    if campo in campos_permitidos:
-                        updates.append(f"{campo} = ?")
-                        valores.append(valor)
+                # Movimentações de estoque inicial dos produtos novos
+                com_estoque = [p for p in novos if p.estoque > 0]
+                if com_estoque:
+                    ids_novos = self._ids_por_codigo_barras(
+                        cursor, [p.codigo_barras for p in com_estoque]
+                    )
+                    cursor.executemany('''
+                        INSERT INTO movimentacoes_estoque 
+                        (produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual, observacao)
+                        VALUES (?, 'ENTRADA', ?, 0, ?, 'Estoque inicial (importação)')
+                    ''', [(ids_novos[p.codigo_barras], p.estoque, p.estoque) for p in com_estoque])
                 
-                if not updates:
-                    return False
+                cursor.executemany('''
+                    UPDATE produtos SET nome = ?, tipo_animal = ?, marca = ?, peso = ?,
+                                        preco_custo = ?, preco_venda = ?,
+                                        estoque_minimo = COALESCE(?, estoque_minimo)
+                    WHERE id = ?
+                ''', [(p.nome, p.tipo_animal, p.marca, p.peso, p.preco_custo, p.preco_venda,
+                       p.estoque_minimo, existentes[p.codigo_barras]) for p in atualizados])
                 
-                valores.append(produto_id)
-                query = f"UPDATE produtos SET {', '.join(updates)} WHERE id = ?"
+                inativos = 0
+                ids_atualizados = [existentes[p.codigo_barras] for p in atualizados]
+                for inicio in range(0, len(ids_atualizados), 500):
+                    bloco = ids_atualizados[inicio:inicio + 500]
+                    marcadores = ', '.join('?' * len(bloco))
+                    cursor.execute(
+                        f'SELECT COUNT(*) FROM produtos WHERE ativo = 0 AND id IN ({marcadores})', bloco
+                    )
+                    inativos += cursor.fetchone()[0]
                 
-                cursor.execute(query, valores)
-                return cursor.rowcount > 0
+                return len(novos), len(atualizados), inativos
         except sqlite3.Error as e:
-            print(f"❌ Erro ao atualizar produto: {e}")
-            return False
+            print(f"❌ Erro ao importar lote de produtos: {e}")
+            return None
     
-    def deletar_produto(self, produto_id: int) -> bool:
-        """Desativa um produto (soft delete)"""
-        return self.atualizar_produto(produto_id, ativo=False)
+    def reajustar_precos(self, regra: str, valor: float, marca: Optional[str] = None,
+                         tipo_animal: Optional[str] = None,
+                         simular: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """
+        Reajusta o preço de venda de todos os produtos ativos filtrados com um único UPDATE
+        O histórico de preços é gravado com um INSERT ... SELECT na mesma transação.
+        Produtos cujo novo preço ficaria igual ou abaixo do custo não são alterados.
+        Com simular=True nada é alterado e apenas a prévia é retornada.
+        Retorna: lista de {'id', 'nome', 'preco_anterior', 'preco_novo'} ou None em caso de erro
+        """
+        expressao = REGRAS_REAJUSTE[regra]
+        
+        filtro = 'ativo = 1'
+        params_filtro = []
+        if marca:
+            filtro += ' AND marca = ?'
+            params_filtro.append(marca)
+        if tipo_animal:
+            filtro += ' AND tipo_animal = ?'
+            params_filtro.append(tipo_animal)
+        if regra == 'markup':
+            filtro += ' AND preco_custo > 0'
+        
+        # Novo preço calculado uma vez por produto; deve continuar válido (ver
+        # validar_preco), acima do custo (como em _validar_produto) e diferente do atual
+        candidatos = f'''
+            SELECT id, nome, preco_venda AS preco_anterior, preco_novo FROM (
+                SELECT id, nome, preco_venda, preco_custo, {expressao} AS preco_novo
+                FROM produtos WHERE {filtro}
+            )
+            WHERE preco_novo > 0 AND preco_novo <= 999999.99 AND preco_novo != preco_venda
+              AND (preco_custo = 0 OR preco_novo > preco_custo)
+        '''
+        parametros = [valor] + params_filtro
+        
+        try:
+            if simular:
+                # Prévia só lê: não toma o bloqueio de escrita (não segura os caixas)
+                with self._get_connection() as conn:
+                    cursor = conn.execute(f'{candidatos} ORDER BY nome', parametros)
+                    return [dict(row) for row in cursor.fetchall()]
+            
+            with self._get_transacao() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(f'{candidatos} ORDER BY nome', parametros)
+                previa = [dict(row) for row in cursor.fetchall()]
+                if not previa:
+                    return previa
+                
+                cursor.execute(f'''
+                    INSERT INTO historico_precos (produto_id, preco_anterior, preco_novo, regra, valor_regra)
+                    SELECT id, preco_anterior, preco_novo, ?, ? FROM ({candidatos})
+                ''', [regra, valor] + parametros)
+                
+                cursor.execute(f'''
+                    WITH reajuste AS ({candidatos})
+                    UPDATE produtos
+                    SET preco_venda = (SELECT preco_novo FROM reajuste WHERE reajuste.id = produtos.id)
+                    WHERE id IN (SELECT id FROM reajuste)
+                ''', parametros)
+                
+                return previa
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao reajustar preços: {e}")
+            return None
     
-    def ajustar_estoque(self, produto_id: int, quantidade: int, 
-                       tipo: str = 'AJUSTE', observacao: str = '') -> bool:
-        """Ajusta o estoque de um produto e registra a movimentação"""
+    def buscar_recebimento(self, referencia: str) -> Optional[Dict[str, Any]]:
+        """Busca um recebimento pela referência da nota de entrega"""
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
+                cursor.execute('SELECT * FROM recebimentos WHERE referencia = ?', (referencia,))
+                row = cursor.fetchone()
+                return dict(row) if row else None
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao buscar recebimento: {e}")
+            return None
+    
+    def registrar_recebimento(self, referencia: str, quantidades: Dict[int, int],
+                              observacao: str = '') -> Tuple[Optional[int], bool, List[int]]:
+        """
+        Registra uma entrega completa (produto_id -> quantidade) em uma única transação
+        Todas as entradas de estoque e movimentações são gravadas com executemany.
+        A operação é idempotente pela referência: reenviar a mesma nota não altera o estoque.
+        Retorna: (id do recebimento, já registrado antes, IDs de produtos não encontrados)
+        """
+        try:
+            with self._get_transacao() as conn:
+                cursor = conn.cursor()
                 
-                # Buscar estoque atual
-                cursor.execute('SELECT estoque FROM produtos WHERE id = ?', (produto_id,))
+                cursor.execute('SELECT id FROM recebimentos WHERE referencia = ?', (referencia,))
                 row = cursor.fetchone()
+                if row:
+                    return row['id'], True, []
                 
-                if not row:
-                    print(f"❌ Produto {produto_id} não encontrado")
-                    return False
+                produto_ids = list(quantidades)
+                estoques = {}
+                for inicio in range(0, len(produto_ids), 500):
+                    bloco = produto_ids[inicio:inicio + 500]
+                    marcadores = ', '.join('?' * len(bloco))
+                    cursor.execute(
+                        f'SELECT id, estoque FROM produtos WHERE id IN ({marcadores})', bloco
+                    )
+                    estoques.update((r['id'], r['estoque']) for r in cursor.fetchall())
                 
-                estoque_anterior = row['estoque']
-                estoque_novo = estoque_anterior + quantidade
+                nao_encontrados = [pid for pid in produto_ids if pid not in estoques]
+                if nao_encontrados:
+                    return None, False, nao_encontrados
                 
-                if estoque_novo < 0:
-                    print(f"❌ Estoque insuficiente! Estoque atual: {estoque_anterior}")
-                    return False
+                cursor.execute('''
+                    INSERT INTO recebimentos (referencia, total_itens, total_unidades, observacao)
+                    VALUES (?, ?, ?, ?)
+                ''', (referencia, len(quantidades), sum(quantidades.values()), observacao))
+                recebimento_id = cursor.lastrowid
                 
-                # Atualizar estoque
-                cursor.execute(
-                    'UPDATE produtos SET estoque = ? WHERE id = ?',
-                    (estoque_novo, produto_id)
+                cursor.executemany(
+                    'UPDATE produtos SET estoque = estoque + ? WHERE id = ?',
+                    [(qtd, pid) for pid, qtd in quantidades.items()]
                 )
                 
-                # Registrar movimentação
-                self._registrar_movimentacao(
-                    cursor, produto_id, tipo, abs(quantidade),
-                    estoque_anterior, estoque_novo, observacao
-                )
+                obs_movimentacao = f"Recebimento {referencia}"
+                if observacao:
+                    obs_movimentacao += f" - {observacao}"
+                cursor.executemany('''
+                    INSERT INTO movimentacoes_estoque 
+                    (produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual, observacao)
+                    VALUES (?, 'ENTRADA', ?, ?, ?, ?)
+                ''', [(pid, qtd, estoques[pid], estoques[pid] + qtd, obs_movimentacao)
+                      for pid, qtd in quantidades.items()])
                 
-                return True
+                return recebimento_id, False, []
+        except sqlite3.IntegrityError as e:
+            # Duplicidade só se outra estação registrou a mesma nota ao mesmo tempo;
+            # outras violações (FK, CHECK) são erro comum
+            recebimento = self.buscar_recebimento(referencia)
+            if recebimento:
+                return recebimento['id'], True, []
+            print(f"❌ Erro ao registrar recebimento: {e}")
+            return None, False, []
         except sqlite3.Error as e:
-            print(f"❌ Erro ao ajustar estoque: {e}")
-            return False
-    
-    def _registrar_movimentacao(self, cursor, produto_id: int, tipo: str,
-                               quantidade: int, estoque_anterior: int,
-                               estoque_atual: int, observacao: str = ''):
-        """Registra uma movimentação de estoque (método interno)"""
-        cursor.execute('''
-            INSERT INTO movimentacoes_estoque 
-            (produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual, observacao)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (produto_id, tipo, quantidade, estoque_anterior, estoque_atual, observacao))
+            print(f"❌ Erro ao registrar recebimento: {e}")
+            return None, False, []
     
-    def produtos_estoque_baixo(self) -> List[Produto]:
-        """Retorna produtos com estoque baixo ou zerado"""
+    def produtos_estoque_baixo(self, limite: Optional[int] = None) -> List[ProdutoAlerta]:
+        """
+        Retorna produtos com estoque baixo ou zerado, do menor estoque para o maior
+        Lidos só do índice idx_produtos_alerta, por isso como ProdutoAlerta (id, nome,
+        tipo_animal, marca, estoque e estoque_minimo) e não Produto
+        limite: quantidade máxima de produtos (None = todos)
+        """
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT * FROM produtos 
-                    WHERE ativo = 1 AND estoque <= estoque_minimo
+                cursor.execute(f'''
+                    SELECT id, nome, tipo_animal, marca, estoque, estoque_minimo
+                    FROM produtos
+                    WHERE {CONDICAO_ALERTA_ESTOQUE} AND estoque <= estoque_minimo
                     ORDER BY estoque ASC
-                ''')
+                    LIMIT ?
+                ''', (-1 if limite is None else limite,))
                 rows = cursor.fetchall()
-                return [Produto(**dict(row)) for row in rows]
+                return [ProdutoAlerta(**dict(row)) for row in rows]
         except sqlite3.Error as e:
             print(f"❌ Erro ao buscar produtos com estoque baixo: {e}")
             return []
     
+    def contar_alertas_estoque(self) -> Optional[Dict[str, int]]:
+        """
+        Quantidade de produtos ativos em cada nível de alerta, em uma só consulta
+        (mesmos critérios de EstoqueService.produtos_alertas, sem a previsão)
+        Retorna: {'sem_estoque', 'critico', 'baixo'} ou None em caso de erro
+        """
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute(f'''
+                    SELECT COALESCE(SUM(estoque = 0), 0) AS sem_estoque,
+                           COALESCE(SUM(estoque BETWEEN 1 AND 2), 0) AS critico,
+                           COALESCE(SUM(estoque > 2 AND estoque <= estoque_minimo), 0) AS baixo
+                    FROM produtos
+                    WHERE {CONDICAO_ALERTA_ESTOQUE}
+                ''').fetchone()
+                return dict(row)
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao contar alertas de estoque: {e}")
+            return None
+    
+    # ==================== CHECKPOINTS DE ESTOQUE ====================
+    
+    def criar_checkpoint_estoque(self) -> Optional[int]:
+        """
+        Grava a foto do estoque (e custo) de todos os produtos
+        Retorna: ID do checkpoint ou None em caso de erro
+        """
+        try:
+            with self._get_transacao() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO estoque_checkpoints (ultima_movimentacao)
+                    SELECT COALESCE(MAX(id), 0) FROM movimentacoes_estoque
+                ''')
+                checkpoint_id = cursor.lastrowid
+                cursor.execute('''
+                    INSERT INTO estoque_checkpoint_itens (checkpoint_id, produto_id, estoque, preco_custo)
+                    SELECT ?, id, estoque, preco_custo FROM produtos
+                ''', (checkpoint_id,))
+                return checkpoint_id
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao criar checkpoint de estoque: {e}")
+            return None
+    
+    def ultimo_checkpoint_estoque(self) -> Optional[Dict[str, Any]]:
+        """Retorna {'id', 'data_checkpoint', 'ultima_movimentacao'} do checkpoint mais recente"""
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute('''
+                    SELECT id, data_checkpoint, ultima_movimentacao FROM estoque_checkpoints
+                    ORDER BY data_checkpoint DESC, id DESC LIMIT 1
+                ''').fetchone()
+                return dict(row) if row else None
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao buscar checkpoint de estoque: {e}")
+            return None
+    
+    def estoque_na_data(self, momento: str,
+                        produto_id: Optional[int] = None) -> Optional[Dict[int, Dict[str, Any]]]:
+        """
+        Reconstrói o estoque no instante `momento` ('AAAA-MM-DD HH:MM:SS', UTC)
+        Parte do checkpoint mais próximo em número de movimentações: o último antes
+        do instante (somando as movimentações seguintes) ou o primeiro depois dele,
+        ou o estoque atual (subtraindo as movimentações posteriores ao instante).
+        Movimentações arquivadas só são consultadas se o ponto de partida for
+        anterior ao arquivamento.
+        Retorna: {produto_id: {'nome', 'estoque', 'preco_custo'}} ou None em caso de erro
+        """
+        filtro_produto = ' AND produto_id = ?' if produto_id is not None else ''
+        params_produto = [produto_id] if produto_id is not None else []
+        
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Arquivos necessários a partir do checkpoint mais antigo que pode ser usado
+                cursor.execute('''
+                    SELECT COALESCE(MAX(data_checkpoint), ?1) FROM estoque_checkpoints
+                    WHERE data_checkpoint <= ?1
+                ''', (momento,))
+                esquemas = self._anexar_arquivos(conn, self._anos_arquivados(conn, cursor.fetchone()[0]))
+                movimentacoes = self._fonte_historica(conn, 'movimentacoes_estoque', esquemas)
+                
+                if not conn.in_transaction:
+                    cursor.execute('BEGIN')  # Leituras consistentes entre si
+                
+                # Primeira movimentação depois do instante: as datas não diminuem com o
+                # ID (GATILHOS_ORDEM_ESTOQUE), então todas as anteriores a ela são <= momento
+                cursor.execute(f'''
+                    SELECT id FROM {movimentacoes} WHERE data_movimentacao > ?
+                    ORDER BY data_movimentacao, id LIMIT 1
+                ''', (momento,))
+                row = cursor.fetchone()
+                if row:
+                    limite = row['id']
+                else:
+                    cursor.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM movimentacoes_estoque')
+                    limite = cursor.fetchone()[0]
+                
+                cursor.execute('''
+                    SELECT id, ultima_movimentacao FROM estoque_checkpoints
+                    WHERE data_checkpoint <= ? ORDER BY data_checkpoint DESC, id DESC LIMIT 1
+                ''', (momento,))
+                anterior = cursor.fetchone()
+                cursor.execute('''
+                    SELECT id, ultima_movimentacao FROM estoque_checkpoints
+                    WHERE data_checkpoint > ? ORDER BY data_checkpoint, id LIMIT 1
+                ''', (momento,))
+                posterior = cursor.fetchone()
+                
+                # Sem checkpoint posterior, o estoque atual serve de ponto de partida
+                if posterior is not None:
+                    ultima_posterior = posterior['ultima_movimentacao']
+                else:
+                    cursor.execute('SELECT COALESCE(MAX(id), 0) FROM movimentacoes_estoque')
+                    ultima_posterior = cursor.fetchone()[0]
+                
+                para_frente = (anterior is not None and
+                               limite - anterior['ultima_movimentacao'] <= ultima_posterior - limite)
+                
+                if para_frente:
+                    cursor.execute(f'''
+                        SELECT produto_id, estoque, preco_custo FROM estoque_checkpoint_itens
+                        WHERE checkpoint_id = ?{filtro_produto}
+                    ''', [anterior['id']] + params_produto)
+                    base = cursor.fetchall()
+                    intervalo, sinal = (anterior['ultima_movimentacao'] + 1, limite - 1), 1
+                elif posterior is not None:
+                    cursor.execute(f'''
+                        SELECT produto_id, estoque, preco_custo FROM estoque_checkpoint_itens
+                        WHERE checkpoint_id = ?{filtro_produto}
+                    ''', [posterior['id']] + params_produto)
+                    base = cursor.fetchall()
+                    intervalo, sinal = (limite, ultima_posterior), -1
+                else:
+                    cursor.execute(f'''
+                        SELECT id AS produto_id, estoque, preco_custo FROM produtos
+                        WHERE 1=1{filtro_produto.replace('produto_id', 'id')}
+                    ''', params_produto)
+                    base = cursor.fetchall()
+                    intervalo, sinal = (limite, ultima_posterior), -1
+                
+                estoques = {row['produto_id']: [row['estoque'], row['preco_custo']] for row in base}
+                
+                # Reaplica (ou desfaz) apenas as movimentações entre o ponto de partida e o instante
+                cursor.execute(f'''
+                    SELECT produto_id, SUM(estoque_atual - estoque_anterior) AS variacao
+                    FROM {movimentacoes}
+                    WHERE id BETWEEN ? AND ?{filtro_produto}
+                    GROUP BY produto_id
+                ''', list(intervalo) + params_produto)
+                for row in cursor.fetchall():
+                    estoques.setdefault(row['produto_id'], [0, None])[0] += sinal * row['variacao']
+                
+                # Somente produtos que já existiam no instante
+                cursor.execute(f'''
+                    SELECT id, nome, preco_custo FROM produtos
+                    WHERE data_cadastro <= ?{filtro_produto.replace('produto_id', 'id')}
+                ''', [momento] + params_produto)
+                resultado = {}
+                for row in cursor.fetchall():
+                    estoque, custo = estoques.get(row['id'], (0, None))
+                    resultado[row['id']] = {
+                        'nome': row['nome'],
+                        'estoque': estoque,
+                        'preco_custo': row['preco_custo'] if custo is None else custo
+                    }
+                return resultado
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao reconstruir estoque: {e}")
+            return None
+    
+    # ==================== ARQUIVAMENTO DE HISTÓRICO ====================
+    
+    def _caminho_arquivo(self, ano: int) -> Path:
+        """Arquivo anual ao lado do banco principal (ex.: petshop_2023.db)"""
+        banco = Path(self.db_path)
+        return banco.with_name(f'{banco.stem}_{ano}{banco.suffix}')
+    
+    def _anexar_arquivos(self, conn: sqlite3.Connection, anos: List[int]) -> List[str]:
+        """
+        Anexa (ATTACH) à conexão os arquivos dos anos informados que ainda não
+        estão anexados e retorna os nomes dos esquemas (arquivo_AAAA).
+        Deve ser chamado fora de transação; o SQLite limita a 10 bancos anexados.
+        """
+        anexados = {row[1] for row in conn.execute('PRAGMA database_list')}
+        esquemas = []
+        for ano in anos:
+            esquema = f'arquivo_{int(ano)}'
+            if esquema not in anexados:
+                conn.execute(f'ATTACH DATABASE ? AS {esquema}', (str(self._caminho_arquivo(ano)),))
+                self._preparar_arquivo(conn, esquema)
+            esquemas.append(esquema)
+        return esquemas
+    
+    def _preparar_arquivo(self, conn: sqlite3.Connection, esquema: str):
+        """Cria as tabelas do arquivo com o esquema do banco principal e acrescenta colunas novas"""
+        for tabela in TABELAS_ARQUIVO:
+            row = conn.execute(
+                "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (tabela,)
+            ).fetchone()
+            conn.execute(row[0].replace(f'CREATE TABLE {tabela}',
+                                        f'CREATE TABLE IF NOT EXISTS {esquema}.{tabela}', 1))
+            
+            existentes = {coluna[1] for coluna in conn.execute(f'PRAGMA {esquema}.table_info({tabela})')}
+            for coluna in conn.execute(f'PRAGMA main.table_info({tabela})').fetchall():
+                if coluna[1] not in existentes:
+                    conn.execute(f'ALTER TABLE {esquema}.{tabela} ADD COLUMN {coluna[1]} {coluna[2]}')
+        
+        for indice, tabela, coluna in INDICES_ARQUIVO:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS {esquema}.{indice} ON {tabela}({coluna})')
+    
+    def _colunas(self, conn: sqlite3.Connection, tabela: str) -> str:
+        return ', '.join(coluna[1] for coluna in conn.execute(f'PRAGMA main.table_info({tabela})'))
+    
+    def _fonte_historica(self, conn: sqlite3.Connection, tabela: str, esquemas: List[str]) -> str:
+        """
+        Expressão para o FROM: só a tabela principal ou a sua união com os arquivos
+        anexados. UNION ALL permite ao SQLite levar os filtros da consulta (e os
+        índices) a cada arquivo; linhas do arquivo que ainda estão no banco principal
+        (arquivamento interrompido entre a cópia e a remoção) são descartadas.
+        """
+        if not esquemas:
+            return tabela
+        colunas = self._colunas(conn, tabela)
+        partes = [f'SELECT {colunas} FROM main.{tabela}']
+        partes += [f'SELECT {colunas} FROM {esquema}.{tabela} a '
+                   f'WHERE NOT EXISTS (SELECT 1 FROM main.{tabela} WHERE id = a.id)'
+                   for esquema in esquemas]
+        return f"({' UNION ALL '.join(partes)}) AS {tabela}"
+    
+    def _anos_arquivados(self, conn: sqlite3.Connection, desde: Optional[str] = None,
+                         ate: Optional[str] = None) -> List[int]:
+        """
+        Anos arquivados que podem ter registros entre as datas (None = sem limite)
+        Vazio quando o período começa depois do que já foi arquivado.
+        """
+        cursor = conn.execute('''
+            SELECT ano FROM arquivos_historico
+            WHERE (?1 IS NULL OR (date(?1) < arquivado_ate
+                                  AND ano >= CAST(strftime('%Y', ?1) AS INTEGER)))
+              AND (?2 IS NULL OR ano <= CAST(strftime('%Y', ?2) AS INTEGER))
+            ORDER BY ano
+        ''', (desde, ate))
+        return [row[0] for row in cursor.fetchall()]
+    
+    def _ano_arquivado_venda(self, conn: sqlite3.Connection, venda_id: int) -> Optional[int]:
+        """Ano do arquivo que contém a venda (None se ela não foi arquivada)"""
+        row = conn.execute(
+            'SELECT ano FROM arquivos_historico WHERE ? BETWEEN primeira_venda AND ultima_venda',
+            (venda_id,)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def arquivar_historico(self, horizonte_dias: int) -> Optional[Dict[int, Dict[str, int]]]:
+        """
+        Move as vendas (com os itens) e as movimentações de estoque com mais de
+        horizonte_dias dias para arquivos anuais ao lado do banco (petshop_AAAA.db),
+        um ano por transação. A última movimentação de cada produto permanece no
+        banco principal (saldo usado pela reconciliação) e o resumo diário de
+        vendas não é alterado. Vendas arquivadas não podem mais ser canceladas.
+        Retorna: {ano: {'vendas', 'itens', 'movimentacoes'}} movidos ou None em caso de erro
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT date('now', ?)", (f'-{int(horizonte_dias)} days',))
+                limite = cursor.fetchone()[0]
+                
+                # Comparação de texto usa os índices de data ('AAAA-MM-DD HH:MM:SS' < 'AAAA-MM-DD')
+                cursor.execute('''
+                    SELECT CAST(strftime('%Y', data_venda) AS INTEGER) FROM vendas WHERE data_venda < ?1
+                    UNION
+                    SELECT CAST(strftime('%Y', data_movimentacao) AS INTEGER) FROM movimentacoes_estoque
+                    WHERE data_movimentacao < ?1
+                      AND id NOT IN (SELECT MAX(id) FROM movimentacoes_estoque GROUP BY produto_id)
+                ''', (limite,))
+                anos = sorted(row[0] for row in cursor.fetchall())
+                
+                resultado = {}
+                for ano in anos:
+                    esquema = self._anexar_arquivos(conn, [ano])[0]
+                    periodo = (f'{ano}-01-01', min(f'{ano + 1}-01-01', limite))
+                    colunas = {tabela: self._colunas(conn, tabela) for tabela in TABELAS_ARQUIVO}
+                    
+                    cursor.execute('BEGIN IMMEDIATE')
+                    filtro_vendas = 'SELECT id FROM main.vendas WHERE data_venda >= ? AND data_venda < ?'
+                    cursor.execute(f'''
+                        INSERT OR REPLACE INTO {esquema}.itens_venda ({colunas['itens_venda']})
+                        SELECT {colunas['itens_venda']} FROM main.itens_venda
+                        WHERE venda_id IN ({filtro_vendas})
+                    ''', periodo)
+                    itens = cursor.rowcount
+                    cursor.execute(f'''
+                        INSERT OR REPLACE INTO {esquema}.vendas ({colunas['vendas']})
+                        SELECT {colunas['vendas']} FROM main.vendas
+                        WHERE data_venda >= ? AND data_venda < ?
+                    ''', periodo)
+                    vendas = cursor.rowcount
+                    
+                    filtro_movimentacoes = '''
+                        data_movimentacao >= ? AND data_movimentacao < ?
+                        AND id NOT IN (SELECT MAX(id) FROM main.movimentacoes_estoque GROUP BY produto_id)
+                    '''
+                    cursor.execute(f'''
+                        INSERT OR REPLACE INTO {esquema}.movimentacoes_estoque ({colunas['movimentacoes_estoque']})
+                        SELECT {colunas['movimentacoes_estoque']} FROM main.movimentacoes_estoque
+                        WHERE {filtro_movimentacoes}
+                    ''', periodo)
+                    movimentacoes = cursor.rowcount
+                    
+                    cursor.execute(f'DELETE FROM main.itens_venda WHERE venda_id IN ({filtro_vendas})', periodo)
+                    cursor.execute('DELETE FROM main.vendas WHERE data_venda >= ? AND data_venda < ?', periodo)
+                    cursor.execute(f'DELETE FROM main.movimentacoes_estoque WHERE {filtro_movimentacoes}', periodo)
+                    
+                    cursor.execute(f'''
+                        INSERT OR REPLACE INTO arquivos_historico
+                            (ano, arquivo, arquivado_ate, primeira_venda, ultima_venda, vendas, movimentacoes)
+                        SELECT ?1, ?2, MAX(?3, COALESCE((SELECT arquivado_ate FROM arquivos_historico
+                                                         WHERE ano = ?1), '')),
+                               MIN(id), MAX(id), COUNT(*),
+                               (SELECT COUNT(*) FROM {esquema}.movimentacoes_estoque)
+                        FROM {esquema}.vendas
+                    ''', (ano, self._caminho_arquivo(ano).name, limite))
+                    conn.commit()
+                    conn.execute(f'DETACH DATABASE {esquema}')
+                    
+                    resultado[ano] = {'vendas': vendas, 'itens': itens, 'movimentacoes': movimentacoes}
+                return resultado
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao arquivar histórico: {e}")
+            return None
+    
+    # ==================== RECONCILIAÇÃO DE ESTOQUE ====================
+    
+    def verificar_cadeia_estoque(self, produto_inicio: Optional[int] = None,
+                                 produto_fim: Optional[int] = None,
+                                 tamanho_leitura: int = 5000) -> Optional[Dict[str, Any]]:
+        """
+        Verifica com consultas de conjunto (função de janela LAG) as movimentações
+        dos produtos com ID entre produto_inicio e produto_fim (sem faixa: todos):
+          - quebra: estoque_anterior diferente do estoque_atual da movimentação anterior
+          - quantidade: variação (atual - anterior) incompatível com tipo/quantidade
+          - divergencia: última movimentação não bate com produtos.estoque
+          - sem_movimentacao: produto com estoque e nenhuma movimentação
+        Sem faixa, o histórico é lido uma única vez em sequência e ordenado por
+        (produto_id, id); com faixa, só as movimentações da faixa pelo índice de produto.
+        Os resultados são lidos em blocos de tamanho_leitura linhas.
+        Retorna: {'movimentacoes', 'quebras', 'quantidades', 'divergencias',
+        'sem_movimentacao'} ou None em caso de erro
+        """
+        if produto_inicio is None:
+            # Leitura sequencial + ordenação: pelo índice de produto cada linha seria
+            # uma busca aleatória na tabela (várias vezes mais lento para o histórico todo)
+            fonte = 'movimentacoes_estoque NOT INDEXED'
+            filtro, filtro_produtos, parametros = '', '', ()
+        else:
+            fonte = 'movimentacoes_estoque'
+            filtro = 'WHERE produto_id BETWEEN ?1 AND ?2'
+            filtro_produtos = 'AND p.id BETWEEN ?1 AND ?2'
+            parametros = (produto_inicio, produto_fim)
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                if not conn.in_transaction:
+                    cursor.execute('BEGIN')  # Leituras consistentes entre si
+                
+                # Cada movimentação contra a anterior do mesmo produto
+                cursor.execute(f'''
+                    SELECT *, esperado != estoque_anterior AS quebra,
+                           CASE tipo_movimentacao
+                               WHEN 'ENTRADA' THEN estoque_atual - estoque_anterior != quantidade
+                               WHEN 'AJUSTE' THEN ABS(estoque_atual - estoque_anterior) != ABS(quantidade)
+                               ELSE estoque_anterior - estoque_atual != quantidade
+                           END AS quantidade_invalida
+                    FROM (
+                        SELECT id, produto_id, tipo_movimentacao, quantidade,
+                               estoque_anterior, estoque_atual,
+                               LAG(estoque_atual) OVER (PARTITION BY produto_id ORDER BY id) AS esperado
+                        FROM {fonte}
+                        {filtro}
+                    )
+                    WHERE quebra OR quantidade_invalida
+                ''', parametros)
+                
+                relatorio = {'movimentacoes': 0, 'quebras': [], 'quantidades': [],
+                             'divergencias': [], 'sem_movimentacao': []}
+                while True:
+                    rows = cursor.fetchmany(tamanho_leitura)
+                    if not rows:
+                        break
+                    for row in rows:
+                        if row['quebra']:
+                            relatorio['quebras'].append({
+                                'produto_id': row['produto_id'], 'movimentacao_id': row['id'],
+                                'esperado': row['esperado'], 'registrado': row['estoque_anterior']
+                            })
+                        if row['quantidade_invalida']:
+                            relatorio['quantidades'].append({
+                                'produto_id': row['produto_id'], 'movimentacao_id': row['id'],
+                                'tipo': row['tipo_movimentacao'], 'quantidade': row['quantidade'],
+                                'variacao': row['estoque_atual'] - row['estoque_anterior']
+                            })
+                
+                cursor.execute(f'SELECT COUNT(*) FROM movimentacoes_estoque {filtro}', parametros)
+                relatorio['movimentacoes'] = cursor.fetchone()[0]
+                
+                # Saldo da última movimentação (pelo índice) contra o cadastro
+                cursor.execute(f'''
+                    SELECT p.id, p.estoque, m.estoque_atual
+                    FROM produtos p
+                    LEFT JOIN (SELECT produto_id, MAX(id) AS id FROM movimentacoes_estoque
+                               {filtro} GROUP BY produto_id) u
+                           ON u.produto_id = p.id
+                    LEFT JOIN movimentacoes_estoque m ON m.id = u.id
+                    WHERE COALESCE(m.estoque_atual, 0) != p.estoque {filtro_produtos}
+                ''', parametros)
+                while True:
+                    rows = cursor.fetchmany(tamanho_leitura)
+                    if not rows:
+                        break
+                    for row in rows:
+                        chave = 'divergencias' if row['estoque_atual'] is not None else 'sem_movimentacao'
+                        relatorio[chave].append({
+                            'produto_id': row['id'], 'estoque_movimentacoes': row['estoque_atual'] or 0,
+                            'estoque_produto': row['estoque']
+                        })
+                return relatorio
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao verificar movimentações de estoque: {e}")
+            return None
+    
+    def corrigir_divergencias_estoque(self, produto_ids: List[int]) -> Optional[int]:
+        """
+        Registra um AJUSTE que leva o saldo das movimentações ao estoque atual do
+        produto (o estoque do cadastro é tomado como correto). A divergência é
+        conferida novamente dentro da transação.
+        Retorna: quantidade de ajustes gravados ou None em caso de erro
+        """
+        try:
+            with self._get_transacao() as conn:
+                cursor = conn.cursor()
+                corrigidos = 0
+                for produto_id in produto_ids:
+                    cursor.execute('''
+                        INSERT INTO movimentacoes_estoque
+                            (produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual, observacao)
+                        SELECT p.id, 'AJUSTE', ABS(p.estoque - u.saldo), u.saldo, p.estoque,
+                               'Reconciliação de estoque'
+                        FROM produtos p,
+                             (SELECT COALESCE((SELECT estoque_atual FROM movimentacoes_estoque
+                                               WHERE produto_id = ?1 ORDER BY id DESC LIMIT 1), 0) AS saldo) u
+                        WHERE p.id = ?1 AND p.estoque != u.saldo
+                    ''', (produto_id,))
+                    corrigidos += cursor.rowcount
+                return corrigidos
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao corrigir divergências de estoque: {e}")
+            return None
+    
+    # ==================== PREVISÃO DE ESTOQUE ====================
+    
+    def carregar_base_previsao(self, dias_historico: int) -> Optional[Dict[str, Any]]:
+        """
+        Lê em uma única transação de leitura a base da previsão de demanda
+        Retorna: {'hoje', 'produtos', 'vendas' (data, produto_id, unidades) dos últimos
+        dias, 'ultima_movimentacao'} ou None em caso de erro
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                if not conn.in_transaction:
+                    cursor.execute('BEGIN')  # Leituras consistentes entre si
+                cursor.execute("SELECT date('now')")
+                hoje = cursor.fetchone()[0]
+                cursor.execute('''
+                    SELECT id, nome, estoque, estoque_minimo, ativo FROM produtos ORDER BY id
+                ''')
+                produtos = [dict(row) for row in cursor.fetchall()]
+                cursor.execute('''
+                    SELECT data, produto_id, unidades FROM vendas_produto_diario
+                    WHERE data >= date('now', ?)
+                ''', (f'-{dias_historico} days',))
+                vendas = [tuple(row) for row in cursor.fetchall()]
+                cursor.execute('SELECT COALESCE(MAX(id), 0) FROM movimentacoes_estoque')
+                ultima = cursor.fetchone()[0]
+                return {'hoje': hoje, 'produtos': produtos, 'vendas': vendas,
+                        'ultima_movimentacao': ultima}
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao carregar base da previsão: {e}")
+            return None
+    
+    def movimentacoes_desde(self, ultimo_id: int) -> List[Dict[str, Any]]:
+        """
+        Movimentações de estoque com ID maior que o informado, em ordem
+        Devoluções de venda cancelada (ENTRADA com venda_id) trazem 'data_venda': a
+        data da venda original, a mesma em que o cancelamento é descontado de
+        vendas_produto_diario. Vendas já arquivadas não podem ser canceladas.
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT m.id, m.produto_id, m.tipo_movimentacao, m.quantidade, m.estoque_atual,
+                           date(m.data_movimentacao) AS data, date(v.data_venda) AS data_venda
+                    FROM movimentacoes_estoque m
+                    LEFT JOIN vendas v ON m.tipo_movimentacao = 'ENTRADA' AND v.id = m.venda_id
+                    WHERE m.id > ? ORDER BY m.id
+                ''', (ultimo_id,))
+                return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao buscar movimentações: {e}")
+            return []
+    
     # ==================== MÉTODOS DE CLIENTES ====================
     
     def criar_cliente(self, cliente: Cliente) -> Optional[int]:
@@ -382,6 +1637,36 @@ class DatabaseManager:
             print(f"❌ Erro ao buscar cliente por CPF: {e}")
             return None
     
+    def listar_cpfs(self) -> set:
+        """Retorna o conjunto de CPFs já cadastrados (para deduplicação em lote)"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT cpf FROM clientes WHERE cpf IS NOT NULL AND cpf != ''")
+                return {row[0] for row in cursor.fetchall()}
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao listar CPFs: {e}")
+            return set()
+    
+    def criar_clientes_lote(self, clientes: List[Cliente]) -> Optional[int]:
+        """
+        Insere um lote de clientes em uma única transação com executemany
+        Clientes sem CPF são gravados com CPF nulo (a coluna é UNIQUE).
+        Retorna: quantidade inserida ou None em caso de erro
+        """
+        try:
+            with self._get_transacao() as conn:
+                cursor = conn.cursor()
+                cursor.executemany('''
+                    INSERT INTO clientes (nome, cpf, telefone, email, endereco, ativo)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [(c.nome, c.cpf or None, c.telefone, c.email, c.endereco, c.ativo)
+                      for c in clientes])
+                return len(clientes)
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao importar lote de clientes: {e}")
+            return None
+    
     def listar_clientes(self, apenas_ativos: bool = True) -> List[Cliente]:
         """Lista todos os clientes"""
         try:
@@ -403,30 +1688,21 @@ class DatabaseManager:
     
     def atualizar_cliente(self, cliente_id: int, **kwargs) -> bool:
         """Atualiza um cliente existente"""
+        return self._atualizar('clientes', cliente_id, kwargs)
+    
+    def _atualizar(self, tabela: str, registro_id: int, campos: Dict[str, Any]) -> bool:
+        """UPDATE parcial pelo comando do registro (mesmo texto para o mesmo conjunto de campos)"""
+        comando = COMANDOS.atualizacao(tabela, campos)
+        if comando is None:
+            return False
+        sql, colunas = comando
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                
-                campos_permitidos = ['nome', 'cpf', 'telefone', 'email', 'endereco', 'ativo']
-                
-                updates = []
-                valores = []
-                
-                for campo, valor in kwargs.items():
-                    if campo in campos_permitidos:
-                        updates.append(f"{campo} = ?")
-                        valores.append(valor)
-                
-                if not updates:
-                    return False
-                
-                valores.append(cliente_id)
-                query = f"UPDATE clientes SET {', '.join(updates)} WHERE id = ?"
-                
-                cursor.execute(query, valores)
+                cursor.execute(sql, [campos[coluna] for coluna in colunas] + [registro_id])
                 return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"❌ Erro ao atualizar cliente: {e}")
+            print(f"❌ Erro ao atualizar {TABELAS_SINGULAR[tabela]}: {e}")
             return False
     
     def deletar_cliente(self, cliente_id: int) -> bool:
@@ -443,7 +1719,15 @@ class DatabaseManager:
                 nome_arquivo = f"backup_petshop_{timestamp}.db"
             
             caminho_backup = REPORT_CONFIG['backup_dir'] / nome_arquivo
-            shutil.copy2(self.db_path, caminho_backup)
+            
+            # API de backup do SQLite: inclui o que ainda está no WAL e é consistente
+            # mesmo com outras conexões gravando
+            destino = sqlite3.connect(str(caminho_backup))
+            try:
+                with self._get_connection() as conn:
+                    conn.backup(destino)
+            finally:
+                destino.close()
             
             print(f"✅ Backup criado: {caminho_backup}")
             return True
@@ -0,0 +1,328 @@
+"""
+Instrumentação das consultas SQL do DatabaseManager
+
+Com a instrumentação ativa, as conexões são abertas com ConexaoInstrumentada,
+que mede cada comando (execute/executemany até a última linha lida), o tempo
+de abertura das conexões, a duração das transações e a taxa de acerto do
+cache de comandos compilados do sqlite3. Comandos acima do limite
+de lentidão são gravados no log com o SQL, o formato dos parâmetros (tipos,
+nunca os valores) e o EXPLAIN QUERY PLAN.
+
+Desativada, o DatabaseManager usa sqlite3.Connection comum: custo zero.
+"""
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config.settings import INSTRUMENTACAO_CONFIG
+from utils.metricas import Histograma
+
+# Limites superiores (ms) das faixas dos histogramas; a última faixa é aberta
+LIMITES_HISTOGRAMA_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _resumo_ms(histograma: Histograma) -> Dict[str, Any]:
+    """Histograma.resumo() com os nomes em milissegundos usados no diagnóstico"""
+    resumo = histograma.resumo()
+    return {
+        'quantidade': resumo['quantidade'],
+        'total_ms': round(resumo['soma'], 3),
+        'media_ms': round(resumo['media'] or 0.0, 3),
+        'p50_ms': round(resumo['p50'] or 0.0, 3),
+        'p95_ms': round(resumo['p95'] or 0.0, 3),
+        'p99_ms': round(resumo['p99'] or 0.0, 3),
+        'max_ms': round(resumo['maximo'], 3),
+        'faixas': resumo['faixas'],
+    }
+
+
+@lru_cache(maxsize=2048)
+def normalizar_sql(sql: str) -> str:
+    """Chave do comando: espaços colapsados e listas de '?' (IN com N itens) unificadas"""
+    return re.sub(r'\?(?:\s*,\s*\?)+', '?, ...', ' '.join(sql.split()))
+
+
+def formato_parametros(parametros: Any, lote: bool = False) -> str:
+    """Tipos dos parâmetros, sem os valores (ex.: '(int, str, NoneType)' ou '200 x (int, int)')"""
+    if lote:
+        linhas = parametros if isinstance(parametros, (list, tuple)) else list(parametros)
+        return f"{len(linhas)} x {formato_parametros(linhas[0]) if linhas else '()'}"
+    if isinstance(parametros, dict):
+        return '{' + ', '.join(f'{chave}: {type(valor).__name__}'
+                               for chave, valor in parametros.items()) + '}'
+    return '(' + ', '.join(type(valor).__name__ for valor in parametros) + ')'
+
+
+class Instrumentacao:
+    """Agrega as medições de todas as conexões de um DatabaseManager (thread-safe)"""
+
+    def __init__(self, limite_lenta_ms: Optional[float] = None, log_lentas=None,
+                 lentas_em_memoria: Optional[int] = None):
+        self.limite_lenta_ms = (INSTRUMENTACAO_CONFIG['limite_lenta_ms']
+                                if limite_lenta_ms is None else limite_lenta_ms)
+        self.log_lentas = Path(log_lentas or INSTRUMENTACAO_CONFIG['log_lentas'])
+        self._lentas = deque(maxlen=lentas_em_memoria or INSTRUMENTACAO_CONFIG['lentas_em_memoria'])
+        self._lock = threading.Lock()
+        self._lock_log = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        """Descarta todas as medições"""
+        with self._lock:
+            self._comandos: Dict[str, List] = {}   # sql -> [Histograma, linhas, acertos no cache]
+            self._cache = [0, 0]                     # [acertos, faltas] no cache de comandos
+            self._conexoes = Histograma(limites=LIMITES_HISTOGRAMA_MS)
+            self._transacoes = Histograma(limites=LIMITES_HISTOGRAMA_MS)
+            self._lentas.clear()
+
+    # ==================== REGISTRO ====================
+
+    def registrar_comando(self, conn: sqlite3.Connection, sql: str, parametros: Any,
+                          ms: float, linhas: int, lote: bool = False, acerto_cache: bool = False):
+        chave = normalizar_sql(sql)
+        with self._lock:
+            dados = self._comandos.get(chave)
+            if dados is None:
+                dados = self._comandos[chave] = [Histograma(limites=LIMITES_HISTOGRAMA_MS), 0, 0]
+            dados[0].observar(ms)
+            dados[1] += linhas
+            dados[2] += acerto_cache
+            self._cache[0 if acerto_cache else 1] += 1
+        if ms >= self.limite_lenta_ms:
+            self._registrar_lenta(conn, sql, parametros, ms, linhas, lote)
+
+    def registrar_conexao(self, ms: float):
+        with self._lock:
+            self._conexoes.observar(ms)
+
+    def registrar_transacao(self, ms: float):
+        with self._lock:
+            self._transacoes.observar(ms)
+
+    def _registrar_lenta(self, conn: sqlite3.Connection, sql: str, parametros: Any,
+                         ms: float, linhas: int, lote: bool):
+        plano = self._plano(conn, sql, parametros, lote)
+        registro = {
+            'data': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'sql': normalizar_sql(sql),
+            'parametros': formato_parametros(parametros, lote),
+            'ms': round(ms, 3),
+            'linhas': linhas,
+            'plano': plano,
+        }
+        with self._lock:
+            self._lentas.append(registro)
+
+        texto = (f"{registro['data']} | {registro['ms']:.1f} ms | {linhas} linha(s) | "
+                 f"parâmetros: {registro['parametros']}\n    {registro['sql']}\n")
+        texto += ''.join(f"    plano: {linha}\n" for linha in plano)
+        try:
+            with self._lock_log:
+                self.log_lentas.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_lentas, 'a', encoding='utf-8') as arquivo:
+                    arquivo.write(texto)
+        except OSError as e:
+            print(f"❌ Erro ao gravar log de consultas lentas: {e}")
+
+    @staticmethod
+    def _plano(conn: sqlite3.Connection, sql: str, parametros: Any, lote: bool) -> List[str]:
+        """EXPLAIN QUERY PLAN do comando (cursor comum, fora da instrumentação)"""
+        if lote:
+            parametros = next(iter(parametros), ())
+        try:
+            cursor = sqlite3.Cursor(conn)
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', parametros)
+            return [row[3] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            return [f"(indisponível: {e})"]
+
+    # ==================== CONSULTA ====================
+
+    def resumo(self, limite: int = 20) -> Dict[str, Any]:
+        """
+        Comandos com maior tempo total, histogramas de conexões e transações
+        Retorna: {'comandos': [{'sql', 'linhas', 'acertos_cache', + _resumo_ms()}],
+                 'conexoes', 'transacoes', 'cache_comandos', 'limite_lenta_ms', 'lentas'}
+        """
+        with self._lock:
+            comandos = sorted(self._comandos.items(), key=lambda item: item[1][0].soma(),
+                              reverse=True)[:limite]
+            acertos, faltas = self._cache
+            return {
+                'comandos': [dict(sql=sql, linhas=linhas, acertos_cache=acertos_comando,
+                                  **_resumo_ms(histograma))
+                             for sql, (histograma, linhas, acertos_comando) in comandos],
+                'conexoes': _resumo_ms(self._conexoes),
+                'transacoes': _resumo_ms(self._transacoes),
+                'cache_comandos': {
+                    'acertos': acertos,
+                    'faltas': faltas,
+                    'taxa_acerto': round(acertos / (acertos + faltas), 4) if acertos + faltas else None,
+                },
+                'limite_lenta_ms': self.limite_lenta_ms,
+                'lentas': len(self._lentas),
+            }
+
+    def consultas_lentas(self) -> List[Dict[str, Any]]:
+        """Últimas consultas lentas (mais recente por último)"""
+        with self._lock:
+            return list(self._lentas)
+
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """
+    Mede cada comando do execute até a última linha lida. A medição é
+    concluída ao esgotar o resultado, no próximo execute, no close ou quando o
+    cursor é descartado.
+    """
+
+    _atual = None   # [sql, parametros, segundos, linhas, lote, acerto_cache]
+
+    def execute(self, sql, parametros=()):
+        self._concluir()
+        conexao = self.connection
+        acerto_cache = conexao._consultar_cache(sql)
+        sem_transacao = not conexao.in_transaction
+        inicio = time.perf_counter()
+        try:
+            super().execute(sql, parametros)
+        finally:
+            self._atual = [sql, parametros, time.perf_counter() - inicio, 0, False, acerto_cache]
+            conexao._acompanhar_transacao(inicio, sem_transacao)
+        if self.description is None:
+            self._atual[3] = max(self.rowcount, 0)
+            self._concluir()
+        return self
+
+    def executemany(self, sql, parametros):
+        self._concluir()
+        parametros = list(parametros)
+        conexao = self.connection
+        acerto_cache = conexao._consultar_cache(sql)
+        sem_transacao = not conexao.in_transaction
+        inicio = time.perf_counter()
+        try:
+            super().executemany(sql, parametros)
+        finally:
+            self._atual = [sql, parametros, time.perf_counter() - inicio, max(self.rowcount, 0), True,
+                           acerto_cache]
+            conexao._acompanhar_transacao(inicio, sem_transacao)
+            self._concluir()
+        return self
+
+    def _medir_leitura(self, leitura, *args):
+        atual = self._atual
+        if atual is None:
+            return leitura(*args)
+        inicio = time.perf_counter()
+        resultado = leitura(*args)
+        atual[2] += time.perf_counter() - inicio
+        return resultado
+
+    def fetchone(self):
+        row = self._medir_leitura(super().fetchone)
+        if row is None:
+            self._concluir()
+        elif self._atual is not None:
+            self._atual[3] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._medir_leitura(super().fetchmany, self.arraysize if size is None else size)
+        if self._atual is not None:
+            self._atual[3] += len(rows)
+            if not rows:
+                self._concluir()
+        return rows
+
+    def fetchall(self):
+        rows = self._medir_leitura(super().fetchall)
+        if self._atual is not None:
+            self._atual[3] += len(rows)
+            self._concluir()
+        return rows
+
+    def __next__(self):
+        try:
+            row = self._medir_leitura(super().__next__)
+        except StopIteration:
+            self._concluir()
+            raise
+        if self._atual is not None:
+            self._atual[3] += 1
+        return row
+
+    def close(self):
+        self._concluir()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._concluir()
+        except Exception:
+            pass
+
+    def _concluir(self):
+        atual, self._atual = self._atual, None
+        if atual is None:
+            return
+        sql, parametros, segundos, linhas, lote, acerto_cache = atual
+        instrumentacao = self.connection.instrumentacao
+        if instrumentacao is not None:
+            instrumentacao.registrar_comando(self.connection, sql, parametros,
+                                             segundos * 1000, linhas, lote, acerto_cache)
+
+
+class ConexaoInstrumentada(sqlite3.Connection):
+    """Conexão cujos cursores são instrumentados; mede também a duração das transações"""
+
+    instrumentacao: Optional[Instrumentacao] = None
+    tamanho_cache = 128   # Mesmo valor de cached_statements passado ao sqlite3.connect
+    _inicio_transacao: Optional[float] = None
+    _cache = None
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    def _consultar_cache(self, sql: str) -> bool:
+        """
+        Reproduz o cache LRU de comandos compilados do sqlite3 (chave = texto exato
+        do SQL, mesmo tamanho), que não expõe contadores: True se o comando já estava lá
+        """
+        cache = self._cache
+        if cache is None:
+            cache = self._cache = OrderedDict()
+        if sql in cache:
+            cache.move_to_end(sql)
+            return True
+        cache[sql] = None
+        if len(cache) > self.tamanho_cache:
+            cache.popitem(last=False)
+        return False
+
+    def _acompanhar_transacao(self, inicio: float, sem_transacao: bool):
+        """Chamado após cada comando: detecta início e fim (COMMIT/ROLLBACK em SQL)"""
+        if self.in_transaction:
+            if sem_transacao or self._inicio_transacao is None:
+                self._inicio_transacao = inicio
+        else:
+            self._encerrar_transacao()
+
+    def _encerrar_transacao(self):
+        inicio, self._inicio_transacao = self._inicio_transacao, None
+        if inicio is not None and self.instrumentacao is not None:
+            self.instrumentacao.registrar_transacao((time.perf_counter() - inicio) * 1000)
+
+    def commit(self):
+        super().commit()
+        self._encerrar_transacao()
+
+    def rollback(self):
+        super().rollback()
+        self._encerrar_transacao()
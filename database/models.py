@@ -61,6 +61,18 @@ class Produto:
             return "BAIXO"
         return "OK"
 
+@dataclass
+class ProdutoAlerta:
+    """Produto em alerta de estoque: só os campos lidos do índice idx_produtos_alerta"""
+    id: int
+    nome: str
+    tipo_animal: str
+    marca: str
+    estoque: int
+    estoque_minimo: int
+    
+    status_estoque = Produto.status_estoque
+
 @dataclass
 class Venda:
     """Modelo de dados para Venda"""
@@ -73,6 +85,8 @@ class Venda:
     forma_pagamento: str = "Dinheiro"
     status: str = "Concluída"  # Concluída, Cancelada
     observacoes: str = ""
+    chave_idempotencia: Optional[str] = None
+    chave_cancelamento: Optional[str] = None
     
     def __post_init__(self):
         if self.data_venda is None:
@@ -106,6 +120,7 @@ class MovimentacaoEstoque:
     estoque_atual: int = 0
     data_movimentacao: Optional[str] = None
     observacao: str = ""
+    venda_id: Optional[int] = None  # Venda que gerou a movimentação (venda ou cancelamento)
     
     def __post_init__(self):
         if self.data_movimentacao is None:
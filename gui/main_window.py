@@ -3,24 +3,32 @@ Janela principal do sistema Pet Shop
 """
 from PyQt5.QtWidgets import (
     QMainWindow, QTabWidget, QStatusBar, QMessageBox, 
-    QWidget, QVBoxLayout, QMenuBar, QMenu, QAction
+    QWidget, QVBoxLayout, QMenuBar, QMenu, QAction, QShortcut
 )
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QIcon, QKeySequence
 from datetime import datetime
 
 from database import DatabaseManager
-from business import ProdutoService, ClienteService, VendaService, EstoqueService
-from config.settings import APP_CONFIG
+from business import ProdutoService, ClienteService, VendaService, EstoqueService, DiarioVendas
+from config.settings import APP_CONFIG, METRICAS_CONFIG
+from utils.metricas import ExportadorMetricas
+from utils.perfilador import PERFILADOR, perfilar
 from .widgets.dashboard_widget import DashboardWidget
 from .widgets.produto_widget import ProdutoWidget
 from .widgets.cliente_widget import ClienteWidget
 from .widgets.venda_widget import VendaWidget
+from .widgets.diagnostico_widget import DiagnosticoDialog
 
 
 class MainWindow(QMainWindow):
     """Janela principal da aplicação"""
     
+    # Emitido (de qualquer thread) após cada commit que alterou o banco
+    banco_alterado = pyqtSignal()
+    # Emitido pela thread do diário com os motivos das vendas recusadas pelo banco
+    vendas_recusadas = pyqtSignal(list)
+    
     def __init__(self):
         super().__init__()
         
@@ -30,15 +38,45 @@ class MainWindow(QMainWindow):
         self.cliente_service = ClienteService(self.db)
         self.venda_service = VendaService(self.db)
         self.estoque_service = EstoqueService(self.db)
+        self.diario_vendas = DiarioVendas(self.venda_service)
+        self.estoque_service.checkpoint_se_necessario()
+        
+        # Métricas em http://127.0.0.1:<porta>/metrics (formato Prometheus)
+        self.exportador_metricas = None
+        if METRICAS_CONFIG['exportar']:
+            try:
+                self.exportador_metricas = ExportadorMetricas()
+                self.exportador_metricas.iniciar()
+            except OSError as e:
+                self.exportador_metricas = None
+                print(f"⚠️ Exportador de métricas indisponível: {e}")
         
         self._init_ui()
         self._carregar_estilos()
         self._criar_menu()
+        self._texto_alertas = ""
         self._atualizar_status_bar()
         
-        # Timer para atualizar statusbar a cada 60 segundos
+        # Alertas recalculados só quando o banco muda (vendas, inclusive as aplicadas
+        # pelo diário, entradas, cadastros); rajadas de commits viram uma atualização
+        self.timer_alertas = QTimer(self)
+        self.timer_alertas.setSingleShot(True)
+        self.timer_alertas.timeout.connect(self._atualizar_status_bar)
+        self.banco_alterado.connect(self._agendar_alertas)
+        self.db.ao_confirmar_escrita(self.banco_alterado.emit)
+        self.vendas_recusadas.connect(self._avisar_vendas_recusadas)
+        self.diario_vendas.ao_rejeitar(self.vendas_recusadas.emit)
+        
+        # Commits de outros terminais e da API não passam por ao_confirmar_escrita:
+        # consulta barata da versão do banco, alertas só quando ela muda
+        self._versao_vista = self.db.versao_dados()
+        self.timer_versao = QTimer(self)
+        self.timer_versao.timeout.connect(self._verificar_versao_banco)
+        self.timer_versao.start(APP_CONFIG['intervalo_versao_ms'])
+        
+        # Relógio da statusbar a cada 60 segundos (sem acessar o banco)
         self.timer = QTimer()
-        self.timer.timeout.connect(self._atualizar_status_bar)
+        self.timer.timeout.connect(self._exibir_status)
         self.timer.start(60000)  # 60 segundos
     
     def _init_ui(self):
@@ -62,7 +100,8 @@ class MainWindow(QMainWindow):
         self.venda_widget = VendaWidget(
             self.venda_service,
             self.produto_service,
-            self.cliente_service
+            self.cliente_service,
+            self.diario_vendas
         )
         
         # Adicionar abas
@@ -132,24 +171,63 @@ class MainWindow(QMainWindow):
         action_sobre = QAction("ℹ️ Sobre", self)
         action_sobre.triggered.connect(self._mostrar_sobre)
         menu_ajuda.addAction(action_sobre)
+        
+        action_perfil = QAction("⏱️ Modo de Perfilamento", self)
+        action_perfil.setCheckable(True)
+        action_perfil.setChecked(PERFILADOR.ativo)
+        action_perfil.toggled.connect(self._alternar_perfilamento)
+        menu_ajuda.addAction(action_perfil)
+        
+        # Painel de diagnóstico: só pelo atalho, fora dos menus
+        atalho_diagnostico = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        atalho_diagnostico.activated.connect(self._mostrar_diagnostico)
     
+    @perfilar
     def _atualizar_status_bar(self):
-        """Atualiza a barra de status com informações do sistema"""
-        agora = datetime.now().strftime("%d/%m/%Y %H:%M")
-        
-        # Verificar alertas de estoque
-        alertas = self.estoque_service.produtos_alertas()
-        total_alertas = len(alertas['sem_estoque']) + len(alertas['critico']) + len(alertas['baixo'])
+        """Atualiza a barra de status com os alertas de estoque (contagem em cache)"""
+        alertas = self.estoque_service.contagem_alertas()
+        total_alertas = alertas['total'] if alertas else 0
         
         if total_alertas > 0:
-            status_text = f"⚠️ {total_alertas} alertas de estoque  |  "
+            self._texto_alertas = f"⚠️ {total_alertas} alertas de estoque"
         else:
-            status_text = "✅ Estoque OK  |  "
-        
-        status_text += f"🕐 {agora}  |  📍 {APP_CONFIG['company']}"
+            self._texto_alertas = "✅ Estoque OK"
         
+        self._exibir_status()
+    
+    def _agendar_alertas(self):
+        """Atualiza os alertas em até 300 ms (uma vez por rajada de commits)"""
+        if not self.timer_alertas.isActive():
+            self.timer_alertas.start(300)
+    
+    def _verificar_versao_banco(self):
+        """Agenda os alertas se algum commit (de qualquer processo) alterou o banco"""
+        versao = self.db.versao_dados()
+        if versao is not None and versao != self._versao_vista:
+            self._versao_vista = versao
+            self._agendar_alertas()
+    
+    def _exibir_status(self):
+        """Mostra os últimos alertas calculados com a hora atual"""
+        agora = datetime.now().strftime("%d/%m/%Y %H:%M")
+        status_text = f"{self._texto_alertas}  |  🕐 {agora}  |  📍 {APP_CONFIG['company']}"
+        if self.diario_vendas.rejeitadas:
+            status_text = f"❌ {self.diario_vendas.rejeitadas} venda(s) recusada(s)  |  {status_text}"
         self.status_bar.showMessage(status_text)
     
+    def _avisar_vendas_recusadas(self, motivos):
+        """Avisa o operador das vendas do diário que o banco recusou"""
+        self._exibir_status()
+        self.venda_widget._atualizar_info_diario()
+        QMessageBox.warning(
+            self,
+            "Vendas recusadas",
+            f"❌ {len(motivos)} venda(s) registrada(s) no caixa não foram gravadas no banco:\n\n"
+            + "\n".join(f"• {motivo}" for motivo in motivos[:10])
+            + f"\n\nConfira o arquivo {self.diario_vendas.arquivo_rejeitadas}"
+        )
+    
+    @perfilar
     def _on_tab_changed(self, index):
         """Callback quando a aba é alterada"""
         # Atualizar dashboard quando voltar para ele
@@ -164,6 +242,7 @@ class MainWindow(QMainWindow):
         
         self._atualizar_status_bar()
     
+    @perfilar
     def _fazer_backup(self):
         """Faz backup do banco de dados"""
         if self.db.criar_backup():
@@ -220,6 +299,19 @@ class MainWindow(QMainWindow):
             """
         )
     
+    def _alternar_perfilamento(self, ativo):
+        """Liga/desliga a medição das ações da interface (perfis em relatorios/perfis)"""
+        PERFILADOR.ativo = ativo
+        if ativo:
+            self.status_bar.showMessage(f"⏱️ Perfilamento ligado: {PERFILADOR.pasta}")
+            QTimer.singleShot(5000, self._exibir_status)
+        else:
+            self._exibir_status()
+    
+    def _mostrar_diagnostico(self):
+        """Abre o painel de diagnóstico (métricas e consultas SQL)"""
+        DiagnosticoDialog(self.db, self).exec_()
+    
     def closeEvent(self, event):
         """Evento de fechamento da janela"""
         reply = QMessageBox.question(
@@ -231,6 +323,9 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
+            self.diario_vendas.encerrar()
+            if self.exportador_metricas:
+                self.exportador_metricas.parar()
             event.accept()
         else:
             event.ignore()
\ No newline at end of file
@@ -10,6 +10,7 @@ from PyQt5.QtCore import Qt
 from database.models import Cliente
 from utils.formatters import formatar_cpf, formatar_telefone
 from utils.validators import validar_cpf, validar_telefone, validar_email
+from utils.perfilador import perfilar
 
 
 class ClienteDialog(QDialog):
@@ -156,6 +157,7 @@ class ClienteWidget(QWidget):
         
         self.setLayout(layout)
     
+    @perfilar
     def atualizar_lista(self):
         """Atualiza a lista de clientes"""
         clientes = self.cliente_service.listar_clientes()
@@ -184,6 +186,7 @@ class ClienteWidget(QWidget):
             ))
             self.tabela.setItem(row, 4, QTableWidgetItem(cliente.email or "-"))
     
+    @perfilar
     def _novo_cliente(self):
         """Abre dialog para novo cliente"""
         dialog = ClienteDialog(self)
@@ -197,6 +200,7 @@ class ClienteWidget(QWidget):
             else:
                 QMessageBox.warning(self, "Erro", mensagem)
     
+    @perfilar
     def _editar_cliente(self):
         """Edita o cliente selecionado"""
         row = self.tabela.currentRow()
@@ -229,6 +233,7 @@ class ClienteWidget(QWidget):
             else:
                 QMessageBox.warning(self, "Erro", mensagem)
     
+    @perfilar
     def _deletar_cliente(self):
         """Desativa o cliente selecionado"""
         row = self.tabela.currentRow()
@@ -9,6 +9,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from utils.formatters import formatar_moeda
+from utils.perfilador import perfilar
 
 
 class DashboardWidget(QWidget):
@@ -131,6 +132,7 @@ class DashboardWidget(QWidget):
         if label_valor:
             label_valor.setText(novo_valor)
     
+    @perfilar
     def atualizar_dados(self):
         """Atualiza todos os dados do dashboard"""
         # Estatísticas de produtos
@@ -161,11 +163,11 @@ class DashboardWidget(QWidget):
     
     def _atualizar_tabela_estoque_baixo(self):
         """Atualiza a tabela de produtos com estoque baixo"""
-        produtos = self.produto_service.produtos_estoque_baixo()
+        produtos = self.produto_service.produtos_estoque_baixo(limite=10)  # Apenas os 10 primeiros
         
         self.tabela_estoque_baixo.setRowCount(0)
         
-        for produto in produtos[:10]:  # Mostrar apenas os 10 primeiros
+        for produto in produtos:
             row = self.tabela_estoque_baixo.rowCount()
             self.tabela_estoque_baixo.insertRow(row)
             
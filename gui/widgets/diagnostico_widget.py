@@ -0,0 +1,115 @@
+"""
+Painel de diagnóstico (oculto): métricas da aplicação e consultas SQL mais custosas
+"""
+from PyQt5.QtWidgets import (
+    QDialog, QWidget, QVBoxLayout, QTabWidget, QTableWidget, QTableWidgetItem,
+    QHeaderView, QLabel, QDialogButtonBox
+)
+from PyQt5.QtCore import QTimer
+from utils.metricas import METRICAS
+
+
+def _formatar_valor(linha: dict) -> str:
+    """Texto da coluna de valor; histogramas em segundos são exibidos em ms"""
+    valor = linha['valor']
+    if valor is None:
+        return "-"
+    if linha['tipo'] != 'histogram':
+        return f"{valor:g}"
+    if not valor['quantidade']:
+        return "sem observações"
+    escala, unidade = (1000, " ms") if linha['nome'].endswith('_segundos') else (1, "")
+
+    def numero(v):
+        return "-" if v is None else f"{v * escala:.2f}{unidade}"
+
+    return (f"n={valor['quantidade']}  média={numero(valor['media'])}  "
+            f"p50≤{numero(valor['p50'])}  p95≤{numero(valor['p95'])}  p99≤{numero(valor['p99'])}")
+
+
+class DiagnosticoDialog(QDialog):
+    """Dialog com as métricas (atualizadas a cada 2 s) e o resumo da instrumentação SQL"""
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.setWindowTitle("🩺 Diagnóstico")
+        self.setMinimumSize(900, 500)
+        self._init_ui()
+        self.atualizar()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.atualizar)
+        self.timer.start(2000)
+
+    def _init_ui(self):
+        layout = QVBoxLayout()
+        abas = QTabWidget()
+
+        # Métricas
+        self.tabela_metricas = self._criar_tabela(["Métrica", "Rótulos", "Valor"])
+        abas.addTab(self.tabela_metricas, "📈 Métricas")
+
+        # Consultas SQL
+        aba_sql = QWidget()
+        layout_sql = QVBoxLayout()
+        self.label_sql = QLabel()
+        layout_sql.addWidget(self.label_sql)
+        self.tabela_sql = self._criar_tabela(["SQL", "Execuções", "Total (ms)", "p95 (ms)", "Máx (ms)"])
+        layout_sql.addWidget(self.tabela_sql)
+        aba_sql.setLayout(layout_sql)
+        abas.addTab(aba_sql, "🐢 Consultas SQL")
+
+        layout.addWidget(abas)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.setLayout(layout)
+
+    def _criar_tabela(self, colunas):
+        tabela = QTableWidget()
+        tabela.setColumnCount(len(colunas))
+        tabela.setHorizontalHeaderLabels(colunas)
+        tabela.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        tabela.setEditTriggers(QTableWidget.NoEditTriggers)
+        tabela.setSelectionBehavior(QTableWidget.SelectRows)
+        return tabela
+
+    def atualizar(self):
+        """Relê as métricas e a instrumentação"""
+        linhas = METRICAS.resumo()
+        self.tabela_metricas.setRowCount(len(linhas))
+        for row, linha in enumerate(linhas):
+            rotulos = ', '.join(f"{nome}={valor}" for nome, valor in linha['rotulos'].items())
+            self.tabela_metricas.setItem(row, 0, QTableWidgetItem(linha['nome']))
+            self.tabela_metricas.setItem(row, 1, QTableWidgetItem(rotulos))
+            self.tabela_metricas.setItem(row, 2, QTableWidgetItem(_formatar_valor(linha)))
+
+        estatisticas = self.db.estatisticas_consultas()
+        if estatisticas is None:
+            self.label_sql.setText("Instrumentação SQL desativada (INSTRUMENTACAO_CONFIG['ativa'])")
+            self.tabela_sql.setRowCount(0)
+            return
+
+        cache = estatisticas['cache_comandos']
+        taxa = "-" if cache['taxa_acerto'] is None else f"{cache['taxa_acerto']:.1%}"
+        self.label_sql.setText(
+            f"Transações: {estatisticas['transacoes']['quantidade']}  |  "
+            f"p95 {estatisticas['transacoes']['p95_ms']} ms  |  "
+            f"Consultas lentas (≥ {estatisticas['limite_lenta_ms']} ms): {estatisticas['lentas']}  |  "
+            f"Cache de comandos: {taxa} ({cache['faltas']} compilações)"
+        )
+        comandos = estatisticas['comandos']
+        self.tabela_sql.setRowCount(len(comandos))
+        for row, comando in enumerate(comandos):
+            self.tabela_sql.setItem(row, 0, QTableWidgetItem(comando['sql']))
+            self.tabela_sql.setItem(row, 1, QTableWidgetItem(str(comando['quantidade'])))
+            self.tabela_sql.setItem(row, 2, QTableWidgetItem(f"{comando['total_ms']:.1f}"))
+            self.tabela_sql.setItem(row, 3, QTableWidgetItem(f"{comando['p95_ms']:.2f}"))
+            self.tabela_sql.setItem(row, 4, QTableWidgetItem(f"{comando['max_ms']:.2f}"))
+
+    def done(self, resultado):
+        self.timer.stop()
+        super().done(resultado)
@@ -9,8 +9,9 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 from database.models import Produto
-from utils.formatters import formatar_moeda, formatar_peso
+from utils.formatters import formatar_moeda_coluna, formatar_peso_coluna
 from config.settings import TIPOS_ANIMAIS
+from utils.perfilador import perfilar
 
 
 class ProdutoDialog(QDialog):
@@ -191,6 +192,7 @@ class ProdutoWidget(QWidget):
         
         self.setLayout(layout)
     
+    @perfilar
     def atualizar_lista(self):
         """Atualiza a lista de produtos"""
         tipo_filtro = self.combo_tipo.currentText()
@@ -204,19 +206,23 @@ class ProdutoWidget(QWidget):
             produtos = [p for p in produtos if 
                        busca in p.nome.lower() or busca in p.marca.lower()]
         
+        # Formatar colunas de uma vez (valores repetidos vêm do cache)
+        pesos = formatar_peso_coluna(p.peso for p in produtos)
+        precos_custo = formatar_moeda_coluna(p.preco_custo for p in produtos)
+        precos_venda = formatar_moeda_coluna(p.preco_venda for p in produtos)
+        
         self.tabela.setRowCount(0)
         
-        for produto in produtos:
-            row = self.tabela.rowCount()
+        for row, produto in enumerate(produtos):
             self.tabela.insertRow(row)
             
             self.tabela.setItem(row, 0, QTableWidgetItem(str(produto.id)))
             self.tabela.setItem(row, 1, QTableWidgetItem(produto.nome))
             self.tabela.setItem(row, 2, QTableWidgetItem(produto.tipo_animal.upper()))
             self.tabela.setItem(row, 3, QTableWidgetItem(produto.marca))
-            self.tabela.setItem(row, 4, QTableWidgetItem(formatar_peso(produto.peso)))
-            self.tabela.setItem(row, 5, QTableWidgetItem(formatar_moeda(produto.preco_custo)))
-            self.tabela.setItem(row, 6, QTableWidgetItem(formatar_moeda(produto.preco_venda)))
+            self.tabela.setItem(row, 4, QTableWidgetItem(pesos[row]))
+            self.tabela.setItem(row, 5, QTableWidgetItem(precos_custo[row]))
+            self.tabela.setItem(row, 6, QTableWidgetItem(precos_venda[row]))
             self.tabela.setItem(row, 7, QTableWidgetItem(str(produto.estoque)))
             
             # Status
@@ -232,6 +238,7 @@ class ProdutoWidget(QWidget):
             
             self.tabela.setItem(row, 8, item_status)
     
+    @perfilar
     def _novo_produto(self):
         """Abre dialog para novo produto"""
         dialog = ProdutoDialog(self)
@@ -245,6 +252,7 @@ class ProdutoWidget(QWidget):
             else:
                 QMessageBox.warning(self, "Erro", mensagem)
     
+    @perfilar
     def _editar_produto(self):
         """Edita o produto selecionado"""
         row = self.tabela.currentRow()
@@ -279,6 +287,7 @@ class ProdutoWidget(QWidget):
             else:
                 QMessageBox.warning(self, "Erro", mensagem)
     
+    @perfilar
     def _entrada_estoque(self):
         """Registra entrada de estoque"""
         row = self.tabela.currentRow()
@@ -307,6 +316,7 @@ class ProdutoWidget(QWidget):
             else:
                 QMessageBox.warning(self, "Erro", mensagem)
     
+    @perfilar
     def _saida_estoque(self):
         """Registra saída de estoque"""
         row = self.tabela.currentRow()
@@ -335,6 +345,7 @@ class ProdutoWidget(QWidget):
             else:
                 QMessageBox.warning(self, "Erro", mensagem)
     
+    @perfilar
     def _deletar_produto(self):
         """Desativa o produto selecionado"""
         row = self.tabela.currentRow()
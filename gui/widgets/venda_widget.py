@@ -8,18 +8,20 @@ from PyQt5.QtWidgets import (
     QFormLayout, QTextEdit, QSplitter
 )
 from PyQt5.QtCore import Qt
-from utils.formatters import formatar_moeda, formatar_data_hora
+from utils.formatters import formatar_moeda, formatar_moeda_coluna, formatar_data_hora
 from config.settings import FORMAS_PAGAMENTO
+from utils.perfilador import perfilar
 
 
 class VendaWidget(QWidget):
     """Widget de PDV (Ponto de Venda)"""
     
-    def __init__(self, venda_service, produto_service, cliente_service):
+    def __init__(self, venda_service, produto_service, cliente_service, diario_vendas=None):
         super().__init__()
         self.venda_service = venda_service
         self.produto_service = produto_service
         self.cliente_service = cliente_service
+        self.diario_vendas = diario_vendas  # Captura offline: vendas vão primeiro ao diário local
         self.carrinho = []
         self._init_ui()
     
@@ -144,6 +146,10 @@ class VendaWidget(QWidget):
         
         layout_direita.addLayout(btn_layout)
         
+        self.label_diario = QLabel("")
+        self.label_diario.setStyleSheet("color: #e67e22;")
+        layout_direita.addWidget(self.label_diario)
+        
         widget_direita.setLayout(layout_direita)
         splitter.addWidget(widget_direita)
         
@@ -153,6 +159,7 @@ class VendaWidget(QWidget):
         # Carregar dados iniciais
         self.atualizar_dados()
     
+    @perfilar
     def atualizar_dados(self):
         """Atualiza produtos e clientes"""
         # Carregar produtos
@@ -173,7 +180,22 @@ class VendaWidget(QWidget):
         
         for cliente in clientes:
             self.combo_cliente.addItem(cliente.nome, cliente.id)
+        
+        self._atualizar_info_diario()
     
+    def _atualizar_info_diario(self):
+        """Mostra as vendas do diário local que aguardam gravação ou foram recusadas pelo banco"""
+        if not self.diario_vendas:
+            self.label_diario.setText("")
+            return
+        textos = []
+        if self.diario_vendas.pendentes:
+            textos.append(f"⏳ {self.diario_vendas.pendentes} venda(s) aguardando gravação no banco")
+        if self.diario_vendas.rejeitadas:
+            textos.append(f"❌ {self.diario_vendas.rejeitadas} venda(s) recusada(s) pelo banco")
+        self.label_diario.setText("\n".join(textos))
+    
+    @perfilar
     def _atualizar_info_produto(self):
         """Atualiza informações do produto selecionado"""
         produto_id = self.combo_produto.currentData()
@@ -188,6 +210,7 @@ class VendaWidget(QWidget):
             self.spin_quantidade.setValue(1)
             self._calcular_subtotal()
     
+    @perfilar
     def _calcular_subtotal(self):
         """Calcula o subtotal do item"""
         produto_id = self.combo_produto.currentData()
@@ -200,6 +223,7 @@ class VendaWidget(QWidget):
             subtotal = produto.preco_venda * quantidade
             self.label_subtotal.setText(formatar_moeda(subtotal))
     
+    @perfilar
     def _adicionar_ao_carrinho(self):
         """Adiciona produto ao carrinho"""
         produto_id = self.combo_produto.currentData()
@@ -240,22 +264,26 @@ class VendaWidget(QWidget):
     
     def _atualizar_tabela_carrinho(self):
         """Atualiza a tabela do carrinho"""
+        # Formatar colunas de uma vez (valores repetidos vêm do cache)
+        precos = formatar_moeda_coluna(item['preco_unitario'] for item in self.carrinho)
+        subtotais = formatar_moeda_coluna(item['subtotal'] for item in self.carrinho)
+        
         self.tabela_carrinho.setRowCount(0)
         
-        for item in self.carrinho:
-            row = self.tabela_carrinho.rowCount()
+        for row, item in enumerate(self.carrinho):
             self.tabela_carrinho.insertRow(row)
             
             self.tabela_carrinho.setItem(row, 0, QTableWidgetItem(item['nome']))
             self.tabela_carrinho.setItem(row, 1, QTableWidgetItem(str(item['quantidade'])))
-            self.tabela_carrinho.setItem(row, 2, QTableWidgetItem(formatar_moeda(item['preco_unitario'])))
-            self.tabela_carrinho.setItem(row, 3, QTableWidgetItem(formatar_moeda(item['subtotal'])))
+            self.tabela_carrinho.setItem(row, 2, QTableWidgetItem(precos[row]))
+            self.tabela_carrinho.setItem(row, 3, QTableWidgetItem(subtotais[row]))
             
             btn_remover = QPushButton("🗑️")
             btn_remover.setProperty("class", "danger")
             btn_remover.clicked.connect(lambda checked, r=row: self._remover_do_carrinho(r))
             self.tabela_carrinho.setCellWidget(row, 4, btn_remover)
     
+    @perfilar
     def _remover_do_carrinho(self, row):
         """Remove item do carrinho"""
         if 0 <= row < len(self.carrinho):
@@ -263,6 +291,7 @@ class VendaWidget(QWidget):
             self._atualizar_tabela_carrinho()
             self._calcular_total()
     
+    @perfilar
     def _calcular_total(self):
         """Calcula os totais da venda"""
         valor_total = sum(item['subtotal'] for item in self.carrinho)
@@ -272,6 +301,7 @@ class VendaWidget(QWidget):
         self.label_valor_total.setText(formatar_moeda(valor_total))
         self.label_valor_final.setText(formatar_moeda(valor_final))
     
+    @perfilar
     def _limpar_carrinho(self):
         """Limpa o carrinho"""
         if not self.carrinho:
@@ -289,6 +319,7 @@ class VendaWidget(QWidget):
             self._calcular_total()
             self.spin_desconto.setValue(0)
     
+    @perfilar
     def _finalizar_venda(self):
         """Finaliza a venda"""
         if not self.carrinho:
@@ -311,13 +342,25 @@ class VendaWidget(QWidget):
         if reply == QMessageBox.No:
             return
         
-        # Processar venda
-        sucesso, mensagem, venda_id = self.venda_service.criar_venda(
-            cliente_id=cliente_id,
-            itens=self.carrinho,
-            forma_pagamento=forma_pagamento,
-            desconto=desconto
-        )
+        # Processar venda: com o diário, a venda é confirmada ao ser gravada localmente
+        # e aplicada ao banco em segundo plano
+        if self.diario_vendas:
+            try:
+                sucesso, mensagem, _ = self.diario_vendas.registrar_venda(
+                    cliente_id=cliente_id,
+                    itens=self.carrinho,
+                    forma_pagamento=forma_pagamento,
+                    desconto=desconto
+                )
+            except OSError as e:
+                sucesso, mensagem = False, f"Erro ao registrar venda no diário: {e}"
+        else:
+            sucesso, mensagem, venda_id = self.venda_service.criar_venda(
+                cliente_id=cliente_id,
+                itens=self.carrinho,
+                forma_pagamento=forma_pagamento,
+                desconto=desconto
+            )
         
         if sucesso:
             QMessageBox.information(
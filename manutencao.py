@@ -0,0 +1,100 @@
+"""
+Comandos de manutenção do banco de dados (sem interface gráfica)
+
+Uso: python manutencao.py <comando> [--db caminho.db]
+
+Comandos:
+    reconstruir-resumo   Recalcula a tabela vendas_resumo_diario a partir das vendas
+    checkpoint-estoque   Grava um checkpoint do estoque atual (agendar diariamente)
+    reconciliar-estoque  Confere as movimentações contra o estoque (--corrigir ajusta)
+    arquivar-historico   Move vendas e movimentações antigas para arquivos anuais (--dias)
+"""
+import argparse
+import sys
+
+from config.settings import ARQUIVO_CONFIG
+from database import DatabaseManager
+from business import EstoqueService
+
+
+def reconstruir_resumo(db: DatabaseManager, args) -> int:
+    linhas = db.reconstruir_resumo_diario()
+    if linhas is None:
+        return 1
+    print(f"✅ Resumo diário reconstruído: {linhas} linha(s)")
+    return 0
+
+
+def checkpoint_estoque(db: DatabaseManager, args) -> int:
+    checkpoint_id = db.criar_checkpoint_estoque()
+    if checkpoint_id is None:
+        return 1
+    print(f"✅ Checkpoint de estoque #{checkpoint_id} criado")
+    return 0
+
+
+def reconciliar_estoque(db: DatabaseManager, args) -> int:
+    relatorio = EstoqueService(db).reconciliar_estoque(corrigir=args.corrigir)
+    if relatorio is None:
+        return 1
+    print(f"📦 {relatorio['movimentacoes']} movimentação(ões) verificada(s)")
+    for quebra in relatorio['quebras']:
+        print(f"⚠️ Produto #{quebra['produto_id']}: movimentação #{quebra['movimentacao_id']} "
+              f"parte de {quebra['registrado']}, esperado {quebra['esperado']}")
+    for item in relatorio['quantidades']:
+        print(f"⚠️ Produto #{item['produto_id']}: movimentação #{item['movimentacao_id']} "
+              f"({item['tipo']} de {item['quantidade']}) altera o estoque em {item['variacao']}")
+    for item in relatorio['divergencias'] + relatorio['sem_movimentacao']:
+        print(f"⚠️ Produto #{item['produto_id']}: movimentações somam {item['estoque_movimentacoes']}, "
+              f"cadastro tem {item['estoque_produto']}")
+    if args.corrigir:
+        print(f"✅ {relatorio['corrigidos']} ajuste(s) de reconciliação gravado(s)")
+        if relatorio['nao_corrigidas']:
+            print(f"⚠️ {len(relatorio['nao_corrigidas'])} inconsistência(s) no meio do histórico "
+                  f"não podem ser corrigidas por ajuste (continuam nas próximas verificações)")
+    
+    problemas = sum(len(relatorio[chave]) for chave in
+                    ('quebras', 'quantidades', 'divergencias', 'sem_movimentacao'))
+    if not problemas:
+        print("✅ Nenhuma inconsistência encontrada")
+    return 0 if not problemas or (args.corrigir and not relatorio['nao_corrigidas']) else 2
+
+
+
+def arquivar_historico(db: DatabaseManager, args) -> int:
+    dias = args.dias or ARQUIVO_CONFIG['horizonte_dias']
+    resultado = db.arquivar_historico(dias)
+    if resultado is None:
+        return 1
+    if not resultado:
+        print(f"✅ Nada a arquivar (horizonte de {dias} dias)")
+    for ano, movidos in resultado.items():
+        print(f"✅ {ano}: {movidos['vendas']} venda(s), {movidos['itens']} item(ns) e "
+              f"{movidos['movimentacoes']} movimentação(ões) arquivados")
+    return 0
+
+
+COMANDOS = {
+    'reconstruir-resumo': reconstruir_resumo,
+    'checkpoint-estoque': checkpoint_estoque,
+    'reconciliar-estoque': reconciliar_estoque,
+    'arquivar-historico': arquivar_historico,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manutenção do banco de dados do Pet Shop")
+    parser.add_argument('comando', choices=sorted(COMANDOS))
+    parser.add_argument('--db', help="Caminho do banco (padrão: config/settings.py)")
+    parser.add_argument('--corrigir', action='store_true',
+                        help="reconciliar-estoque: grava ajustes para as divergências")
+    parser.add_argument('--dias', type=int,
+                        help="arquivar-historico: idade mínima em dias (padrão: config/settings.py)")
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    sys.exit(COMANDOS[args.comando](db, args))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,9 @@
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+# Troca separadores do padrão en-US (1,234.56) para pt-BR (1.234,56) em uma única passada
+_SEPARADORES_PT_BR = str.maketrans(',.', '.,')
 
 def formatar_cpf(cpf: str) -> str:
     """Formata CPF para exibição: 000.000.000-00"""
@@ -18,10 +22,12 @@ def formatar_telefone(telefone: str) -> str:
         return f"({telefone[:2]}) {telefone[2:6]}-{telefone[6:]}"
     return telefone
 
+@lru_cache(maxsize=4096)
 def formatar_moeda(valor: float) -> str:
     """Formata valor para moeda brasileira: R$ 1.234,56"""
-    return f"R$ {valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+    return f"R$ {valor:,.2f}".translate(_SEPARADORES_PT_BR)
 
+@lru_cache(maxsize=4096)
 def formatar_data(data: str, formato_entrada: str = "%Y-%m-%d %H:%M:%S", 
                  formato_saida: str = "%d/%m/%Y") -> str:
     """Formata data para exibição"""
@@ -38,6 +44,7 @@ def formatar_data_hora(data: str) -> str:
     """Formata data e hora para exibição: 01/01/2024 14:30"""
     return formatar_data(data, formato_saida="%d/%m/%Y %H:%M")
 
+@lru_cache(maxsize=1024)
 def formatar_peso(peso: float) -> str:
     """Formata peso para exibição: 10,5 kg"""
     return f"{peso:.1f} kg".replace('.', ',')
@@ -59,3 +66,23 @@ def truncar_texto(texto: str, tamanho: int = 30) -> str:
     if len(texto) <= tamanho:
         return texto
     return texto[:tamanho-3] + "..."
+
+# ==================== FORMATAÇÃO DE COLUNAS ====================
+# Usadas ao preencher tabelas inteiras: valores repetidos (preços, datas)
+# são atendidos pelo cache LRU das funções acima.
+
+def formatar_moeda_coluna(valores: Iterable[float]) -> List[str]:
+    """Formata uma coluna inteira de valores monetários"""
+    return list(map(formatar_moeda, valores))
+
+def formatar_data_coluna(datas: Iterable[str], formato_saida: str = "%d/%m/%Y") -> List[str]:
+    """Formata uma coluna inteira de datas"""
+    return [formatar_data(data, formato_saida=formato_saida) for data in datas]
+
+def formatar_data_hora_coluna(datas: Iterable[str]) -> List[str]:
+    """Formata uma coluna inteira de datas com hora"""
+    return formatar_data_coluna(datas, formato_saida="%d/%m/%Y %H:%M")
+
+def formatar_peso_coluna(pesos: Iterable[float]) -> List[str]:
+    """Formata uma coluna inteira de pesos"""
+    return list(map(formatar_peso, pesos))
@@ -0,0 +1,309 @@
+"""
+Métricas da aplicação em execução (contadores, medidores e histogramas)
+
+Os serviços registram as métricas no registro global METRICAS e as atualizam
+no caminho quente sem lock: cada thread escreve só na sua própria lista de
+valores, e a leitura (exportação ou painel de diagnóstico) soma as listas de
+todas as threads. O texto segue o formato de exposição do Prometheus e pode
+ser servido pelo ExportadorMetricas (localhost) ou pela rota /metricas da API.
+"""
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.settings import METRICAS_CONFIG
+
+TIPO_CONTEUDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Limites superiores (segundos) das faixas dos histogramas; a última faixa é aberta
+LIMITES_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class _ValoresPorThread:
+    """Uma lista de valores por thread; só a leitura (somar) e a primeira escrita usam lock"""
+
+    __slots__ = ('_local', '_listas', '_lock', '_tamanho')
+
+    def __init__(self, tamanho: int):
+        self._local = threading.local()
+        self._listas: List[list] = []
+        self._lock = threading.Lock()
+        self._tamanho = tamanho
+
+    def da_thread(self) -> list:
+        try:
+            return self._local.valores
+        except AttributeError:
+            valores = self._local.valores = [0] * self._tamanho
+            with self._lock:
+                self._listas.append(valores)
+            return valores
+
+    def listas(self) -> List[list]:
+        with self._lock:
+            return list(self._listas)
+
+    def somar(self) -> list:
+        listas = self.listas()
+        return [sum(coluna) for coluna in zip(*listas)] if listas else [0] * self._tamanho
+
+
+class Contador:
+    """Valor que só cresce (ex.: vendas registradas)"""
+
+    tipo = 'counter'
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Tuple[Tuple[str, str], ...]):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self._valores = _ValoresPorThread(1)
+
+    def incrementar(self, valor: float = 1):
+        self._valores.da_thread()[0] += valor
+
+    def valor(self) -> float:
+        return self._valores.somar()[0]
+
+    def amostras(self) -> List[Tuple[str, Tuple, float]]:
+        return [(self.nome, self.rotulos, self.valor())]
+
+
+class Medidor:
+    """Valor instantâneo (ex.: produtos em alerta); com `funcao`, é lido na exportação"""
+
+    tipo = 'gauge'
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Tuple[Tuple[str, str], ...],
+                 funcao: Optional[Callable[[], float]] = None):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.funcao = funcao
+        self._valor = 0
+
+    def definir(self, valor: float):
+        self._valor = valor
+
+    def valor(self) -> float:
+        return self.funcao() if self.funcao is not None else self._valor
+
+    def amostras(self) -> List[Tuple[str, Tuple, float]]:
+        return [(self.nome, self.rotulos, self.valor())]
+
+
+class Histograma:
+    """
+    Distribuição de valores em faixas (ex.: latência em segundos), com soma e máximo
+    Também usado fora do registro, sem nome, com outras faixas (ex.: a
+    instrumentação SQL, em milissegundos).
+    """
+
+    tipo = 'histogram'
+
+    def __init__(self, nome: str = '', ajuda: str = '', rotulos: Tuple[Tuple[str, str], ...] = (),
+                 limites: Tuple[float, ...] = LIMITES_SEGUNDOS):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.limites = tuple(limites)
+        # Contagem por faixa (+ faixa aberta), soma e máximo das observações
+        self._valores = _ValoresPorThread(len(self.limites) + 3)
+
+    def observar(self, valor: float):
+        valores = self._valores.da_thread()
+        valores[bisect_left(self.limites, valor)] += 1
+        valores[-2] += valor
+        if valor > valores[-1]:
+            valores[-1] = valor
+
+    def _totais(self) -> Tuple[list, float, float]:
+        """(contagens por faixa, soma, máximo) somando as threads"""
+        listas = self._valores.listas()
+        if not listas:
+            return [0] * (len(self.limites) + 1), 0, 0
+        colunas = [sum(coluna) for coluna in zip(*listas)]
+        return colunas[:-2], colunas[-2], max(valores[-1] for valores in listas)
+
+    def _percentil(self, contagens: list, maximo: float, p: float) -> Optional[float]:
+        """Limite superior da faixa que contém o percentil (máximo na faixa aberta)"""
+        alvo = p * sum(contagens)
+        acumulado = 0
+        for faixa, contagem in enumerate(contagens):
+            acumulado += contagem
+            if contagem and acumulado >= alvo:
+                return min(self.limites[faixa], maximo) if faixa < len(self.limites) else maximo
+        return None
+
+    def soma(self) -> float:
+        return self._totais()[1]
+
+    def resumo(self) -> Dict[str, Any]:
+        """
+        {'quantidade', 'soma', 'media', 'maximo', 'p50', 'p95', 'p99', 'faixas'}
+        Percentis pelo limite da faixa (None sem observações); 'faixas' só as não vazias
+        """
+        contagens, soma, maximo = self._totais()
+        quantidade = sum(contagens)
+        return {
+            'quantidade': quantidade,
+            'soma': soma,
+            'media': soma / quantidade if quantidade else None,
+            'maximo': maximo,
+            'p50': self._percentil(contagens, maximo, 0.50),
+            'p95': self._percentil(contagens, maximo, 0.95),
+            'p99': self._percentil(contagens, maximo, 0.99),
+            'faixas': {f'<={_numero(limite)}': contagem for limite, contagem
+                       in zip(self.limites + (float('inf'),), contagens) if contagem},
+        }
+
+    def amostras(self) -> List[Tuple[str, Tuple, float]]:
+        contagens, soma, _ = self._totais()
+        amostras, acumulado = [], 0
+        for limite, contagem in zip(self.limites + (float('inf'),), contagens):
+            acumulado += contagem
+            amostras.append((f'{self.nome}_bucket', self.rotulos + (('le', _numero(limite)),), acumulado))
+        amostras.append((f'{self.nome}_sum', self.rotulos, soma))
+        amostras.append((f'{self.nome}_count', self.rotulos, acumulado))
+        return amostras
+
+
+def _numero(valor: float) -> str:
+    if valor == float('inf'):
+        return '+Inf'
+    if isinstance(valor, int) or float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+def _rotulos(rotulos: Tuple[Tuple[str, str], ...]) -> str:
+    if not rotulos:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(nome, str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for nome, valor in rotulos
+    ) + '}'
+
+
+class RegistroMetricas:
+    """
+    Conjunto das métricas da aplicação. Registrar o mesmo nome com os mesmos
+    rótulos retorna a métrica existente, então os módulos podem declarar as suas
+    na importação.
+    """
+
+    def __init__(self):
+        self._metricas: Dict[Tuple[str, Tuple], Any] = {}
+        self._lock = threading.Lock()
+
+    def _obter(self, classe, nome: str, ajuda: str, rotulos: Dict[str, str], **opcoes):
+        chave = (nome, tuple(sorted((rotulo, str(valor)) for rotulo, valor in rotulos.items())))
+        with self._lock:
+            metrica = self._metricas.get(chave)
+            if metrica is None:
+                metrica = self._metricas[chave] = classe(nome, ajuda, chave[1], **opcoes)
+            elif not isinstance(metrica, classe):
+                raise ValueError(f"Métrica '{nome}' já registrada como {metrica.tipo}")
+            return metrica
+
+    def contador(self, nome: str, ajuda: str, **rotulos) -> Contador:
+        return self._obter(Contador, nome, ajuda, rotulos)
+
+    def medidor(self, nome: str, ajuda: str, funcao: Optional[Callable[[], float]] = None,
+                **rotulos) -> Medidor:
+        medidor = self._obter(Medidor, nome, ajuda, rotulos)
+        if funcao is not None:
+            medidor.funcao = funcao
+        return medidor
+
+    def histograma(self, nome: str, ajuda: str, limites: Tuple[float, ...] = LIMITES_SEGUNDOS,
+                   **rotulos) -> Histograma:
+        return self._obter(Histograma, nome, ajuda, rotulos, limites=limites)
+
+    def _por_nome(self) -> Dict[str, List[Any]]:
+        with self._lock:
+            metricas = sorted(self._metricas.items())
+        familias: Dict[str, List[Any]] = {}
+        for (nome, _), metrica in metricas:
+            familias.setdefault(nome, []).append(metrica)
+        return familias
+
+    def exportar(self) -> str:
+        """Todas as métricas no formato de exposição em texto do Prometheus"""
+        linhas = []
+        for nome, metricas in self._por_nome().items():
+            linhas.append(f"# HELP {nome} {metricas[0].ajuda}")
+            linhas.append(f"# TYPE {nome} {metricas[0].tipo}")
+            for metrica in metricas:
+                try:
+                    amostras = metrica.amostras()
+                except Exception as e:
+                    print(f"⚠️ Erro ao ler a métrica {nome}: {e}")
+                    continue
+                linhas.extend(f"{amostra}{_rotulos(rotulos)} {_numero(valor)}"
+                              for amostra, rotulos, valor in amostras)
+        return '\n'.join(linhas) + '\n'
+
+    def resumo(self) -> List[Dict[str, Any]]:
+        """
+        Uma linha por métrica para o painel de diagnóstico:
+        {'nome', 'rotulos', 'tipo', 'valor'} ('valor' é Histograma.resumo() nos histogramas)
+        """
+        linhas = []
+        for nome, metricas in self._por_nome().items():
+            for metrica in metricas:
+                try:
+                    valor = metrica.resumo() if isinstance(metrica, Histograma) else metrica.valor()
+                except Exception:
+                    valor = None
+                linhas.append({'nome': nome, 'rotulos': dict(metrica.rotulos),
+                               'tipo': metrica.tipo, 'valor': valor})
+        return linhas
+
+
+# Registro global usado pelos serviços
+METRICAS = RegistroMetricas()
+
+
+class ExportadorMetricas:
+    """Servidor HTTP mínimo, em thread própria, que responde GET /metrics (formato Prometheus)"""
+
+    def __init__(self, registro: Optional[RegistroMetricas] = None, host: Optional[str] = None,
+                 porta: Optional[int] = None):
+        self.registro = registro or METRICAS
+        self.host = host or METRICAS_CONFIG['host']
+        self.porta = METRICAS_CONFIG['porta'] if porta is None else porta
+        self._servidor: Optional[ThreadingHTTPServer] = None
+
+    def iniciar(self) -> int:
+        """Abre o socket (porta 0 escolhe uma livre) e atende em uma thread daemon; retorna a porta"""
+        registro = self.registro
+
+        class _Requisicao(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/metricas'):
+                    self.send_error(404)
+                    return
+                corpo = registro.exportar().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', TIPO_CONTEUDO)
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, formato, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer((self.host, self.porta), _Requisicao)
+        self._servidor.daemon_threads = True
+        self.porta = self._servidor.server_address[1]
+        threading.Thread(target=self._servidor.serve_forever, name='exportador-metricas',
+                         daemon=True).start()
+        return self.porta
+
+    def parar(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
@@ -0,0 +1,197 @@
+"""
+Perfilamento por amostragem das ações da interface
+
+Com o modo ligado (menu Ajuda, PERFIL_CONFIG['ativo'] ou a variável de ambiente
+PETSHOP_PERFIL=1), cada ação decorada com @perfilar (slots dos widgets e da
+janela principal) tem o tempo de parede gravado em acoes.csv. Ações mais
+demoradas que PERFIL_CONFIG['minimo_ms'] também geram, em relatorios/perfis/:
+    <data>_<acao>.folded            - pilhas colapsadas (flamegraph.pl, speedscope)
+    <data>_<acao>.speedscope.json   - perfil amostrado para https://www.speedscope.app
+
+As pilhas são coletadas por uma thread que lê o frame da thread da ação a cada
+PERFIL_CONFIG['intervalo_ms']; cada amostra pesa o tempo decorrido desde a anterior.
+Desligado, o custo por ação é uma verificação de flag.
+"""
+import csv
+import functools
+import inspect
+import json
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.settings import PERFIL_CONFIG
+
+_ARQUIVO_MODULO = __file__
+
+
+class _Amostrador:
+    """Thread que coleta as pilhas de outra thread até ser parada"""
+
+    def __init__(self, thread_alvo: int, frame_base, intervalo: float):
+        self.thread_alvo = thread_alvo
+        self.frame_base = frame_base
+        self.intervalo = intervalo
+        self.amostras: List[Tuple[Tuple[Tuple[str, str, int], ...], float]] = []
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name='perfilador', daemon=True)
+
+    def iniciar(self):
+        self._ultima = time.perf_counter()
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+        self._amostrar()   # Fecha o último intervalo
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            self._amostrar()
+
+    def _amostrar(self):
+        frame = sys._current_frames().get(self.thread_alvo)
+        agora = time.perf_counter()
+        peso, self._ultima = agora - self._ultima, agora
+        pilha = []
+        while frame is not None and frame is not self.frame_base:
+            codigo = frame.f_code
+            if codigo.co_filename != _ARQUIVO_MODULO:
+                pilha.append((codigo.co_name, codigo.co_filename, codigo.co_firstlineno))
+            frame = frame.f_back
+        if frame is None or not pilha:
+            return   # Fora da ação (ainda não começou ou já terminou)
+        pilha.reverse()
+        self.amostras.append((tuple(pilha), peso))
+
+
+def _nome_quadro(quadro: Tuple[str, str, int]) -> str:
+    nome, arquivo, linha = quadro
+    return f"{nome} ({Path(arquivo).name}:{linha})"
+
+
+def _nome_arquivo(acao: str) -> str:
+    return re.sub(r'[^\w.-]+', '_', acao)
+
+
+class Perfilador:
+    """Mede as ações da interface e grava os perfis das mais lentas"""
+
+    def __init__(self, pasta=None, intervalo_ms: Optional[float] = None,
+                 minimo_ms: Optional[float] = None, ativo: Optional[bool] = None):
+        self.pasta = Path(pasta or PERFIL_CONFIG['pasta'])
+        self.intervalo_ms = intervalo_ms or PERFIL_CONFIG['intervalo_ms']
+        self.minimo_ms = PERFIL_CONFIG['minimo_ms'] if minimo_ms is None else minimo_ms
+        self.ativo = PERFIL_CONFIG['ativo'] if ativo is None else ativo
+        self._em_andamento = threading.local()
+
+    def executar(self, acao: str, funcao: Callable, *args, **kwargs):
+        """Executa funcao(*args, **kwargs) como a ação `acao` (só a mais externa é medida)"""
+        if not self.ativo or getattr(self._em_andamento, 'acao', None):
+            return funcao(*args, **kwargs)
+
+        self._em_andamento.acao = acao
+        amostrador = _Amostrador(threading.get_ident(), sys._getframe(0).f_back,
+                                 self.intervalo_ms / 1000)
+        intervalo_troca = sys.getswitchinterval()
+        # A thread de amostragem só roda quando a da ação libera o GIL
+        sys.setswitchinterval(min(intervalo_troca, self.intervalo_ms / 1000))
+        inicio = time.perf_counter()
+        amostrador.iniciar()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            amostrador.parar()
+            sys.setswitchinterval(intervalo_troca)
+            self._em_andamento.acao = None
+            self._registrar(acao, duracao_ms, amostrador.amostras)
+
+    def _registrar(self, acao: str, duracao_ms: float, amostras: List):
+        """Grava a linha de acoes.csv e, se a ação foi lenta, os arquivos de perfil"""
+        data = datetime.now()
+        arquivos = {}
+        try:
+            self.pasta.mkdir(parents=True, exist_ok=True)
+            if duracao_ms >= self.minimo_ms and amostras:
+                prefixo = self.pasta / f"{data.strftime('%Y%m%d_%H%M%S_%f')}_{_nome_arquivo(acao)}"
+                arquivos['folded'] = prefixo.with_name(prefixo.name + '.folded')
+                arquivos['speedscope'] = prefixo.with_name(prefixo.name + '.speedscope.json')
+                arquivos['folded'].write_text(pilhas_colapsadas(acao, amostras), encoding='utf-8')
+                arquivos['speedscope'].write_text(
+                    json.dumps(perfil_speedscope(acao, amostras), ensure_ascii=False), encoding='utf-8'
+                )
+
+            registro = self.pasta / 'acoes.csv'
+            novo = not registro.exists()
+            with open(registro, 'a', encoding='utf-8', newline='') as arquivo:
+                escritor = csv.writer(arquivo)
+                if novo:
+                    escritor.writerow(['data', 'acao', 'duracao_ms', 'amostras', 'perfil'])
+                escritor.writerow([data.strftime('%Y-%m-%d %H:%M:%S'), acao, f"{duracao_ms:.1f}",
+                                   len(amostras), arquivos.get('speedscope', Path('')).name])
+        except OSError as e:
+            print(f"❌ Erro ao gravar perfil da ação {acao}: {e}")
+
+
+def pilhas_colapsadas(acao: str, amostras: List) -> str:
+    """Formato 'acao;quadro;quadro peso' com o peso em microssegundos"""
+    totais: Dict[str, int] = {}
+    for pilha, peso in amostras:
+        chave = ';'.join([acao] + [_nome_quadro(quadro) for quadro in pilha])
+        totais[chave] = totais.get(chave, 0) + round(peso * 1_000_000)
+    return ''.join(f"{pilha} {peso}\n" for pilha, peso in totais.items() if peso)
+
+
+def perfil_speedscope(acao: str, amostras: List) -> Dict:
+    """Perfil 'sampled' no formato de arquivo do speedscope (pesos em ms)"""
+    quadros: Dict[Tuple[str, str, int], int] = {}
+    pilhas, pesos = [], []
+    for pilha, peso in amostras:
+        pilhas.append([quadros.setdefault(quadro, len(quadros)) for quadro in pilha])
+        pesos.append(round(peso * 1000, 3))
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': acao,
+        'exporter': 'Marte Pet Shop',
+        'shared': {'frames': [{'name': nome, 'file': arquivo, 'line': linha}
+                              for nome, arquivo, linha in quadros]},
+        'profiles': [{
+            'type': 'sampled',
+            'name': acao,
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': round(sum(pesos), 3),
+            'samples': pilhas,
+            'weights': pesos,
+        }],
+    }
+
+
+# Perfilador usado pela interface (ligado/desligado pelo menu)
+PERFILADOR = Perfilador()
+
+
+def perfilar(funcao: Callable) -> Callable:
+    """
+    Decorador de slots: a chamada vira uma ação 'Classe.metodo' do PERFILADOR.
+    Argumentos extras enviados pelo sinal (ex.: o `checked` de clicked) são
+    descartados como o PyQt faz com o slot original.
+    """
+    codigo = funcao.__code__
+    maximo = None if codigo.co_flags & inspect.CO_VARARGS else codigo.co_argcount
+    acao = funcao.__qualname__
+
+    @functools.wraps(funcao)
+    def envolvido(*args, **kwargs):
+        if maximo is not None:
+            args = args[:maximo]
+        if not PERFILADOR.ativo:
+            return funcao(*args, **kwargs)
+        return PERFILADOR.executar(acao, funcao, *args, **kwargs)
+
+    return envolvido
@@ -0,0 +1,100 @@
+"""
+Leitura em streaming de planilhas (CSV/XLSX) para importações em lote
+"""
+import csv
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+def _normalizar_cabecalho(coluna: Any) -> str:
+    """Normaliza o nome de uma coluna: minúsculas, sem espaços nas pontas"""
+    if coluna is None:
+        return ''
+    return str(coluna).strip().lower().replace(' ', '_')
+
+
+def _ler_csv(caminho: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Lê um CSV detectando automaticamente o separador (',' ou ';')"""
+    with open(caminho, 'r', encoding='utf-8-sig', newline='') as arquivo:
+        amostra = arquivo.read(4096)
+        arquivo.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=',;\t')
+        except csv.Error:
+            dialeto = csv.excel
+
+        leitor = csv.reader(arquivo, dialeto)
+        cabecalho = [_normalizar_cabecalho(c) for c in next(leitor, [])]
+
+        for numero, valores in enumerate(leitor, start=2):
+            if not any(v.strip() for v in valores):
+                continue
+            yield numero, dict(zip(cabecalho, valores))
+
+
+def _ler_xlsx(caminho: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Lê a primeira aba de uma planilha XLSX em modo somente leitura"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = workbook.active.iter_rows(values_only=True)
+        cabecalho = [_normalizar_cabecalho(c) for c in next(linhas, ())]
+
+        for numero, valores in enumerate(linhas, start=2):
+            if all(v is None or str(v).strip() == '' for v in valores):
+                continue
+            yield numero, dict(zip(cabecalho, valores))
+    finally:
+        workbook.close()
+
+
+def ler_planilha(caminho) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Lê uma planilha linha a linha sem carregá-la inteira na memória
+    Retorna: iterador de (número da linha na planilha, dados da linha)
+    """
+    caminho = Path(caminho)
+    extensao = caminho.suffix.lower()
+
+    if extensao == '.csv':
+        return _ler_csv(caminho)
+    elif extensao in ('.xlsx', '.xlsm'):
+        return _ler_xlsx(caminho)
+    raise ValueError(f"Formato de planilha não suportado: {extensao}")
+
+
+def converter_decimal(valor: Any) -> Optional[float]:
+    """Converte valores como '1.234,56', '89,90' ou 89.9 para float"""
+    if valor is None:
+        return None
+    if isinstance(valor, (int, float)):
+        return float(valor)
+
+    texto = str(valor).strip().replace('R$', '').replace(' ', '')
+    if not texto:
+        return None
+    if ',' in texto:
+        texto = texto.replace('.', '').replace(',', '.')
+    return float(texto)
+
+
+def converter_inteiro(valor: Any) -> Optional[int]:
+    """Converte um valor de planilha para inteiro"""
+    numero = converter_decimal(valor)
+    if numero is None:
+        return None
+    if numero != int(numero):
+        raise ValueError(f"Valor não é inteiro: {valor}")
+    return int(numero)
+
+
+def salvar_rejeitados(rejeitados, caminho) -> Path:
+    """Salva o relatório de linhas rejeitadas em CSV (linha;motivo;dados)"""
+    caminho = Path(caminho)
+    with open(caminho, 'w', encoding='utf-8-sig', newline='') as arquivo:
+        escritor = csv.writer(arquivo, delimiter=';')
+        escritor.writerow(['linha', 'motivo', 'dados'])
+        for rejeitado in rejeitados:
+            escritor.writerow([rejeitado['linha'], rejeitado['motivo'], rejeitado['dados']])
+    return caminho
@@ -1,33 +1,74 @@
 import re
-from typing import Optional, Tuple
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Padrões pré-compilados (evita reprocessar a expressão a cada chamada)
+_RE_NAO_DIGITOS = re.compile(r'\D')
+_RE_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+def _somente_digitos(texto: str) -> str:
+    """
+    Remove caracteres não numéricos (sem regex quando já está limpo). Dígitos de
+    outros alfabetos (ex.: '１２３' de largura total, colados de outros sistemas)
+    viram os ASCII correspondentes, como o int() da validação original aceitava
+    """
+    if texto.isascii() and texto.isdigit():
+        return texto
+    digitos = _RE_NAO_DIGITOS.sub('', texto)
+    if not digitos.isascii():
+        digitos = ''.join(str(int(digito)) for digito in digitos)
+    return digitos
 
 def validar_cpf(cpf: str) -> bool:
     """Valida um CPF brasileiro"""
-    # Remove caracteres não numéricos
-    cpf = re.sub(r'\D', '', cpf)
+    cpf = _somente_digitos(cpf)
     
     if len(cpf) != 11 or cpf == cpf[0] * 11:
         return False
     
-    # Validação do primeiro dígito verificador
-    soma = sum(int(cpf[i]) * (10 - i) for i in range(9))
-    digito1 = (soma * 10 % 11) % 10
+    digitos = [int(digito) for digito in cpf]
     
-    if digito1 != int(cpf[9]):
+    # Validação do primeiro dígito verificador
+    soma = sum(d * peso for d, peso in zip(digitos, range(10, 1, -1)))
+    if (soma * 10 % 11) % 10 != digitos[9]:
         return False
     
     # Validação do segundo dígito verificador
-    soma = sum(int(cpf[i]) * (11 - i) for i in range(10))
-    digito2 = (soma * 10 % 11) % 10
+    soma = sum(d * peso for d, peso in zip(digitos, range(11, 1, -1)))
+    return (soma * 10 % 11) % 10 == digitos[10]
+
+# Pesos dos dígitos verificadores do CPF (10..2 e 11..2)
+_PESOS_DIGITO1 = np.arange(10, 1, -1)
+_PESOS_DIGITO2 = np.arange(11, 1, -1)
+
+def validar_cpfs_vetorizado(cpfs: Sequence[str]) -> np.ndarray:
+    """
+    Valida vários CPFs (somente dígitos) de uma vez com NumPy
+    Retorna: array booleano alinhado com a entrada
+    """
+    resultado = np.zeros(len(cpfs), dtype=bool)
     
-    return digito2 == int(cpf[10])
+    posicoes = [i for i, cpf in enumerate(cpfs) if len(cpf) == 11 and cpf.isascii() and cpf.isdigit()]
+    if not posicoes:
+        return resultado
+    
+    texto = ''.join(cpfs[i] for i in posicoes).encode('ascii')
+    digitos = (np.frombuffer(texto, dtype=np.uint8).reshape(-1, 11) - ord('0')).astype(np.int64)
+    
+    digito1 = (digitos[:, :9] @ _PESOS_DIGITO1 * 10 % 11) % 10
+    digito2 = (digitos[:, :10] @ _PESOS_DIGITO2 * 10 % 11) % 10
+    nao_repetido = (digitos != digitos[:, :1]).any(axis=1)
+    
+    resultado[posicoes] = (digito1 == digitos[:, 9]) & (digito2 == digitos[:, 10]) & nao_repetido
+    return resultado
 
 def validar_telefone(telefone: str) -> bool:
     """Valida um telefone brasileiro (fixo ou celular)"""
-    telefone = re.sub(r'\D', '', telefone)
+    telefone = _somente_digitos(telefone)
     
     # Deve ter 10 dígitos (fixo) ou 11 dígitos (celular)
-    if len(telefone) not in [10, 11]:
+    if len(telefone) not in (10, 11):
         return False
     
     # DDD válido (código de área)
@@ -39,8 +80,24 @@ def validar_telefone(telefone: str) -> bool:
 
 def validar_email(email: str) -> bool:
     """Valida um endereço de e-mail"""
-    padrao = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(padrao, email) is not None
+    return _RE_EMAIL.match(email) is not None
+
+def validar_cpf_lote(cpfs: Iterable[str]) -> List[bool]:
+    """Valida vários CPFs (com ou sem formatação), retornando um resultado por linha"""
+    return validar_cpfs_vetorizado([_somente_digitos(cpf or '') for cpf in cpfs]).tolist()
+
+def validar_telefone_lote(telefones: Iterable[str]) -> List[bool]:
+    """Valida vários telefones, retornando um resultado por linha"""
+    return [validar_telefone(telefone or '') for telefone in telefones]
+
+def validar_email_lote(emails: Iterable[str]) -> List[bool]:
+    """Valida vários e-mails, retornando um resultado por linha"""
+    match = _RE_EMAIL.match
+    return [email is not None and match(email) is not None for email in emails]
+
+def eh_inteiro(valor: Any) -> bool:
+    """Verdadeiro para int (bool, float e texto não contam): IDs e quantidades"""
+    return isinstance(valor, int) and not isinstance(valor, bool)
 
 def validar_preco(preco: float) -> Tuple[bool, str]:
     """Valida um preço"""